@@ -0,0 +1,61 @@
+"""
+Benchmark the time it takes to import the package in a fresh interpreter, e.g. for the cold start of short-lived workers.
+
+Run with `python benchmarks/bench_import.py [repeat]`. Every import is measured in a new process, reporting the shortest time. The
+package must neither import NetworkX, unless a NetworkX graph is processed, nor Numba, unless a kernel is run with the numba backend, so
+the benchmark fails if importing the package loads either of them.
+"""
+
+import subprocess
+import sys
+
+# The modules, which importing the package must not load
+_HEAVY = ("networkx", "numba")
+
+# Import the given modules, then report the time taken and which of the heavy modules have been imported
+_SCRIPT = """
+import sys
+from time import perf_counter
+start = perf_counter()
+{imports}
+print(perf_counter() - start, *(module for module in {heavy} if module in sys.modules))
+"""
+
+
+def import_time(imports: str, repeat: int = 5) -> tuple[float, list[str]]:
+    """Measure the shortest time out of `repeat` fresh interpreters to run the given imports, and which heavy modules they load."""
+    times = []
+    for _ in range(repeat):
+        script = _SCRIPT.format(imports=imports, heavy=_HEAVY)
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, check=True, text=True)
+        elapsed, *loaded = output.stdout.split()
+        times.append(float(elapsed))
+    return min(times), loaded
+
+
+def main(repeat: int = 5) -> None:
+    cases = {
+        "numpy": "import numpy",
+        "networkx": "import networkx",
+        "numba": "import numba",
+        "heirarchical_leiden": "import heirarchical_leiden",
+        "array_leiden": "from heirarchical_leiden.array_leiden import array_leiden",
+    }
+    print(f"{'import':<24}{'time':>10}  heavy modules loaded")
+    loaded_by_package: set[str] = set()
+    for name, imports in cases.items():
+        try:
+            elapsed, loaded = import_time(imports, repeat)
+        except subprocess.CalledProcessError:
+            print(f"{name:<24}{'-':>10}  (not installed)")
+            continue
+        print(f"{name:<24}{elapsed * 1000:>8.1f}ms  {', '.join(loaded) or '-'}")
+        if name.startswith(("heirarchical_leiden", "array_leiden")):
+            loaded_by_package.update(loaded)
+
+    if loaded_by_package:
+        sys.exit(f"Importing the package loads {', '.join(sorted(loaded_by_package))}.")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
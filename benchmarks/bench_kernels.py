@@ -0,0 +1,68 @@
+"""
+Benchmark the array-based kernels on both backends, reporting the speedup of the compiled (Numba) backend for each kernel.
+
+Run with `python benchmarks/bench_kernels.py [nodes] [average degree]`. The compiled kernels are run once before timing them, so that the
+compilation time is not included in the measurement.
+"""
+
+import random
+import sys
+from collections.abc import Callable
+from time import perf_counter
+
+import numpy as np
+
+from heirarchical_leiden import kernels
+from heirarchical_leiden.csr import CSRGraph
+from heirarchical_leiden.quality_functions import Modularity
+
+
+def random_graph(n: int, degree: int) -> CSRGraph:
+    """Create a random graph with n nodes and an average degree of `degree`, consisting of 64 denser communities."""
+    rng = np.random.default_rng(0)
+    m = n * degree // 2
+    src = rng.integers(0, n, m)
+    # Connect most edges within the community of their source
+    local = np.minimum(src - src % 64 + rng.integers(0, 64, m), n - 1)
+    dst = np.where(rng.random(m) < 0.8, local, rng.integers(0, n, m))
+    return CSRGraph.from_edges(src, dst, None, n)
+
+
+def timed(f: Callable[[], object], repeat: int = 3) -> float:
+    """Measure the shortest time out of `repeat` runs of f."""
+    times = []
+    for _ in range(repeat):
+        random.seed(0)
+        start = perf_counter()
+        f()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def main(n: int = 100_000, degree: int = 10) -> None:
+    graph = random_graph(n, degree)
+    𝓗 = Modularity(1)
+    membership = kernels.move_nodes_queue(graph, list(range(n)), 𝓗)
+    refined = kernels.refine_partition(graph, membership, 𝓗, 0.3, 0.05)
+
+    benchmarks: dict[str, Callable[[], object]] = {
+        "local move": lambda: kernels.move_nodes_queue(graph, list(range(n)), 𝓗),
+        "refine": lambda: kernels.refine_partition(graph, membership, 𝓗, 0.3, 0.05),
+        "aggregate": lambda: kernels.aggregate_graph(graph, refined),
+    }
+
+    backends = ["python", "numba"] if kernels.NUMBA_AVAILABLE else ["python"]
+    print(f"Graph with {graph.order()} nodes and {graph.indices.shape[0] // 2} edges")
+    print(f"{'kernel':<12}" + "".join(f"{backend:>12}" for backend in backends) + ("     speedup" if len(backends) == 2 else ""))
+    for name, f in benchmarks.items():
+        times = []
+        for backend in backends:
+            kernels.set_backend(backend)
+            f()  # Warm up (and compile)
+            times.append(timed(f))
+        speedup = f"{times[0] / times[1]:>11.1f}x" if len(times) == 2 else ""
+        print(f"{name:<12}" + "".join(f"{t:>11.3f}s" for t in times) + speedup)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
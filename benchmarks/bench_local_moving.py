@@ -0,0 +1,37 @@
+"""
+Benchmark the scaling of the array-based local moving phase, checking that the time per node visit stays flat as the graph grows.
+
+Run with `python benchmarks/bench_local_moving.py [backend] [largest number of nodes]`. For every size, the first `n` visits of the phase
+are timed, which visit every node exactly once. The benchmark fails if the time per visit of the largest graph exceeds that of the
+smallest one by more than a factor of 3, e.g. because work proportional to the whole graph is repeated every few thousand visits.
+"""
+
+import sys
+
+from bench_kernels import random_graph, timed
+
+from heirarchical_leiden import kernels
+from heirarchical_leiden.quality_functions import Modularity
+
+
+def main(backend: str = "numba" if kernels.NUMBA_AVAILABLE else "python", largest: int = 400_000) -> None:
+    kernels.set_backend(backend)
+    𝓗 = Modularity(1)
+    sizes = [largest // 16, largest // 4, largest]
+    # Compile the kernels (for the numba backend) before timing them
+    kernels.move_nodes_queue(random_graph(1000, 10), list(range(1000)), 𝓗)
+
+    print(f"{'nodes':>10}{'time':>10}{'per visit':>12}  ({backend})")
+    per_visit = []
+    for n in sizes:
+        graph = random_graph(n, 10)
+        elapsed = timed(lambda: kernels.move_nodes_queue(graph, list(range(n)), 𝓗, max_iterations=n))
+        per_visit.append(elapsed / n)
+        print(f"{n:>10}{elapsed:>9.3f}s{per_visit[-1] * 1e9:>10.0f}ns")
+
+    if per_visit[-1] > 3 * per_visit[0]:
+        sys.exit("The time per visit grows with the size of the graph.")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], *(int(arg) for arg in sys.argv[2:3]))
@@ -0,0 +1,69 @@
+"""
+Benchmark the effect of the node orderings on the time per pass of the array-based kernels.
+
+Run with `python benchmarks/bench_ordering.py [nodes] [average degree]` for a random graph with community structure, whose node ids are
+shuffled (as are raw ids, e.g. the paper ids in `cora.cites`), or with `python benchmarks/bench_ordering.py <edge list file>` for a
+graph given as a whitespace-separated list of edges between arbitrary integer ids, such as `datasets/cora_data/cora.cites`.
+"""
+
+import sys
+from collections.abc import Callable
+from time import perf_counter
+
+import numpy as np
+from bench_kernels import random_graph, timed
+
+from heirarchical_leiden import kernels
+from heirarchical_leiden.csr import CSRGraph
+from heirarchical_leiden.ordering import ORDERINGS, node_order
+from heirarchical_leiden.quality_functions import Modularity
+
+
+def shuffled_graph(n: int = 1_000_000, degree: int = 10) -> CSRGraph:
+    """Create a random graph (see `bench_kernels.random_graph`), whose node ids are shuffled."""
+    graph = random_graph(n, degree)
+    return graph.permute(np.random.default_rng(1).permutation(n))
+
+
+def edge_list_graph(path: str) -> CSRGraph:
+    """Read a graph from an edge list file, numbering the nodes in the order of their ids."""
+    edges = np.loadtxt(path, dtype=np.int64, ndmin=2)
+    ids, index = np.unique(edges[:, :2], return_inverse=True)
+    index = index.reshape(-1, 2)
+    return CSRGraph.from_edges(index[:, 0], index[:, 1], None, len(ids))
+
+
+def passes(graph: CSRGraph) -> dict[str, Callable[[], object]]:
+    """Get one pass of every kernel on the given graph."""
+    𝓗 = Modularity(1)
+    n = graph.order()
+    membership = kernels.move_nodes_queue(graph, list(range(n)), 𝓗)
+    refined = kernels.refine_partition(graph, membership, 𝓗, 0.3, 0.05)
+    return {
+        "local move": lambda: kernels.move_nodes_queue(graph, list(range(n)), 𝓗),
+        "refine": lambda: kernels.refine_partition(graph, membership, 𝓗, 0.3, 0.05),
+        "aggregate": lambda: kernels.aggregate_graph(graph, refined),
+    }
+
+
+def main(graph: CSRGraph) -> None:
+    print(f"Graph with {graph.order()} nodes and {graph.indices.shape[0] // 2} edges, {kernels.BACKEND} backend")
+    print(f"{'ordering':<12}{'reorder':>12}" + "".join(f"{name:>12}" for name in passes(graph)))
+
+    for ordering in (None, *ORDERINGS):
+        start = perf_counter()
+        permuted = graph if ordering is None else graph.permute(node_order(graph, ordering))
+        reorder = perf_counter() - start
+
+        times = []
+        for f in passes(permuted).values():
+            f()  # Warm up (and compile)
+            times.append(timed(f))
+        print(f"{ordering or 'none':<12}{reorder:>11.3f}s" + "".join(f"{t:>11.3f}s" for t in times))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and not sys.argv[1].isdigit():
+        main(edge_list_graph(sys.argv[1]))
+    else:
+        main(shuffled_graph(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,55 @@
+"""
+Profile the visit strategies of the local moving phase, reporting the node visits and evaluations of moves each strategy takes.
+
+Run with `python benchmarks/bench_visiting.py [nodes] [runs]`. Every strategy clusters the same random graph with community structure
+(a relaxed caveman graph) once per run, with the same seeds, using the NetworkX implementation. The statistics of the local moving phases
+are collected through `LeidenHooks.on_local_moving`.
+"""
+
+import random
+import sys
+from collections import Counter
+from time import perf_counter
+
+import networkx as nx
+
+from heirarchical_leiden.hooks import LeidenHooks, LocalMovingStats
+from heirarchical_leiden.leiden import leiden
+from heirarchical_leiden.quality_functions import Modularity, QualityFunction
+from heirarchical_leiden.visiting import DegreeQueue, FIFOQueue, GainQueue, PruneQueue, VisitStrategy
+
+
+class ProfilingHooks(LeidenHooks):
+    """Hooks summing up the statistics of all local moving phases."""
+
+    def __init__(self) -> None:
+        self.totals: Counter[str] = Counter()
+
+    def on_local_moving(self, stats: LocalMovingStats) -> None:
+        self.totals.update({key: stats[key] for key in ("visits", "evaluations", "moves")})
+
+
+def main(n: int = 2000, runs: int = 5) -> None:
+    G = nx.relaxed_caveman_graph(n // 20, 20, 0.3, seed=0)
+    𝓗: QualityFunction[int] = Modularity(1)
+    strategies: list[VisitStrategy] = [FIFOQueue(), DegreeQueue(), GainQueue(), PruneQueue()]
+
+    print(f"Graph with {G.order()} nodes and {G.size()} edges, {runs} runs")
+    print(f"{'strategy':<10}{'visits':>12}{'evaluations':>14}{'moves':>10}{'quality':>10}{'time':>10}")
+    for strategy in strategies:
+        hooks = ProfilingHooks()
+        quality = 0.0
+        start = perf_counter()
+        for seed in range(runs):
+            random.seed(seed)
+            quality += 𝓗(leiden(G, 𝓗, hooks=hooks, strategy=strategy))
+        elapsed = perf_counter() - start
+        t = hooks.totals
+        print(
+            f"{strategy.name:<10}{t['visits'] // runs:>12}{t['evaluations'] // runs:>14}{t['moves'] // runs:>10}"
+            f"{quality / runs:>10.4f}{elapsed / runs:>9.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -1,7 +1,7 @@
 let pkgs = import <nixpkgs> {};
 mypython = pkgs.python3.withPackages (ps: with ps; [
     # For the library
-    networkx
+    networkx numpy
     # Testing
     pytest pytest-cov
     # Demonstration notebooks
@@ -1,14 +1,103 @@
-from heirarchical_leiden.hierarchical_leiden import HierarchicalPartition, hierarchical_leiden
-from heirarchical_leiden.leiden import leiden
+from heirarchical_leiden.asynchronous import AsyncClusterer, ClusteringJob
+from heirarchical_leiden.batch import batch_leiden
+from heirarchical_leiden.cache import ResultCache, cached_hierarchical_leiden, graph_fingerprint
+from heirarchical_leiden.checkpoint import checkpointed_hierarchical_leiden, resume_hierarchical_leiden
+from heirarchical_leiden.comparison import (
+    Contingency,
+    adjusted_rand_index,
+    compare_hierarchies,
+    jaccard_matching,
+    normalized_mutual_information,
+)
+from heirarchical_leiden.consensus import consensus_graph, consensus_leiden
+from heirarchical_leiden.csr import CSRGraph, write_csr
+from heirarchical_leiden.distributed import (
+    Backend,
+    ExecutorBackend,
+    InProcessBackend,
+    ProcessBackend,
+    Task,
+    distributed_hierarchical_leiden,
+    distributed_resolution_sweep,
+    run_task,
+)
+from heirarchical_leiden.hierarchical_leiden import (
+    HierarchicalPartition,
+    LazyHierarchicalPartition,
+    hierarchical_leiden,
+    lazy_hierarchical_leiden,
+    stream_hierarchical_leiden,
+)
+from heirarchical_leiden.hooks import LeidenHooks, LocalMovingStats, ProgressEvent
+from heirarchical_leiden.leiden import RefinementComparison, compare_refinement, leiden
+from heirarchical_leiden.memory import MemoryBudget, MemoryLimitExceededError
+from heirarchical_leiden.ordering import node_order
+from heirarchical_leiden.out_of_core import out_of_core_leiden
+from heirarchical_leiden.parallel import SharedCSRGraph, leiden_restarts, resolution_sweep
 from heirarchical_leiden.quality_functions import CPM, Modularity, QualityFunction
-from heirarchical_leiden.utils import Partition
+from heirarchical_leiden.reduction import reduce_graph
+from heirarchical_leiden.scheduler import SchedulerStats, parallel_hierarchical_leiden
+from heirarchical_leiden.statistics import community_statistics, hierarchy_statistics
+from heirarchical_leiden.utils import Partition, TerminationReason
+from heirarchical_leiden.visiting import DegreeQueue, FIFOQueue, GainQueue, PruneQueue, VisitStrategy
 
 __all__ = [
     "hierarchical_leiden",
     "leiden",
+    "out_of_core_leiden",
     "CPM",
     "Modularity",
     "QualityFunction",
     "Partition",
     "HierarchicalPartition",
+    "lazy_hierarchical_leiden",
+    "LazyHierarchicalPartition",
+    "stream_hierarchical_leiden",
+    "TerminationReason",
+    "CSRGraph",
+    "write_csr",
+    "cached_hierarchical_leiden",
+    "graph_fingerprint",
+    "ResultCache",
+    "SharedCSRGraph",
+    "leiden_restarts",
+    "resolution_sweep",
+    "parallel_hierarchical_leiden",
+    "SchedulerStats",
+    "checkpointed_hierarchical_leiden",
+    "resume_hierarchical_leiden",
+    "LeidenHooks",
+    "ProgressEvent",
+    "LocalMovingStats",
+    "AsyncClusterer",
+    "ClusteringJob",
+    "batch_leiden",
+    "reduce_graph",
+    "node_order",
+    "VisitStrategy",
+    "FIFOQueue",
+    "DegreeQueue",
+    "GainQueue",
+    "PruneQueue",
+    "community_statistics",
+    "hierarchy_statistics",
+    "Contingency",
+    "normalized_mutual_information",
+    "adjusted_rand_index",
+    "jaccard_matching",
+    "compare_hierarchies",
+    "consensus_leiden",
+    "consensus_graph",
+    "MemoryBudget",
+    "MemoryLimitExceededError",
+    "compare_refinement",
+    "RefinementComparison",
+    "distributed_hierarchical_leiden",
+    "distributed_resolution_sweep",
+    "Backend",
+    "InProcessBackend",
+    "ProcessBackend",
+    "ExecutorBackend",
+    "Task",
+    "run_task",
 ]
@@ -0,0 +1,239 @@
+"""
+The inner loops of the array-based kernels, written so that they can be compiled by Numba.
+
+The functions in this module only use integer and float arrays (or lists) and plain loops, so the very same source is used for both
+backends selected in `heirarchical_leiden.kernels`: run as is by the Python interpreter on lists, or compiled by `numba.njit` and run on
+NumPy arrays. As all random numbers are drawn by the callers and passed in, both backends produce identical results.
+
+The graph is given by a (possibly partial) set of CSR rows: the neighbors of node v are `indices[indptr[v-start]-lo:indptr[v-start+1]-lo]`,
+where `start` is the first node and `lo` the offset of the first entry of the rows given.
+
+The coefficients (c₁, c₂) of the quality function are given per group of nodes: node v uses `c1[groups[v]]` and `c2[groups[v]]`. This
+allows clustering several graphs packed into one (see `heirarchical_leiden.batch`), each with the coefficients of its own quality.
+"""
+
+from math import exp
+from typing import Any
+
+# The arrays used here are either lists or NumPy arrays, depending on the backend.
+Array = Any
+
+
+def local_move(
+    indptr: Array,
+    indices: Array,
+    weights: Array,
+    start: int,
+    lo: int,
+    x: Array,
+    membership: Array,
+    totals: Array,
+    sizes: Array,
+    free: Array,
+    queue: Array,
+    queued: Array,
+    links: Array,
+    linked: Array,
+    touched: Array,
+    state: Array,
+    groups: Array,
+    c1: Array,
+    c2: Array,
+    requeue: bool,
+    budget: int,
+) -> tuple[int, int]:
+    """
+    Visit up to `budget` nodes from the ring buffer `queue`, moving each to the community that improves the quality the most.
+
+    The ring buffer's head and length as well as the number of free community indices on the stack `free` are kept in `state`, so that
+    the kernel can be resumed. If `requeue` is set, the neighbors of a moved node outside of its new community are queued again.
+    `links`, `linked` and `touched` are scratch arrays with one entry per community. Returns the number of visits and moves.
+    """
+    capacity = len(queue)
+    head, count, free_top = state[0], state[1], state[2]
+    visits = 0
+    moves = 0
+
+    while count > 0 and visits < budget:
+        v = queue[head]
+        head = (head + 1) % capacity
+        count -= 1
+        queued[v] = False
+        visits += 1
+
+        # Sum up the weights of the edges from v into each neighboring community, ignoring self-loops
+        first, last = indptr[v - start] - lo, indptr[v - start + 1] - lo
+        n_touched = 0
+        for e in range(first, last):
+            u = indices[e]
+            if u != v:
+                c = membership[u]
+                if not linked[c]:
+                    linked[c] = True
+                    touched[n_touched] = c
+                    n_touched += 1
+                links[c] += weights[e]
+
+        s = membership[v]
+        x_v = x[v]
+        w_s = links[s]
+        x_s = totals[s]
+        a, b = c1[groups[v]], c2[groups[v]]
+
+        # Staying in the community s has a delta of 0, so only consider strict improvements
+        best = -1
+        best_delta = 0.0
+        for i in range(n_touched):
+            t = touched[i]
+            if t != s:
+                delta = a * (links[t] - w_s) - b * x_v * (x_v + totals[t] - x_s)
+                if delta > best_delta:
+                    best = t
+                    best_delta = delta
+
+        # Moving v into a new community is only a move, if v is not alone in s
+        if sizes[s] > 1 and -a * w_s - b * x_v * (x_v - x_s) > best_delta:
+            free_top -= 1
+            best = free[free_top]
+
+        for i in range(n_touched):
+            links[touched[i]] = 0.0
+            linked[touched[i]] = False
+
+        if best == -1:
+            continue
+
+        moves += 1
+        membership[v] = best
+        totals[s] -= x_v
+        sizes[s] -= 1
+        totals[best] += x_v
+        sizes[best] += 1
+        if sizes[s] == 0:
+            free[free_top] = s
+            free_top += 1
+
+        # Visit the neighbors of v outside of its new community as well
+        if requeue:
+            for e in range(first, last):
+                u = indices[e]
+                if not queued[u] and membership[u] != best:
+                    queued[u] = True
+                    queue[(head + count) % capacity] = u
+                    count += 1
+
+    state[0] = head
+    state[1] = count
+    state[2] = free_top
+    return visits, moves
+
+
+def cut_sizes(indptr: Array, indices: Array, weights: Array, start: int, stop: int, lo: int, membership: Array, cut: Array) -> None:
+    """Calculate the total weight of the edges between each of the nodes `start, …, stop-1` and the rest of its community."""
+    for v in range(start, stop):
+        s = membership[v]
+        total = 0.0
+        for e in range(indptr[v - start] - lo, indptr[v - start + 1] - lo):
+            u = indices[e]
+            if u != v and membership[u] == s:
+                total += weights[e]
+        cut[v] = total
+
+
+def refine(
+    indptr: Array,
+    indices: Array,
+    weights: Array,
+    start: int,
+    lo: int,
+    nodes: Array,
+    uniforms: Array,
+    membership: Array,
+    node_weights: Array,
+    x: Array,
+    size_s: Array,
+    cut: Array,
+    refined: Array,
+    refined_size: Array,
+    refined_weight: Array,
+    refined_x: Array,
+    refined_cut: Array,
+    links: Array,
+    linked: Array,
+    touched: Array,
+    candidates: Array,
+    cumulative: Array,
+    groups: Array,
+    c1: Array,
+    c2: Array,
+    θ: float,
+    γ: float,
+) -> None:
+    """
+    Merge each of the given nodes, which is well-connected and still a singleton, into a well-connected community within its community.
+
+    The new community is chosen randomly among the candidates that don't degrade the quality, with weights `exp(𝛥𝓗 / θ)`. The choice
+    for `nodes[i]` uses the uniform random number `uniforms[i]` in the same way as `random.choices` does.
+    """
+    for i in range(len(nodes)):
+        v = nodes[i]
+        s = membership[v]
+        n_v = node_weights[v]
+        if refined_size[v] != 1 or cut[v] < γ * n_v * (size_s[s] - n_v):
+            continue
+
+        # Sum up the weights of the edges from v into the refined communities within its community
+        n_touched = 0
+        for e in range(indptr[v - start] - lo, indptr[v - start + 1] - lo):
+            u = indices[e]
+            if u != v and membership[u] == s:
+                c = refined[u]
+                if not linked[c]:
+                    linked[c] = True
+                    touched[n_touched] = c
+                    n_touched += 1
+                links[c] += weights[e]
+
+        # Collect the well-connected communities, for which the quality doesn't degrade (staying put has a delta of 0)
+        x_v = x[v]
+        a, b = c1[groups[v]], c2[groups[v]]
+        candidates[0] = v
+        cumulative[0] = 0.0
+        n_candidates = 1
+        top = 0.0
+        for j in range(n_touched):
+            c = touched[j]
+            if refined_cut[c] >= γ * refined_weight[c] * (size_s[s] - refined_weight[c]):
+                delta = a * links[c] - b * x_v * refined_x[c]
+                if delta >= 0:
+                    candidates[n_candidates] = c
+                    cumulative[n_candidates] = delta
+                    n_candidates += 1
+                    top = max(top, delta)
+
+        # Choose randomly, shifting the exponents by their maximum for numerical stability
+        total = 0.0
+        for j in range(n_candidates):
+            total += exp((cumulative[j] - top) / θ)
+            cumulative[j] = total
+        r = uniforms[i] * total
+        chosen = candidates[n_candidates - 1]
+        for j in range(n_candidates - 1):
+            if r < cumulative[j]:
+                chosen = candidates[j]
+                break
+
+        if chosen != v:
+            refined[v] = chosen
+            refined_size[chosen] += 1
+            refined_size[v] = 0
+            refined_weight[chosen] += n_v
+            refined_x[chosen] += x_v
+            refined_cut[chosen] += cut[v] - 2 * links[chosen]
+            refined_weight[v] = 0.0
+            refined_x[v] = 0.0
+            refined_cut[v] = 0.0
+
+        for j in range(n_touched):
+            links[touched[j]] = 0.0
+            linked[touched[j]] = False
@@ -0,0 +1,247 @@
+"""
+Array-based implementations of the Leiden and the hierarchical Leiden algorithm.
+
+These implementations process graphs given as sparse adjacency matrices (such as `scipy.sparse.csr_matrix`), as arrays of edges
+`(src, dst, weight)` or as `CSRGraph`s without converting them into NetworkX graphs, and represent partitions as membership arrays,
+mapping every node to the index of its community. They are used by `leiden` and `hierarchical_leiden` for such inputs.
+"""
+
+from __future__ import annotations
+
+from time import monotonic
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from heirarchical_leiden.csr import CSRGraph, IntArray
+from heirarchical_leiden.hooks import LeidenHooks, SubtreePath
+from heirarchical_leiden.kernels import aggregate_graph, move_nodes_queue, quality, refine_partition
+from heirarchical_leiden.ordering import Ordering, node_order
+from heirarchical_leiden.quality_functions import QualityFunction
+from heirarchical_leiden.utils import TerminationReason
+
+# A graph given as a CSRGraph, a sparse adjacency matrix, or a tuple of arrays (src, dst) or (src, dst, weight)
+ArrayGraph = CSRGraph | tuple[npt.ArrayLike, ...] | Any
+
+
+def as_csr_graph(G: ArrayGraph) -> CSRGraph:
+    """
+    Convert the given graph into a `CSRGraph`.
+
+    Sparse matrices are read as adjacency matrices of undirected graphs: they are symmetrized by taking the larger one of the entries
+    `A[i, j]` and `A[j, i]` as the weight of the edge, so that a (lower or upper) triangle of a symmetric matrix describes the same graph.
+    Tuples `(src, dst)` or `(src, dst, weight)` list every edge once, with a default weight of 1.
+    """
+    if isinstance(G, CSRGraph):
+        return G
+    if isinstance(G, tuple) and len(G) in (2, 3):
+        return CSRGraph.from_edges(*G)
+    if hasattr(G, "tocsr"):
+        A = G.tocsr()
+        if A.shape[0] != A.shape[1]:
+            raise ValueError(f"An adjacency matrix has to be square, but has shape {A.shape}.")
+        # Symmetrize the matrix, then use its upper triangle (including the diagonal), which lists every edge once
+        A = A.maximum(A.T).tocsr()
+        rows = np.repeat(np.arange(A.shape[0], dtype=np.int64), np.diff(A.indptr))
+        cols = np.asarray(A.indices, dtype=np.int64)
+        upper = rows <= cols
+        return CSRGraph.from_edges(rows[upper], cols[upper], np.asarray(A.data, dtype=np.float64)[upper], A.shape[0])
+    raise TypeError(f"Cannot interpret an object of type {type(G).__name__} as a graph.")
+
+
+def _unpermute(membership: IntArray, order: IntArray) -> IntArray:
+    """Map a membership array of a renumbered graph (see `CSRGraph.permute`) back to the original nodes."""
+    result = np.empty_like(membership)
+    result[order] = membership
+    return result
+
+
+def consecutive_labels(labels: npt.ArrayLike) -> IntArray:
+    """Number the communities of the given membership array consecutively, starting at 0."""
+    _, consecutive = np.unique(np.asarray(labels, dtype=np.int64), return_inverse=True)
+    return consecutive.astype(np.int64)
+
+
+def array_leiden(
+    G: ArrayGraph,
+    𝓗: QualityFunction[int],
+    membership: npt.ArrayLike | None = None,
+    θ: float = 0.3,
+    γ: float = 0.05,
+    *,
+    max_levels: int | None = None,
+    max_iterations: int | None = None,
+    min_quality_gain: float | None = None,
+    time_budget: float | None = None,
+    hooks: LeidenHooks | None = None,
+    groups: npt.ArrayLike | None = None,
+    ordering: Ordering | None = None,
+) -> IntArray:
+    """
+    Perform the Leiden algorithm on a graph in array form, with the same parameters as `leiden`.
+
+    `membership` optionally gives the partition to start with. Only `Modularity` and `CPM` are supported as quality functions.
+    `groups` optionally divides the nodes into groups `0, …, k-1` without edges between them, which are then clustered as separate
+    graphs, each with the quality function evaluated on its own (see `heirarchical_leiden.batch`).
+
+    :returns: An array mapping every node of G to the index of its community. The reason for which the algorithm stopped is reported to
+        `hooks.on_termination`, as the array can't record it.
+    """
+    graph = as_csr_graph(G)
+    if ordering is not None:
+        # Cluster the renumbered graph, mapping its membership array back to the original nodes
+        order = node_order(graph, ordering)
+        start = None if membership is None else np.asarray(membership)[order]
+        permuted_groups = None if groups is None else np.asarray(groups)[order]
+        permuted = graph.permute(order)
+        membership = array_leiden(
+            permuted,
+            𝓗,
+            start,
+            θ,
+            γ,
+            max_levels=max_levels,
+            max_iterations=max_iterations,
+            min_quality_gain=min_quality_gain,
+            time_budget=time_budget,
+            hooks=hooks,
+            groups=permuted_groups,
+        )
+        return _unpermute(membership, order)
+
+    deadline = None if time_budget is None else monotonic() + time_budget
+
+    # The mapping of the original nodes to the nodes of the current (aggregate) graph, and the partition 𝓟 of the current graph
+    nodes: IntArray = np.arange(graph.order(), dtype=np.int64)
+    𝓟: list[int] = list(range(graph.order())) if membership is None else consecutive_labels(membership).tolist()
+    𝓟ₚ: tuple[int, list[int]] | None = None
+    group_of: IntArray | None = None if groups is None else np.asarray(groups, dtype=np.int64)
+
+    level = 0
+    q: float | None = None
+    while True:
+        𝓟 = move_nodes_queue(graph, 𝓟, 𝓗, max_iterations, deadline, hooks, group_of)
+        𝓟 = consecutive_labels(𝓟).tolist()
+        level += 1
+
+        # Terminate under the same conditions as `leiden` does
+        if hooks is not None:
+            hooks.on_progress({"kind": "level", "path": (), "level": level, "nodes": graph.order(), "communities": max(𝓟, default=-1) + 1})
+        reason: TerminationReason | None = None
+        if hooks is not None and hooks.should_stop():
+            reason = TerminationReason.CANCELLED
+        elif deadline is not None and monotonic() >= deadline:
+            reason = TerminationReason.TIME_BUDGET
+        elif max(𝓟, default=-1) + 1 == graph.order() or (graph.order(), 𝓟) == 𝓟ₚ:
+            reason = TerminationReason.CONVERGED
+        elif max_levels is not None and level >= max_levels:
+            reason = TerminationReason.MAX_LEVELS
+        elif min_quality_gain is not None:
+            q_previous, q = q, quality(𝓗, graph, 𝓟, group_of)
+            if q_previous is not None and q - q_previous < min_quality_gain * abs(q_previous):
+                reason = TerminationReason.MIN_QUALITY_GAIN
+        if reason is not None:
+            if hooks is not None:
+                hooks.on_termination(reason)
+            break
+        𝓟ₚ = (graph.order(), 𝓟)
+
+        # Refine the partition, aggregate the graph based on the refined partition and lift 𝓟 to the aggregate graph
+        refined = refine_partition(graph, 𝓟, 𝓗, θ, γ, None, group_of)
+        graph = aggregate_graph(graph, refined)
+        lifted = np.zeros(graph.order(), dtype=np.int64)
+        lifted[refined] = 𝓟
+        𝓟 = lifted.tolist()
+        # Refined communities never span several groups, so every aggregate node belongs to the group of the nodes it consists of
+        if group_of is not None:
+            aggregate_groups = np.zeros(graph.order(), dtype=np.int64)
+            aggregate_groups[refined] = group_of
+            group_of = aggregate_groups
+        nodes = refined[nodes]
+
+    return np.asarray(𝓟, dtype=np.int64)[nodes]
+
+
+def array_hierarchical_leiden(
+    G: ArrayGraph,
+    𝓗: QualityFunction[int],
+    θ: float = 0.3,
+    γ: float = 0.05,
+    partition_max_size: int = 64,
+    *,
+    hooks: LeidenHooks | None = None,
+    ordering: Ordering | None = None,
+) -> list[IntArray]:
+    """
+    Perform the hierarchical Leiden algorithm on a graph in array form, with the same parameters as `hierarchical_leiden`.
+
+    :returns: A list of membership arrays, one per level of the hierarchy. Every level refines the previous one: communities which are
+        larger than `partition_max_size` are split up on the next level, the others are carried over unchanged.
+    """
+    graph = as_csr_graph(G)
+    if ordering is not None:
+        # Renumber the graph once, as the subgraphs of its communities keep the relative order of their nodes
+        order = node_order(graph, ordering)
+        return [
+            _unpermute(level, order) for level in array_hierarchical_leiden(graph.permute(order), 𝓗, θ, γ, partition_max_size, hooks=hooks)
+        ]
+
+    levels = _array_hierarchical_leiden(graph, 𝓗, θ, γ, partition_max_size, hooks, ())
+    if levels is None:
+        return [np.zeros(graph.order(), dtype=np.int64)]
+    return levels
+
+
+def _array_hierarchical_leiden(
+    graph: CSRGraph, 𝓗: QualityFunction[int], θ: float, γ: float, partition_max_size: int, hooks: LeidenHooks | None, path: SubtreePath
+) -> list[IntArray] | None:
+    membership = array_leiden(graph, 𝓗, None, θ, γ, hooks=hooks.at(path) if hooks is not None else None)
+    k = int(membership.max(initial=-1)) + 1
+    if hooks is not None:
+        hooks.on_progress({"kind": "subtree", "path": path, "level": len(path), "nodes": graph.order(), "communities": k})
+    if k == 1:
+        return None
+
+    # Group the nodes by their community and recursively partition every community, which is too large
+    members = community_members(membership)
+    children = {
+        c: child
+        for c, nodes in enumerate(members)
+        if len(nodes) > partition_max_size
+        and not (hooks is not None and hooks.should_stop())
+        and (child := _array_hierarchical_leiden(graph.subgraph(nodes), 𝓗, θ, γ, partition_max_size, hooks, (*path, c)))
+    }
+    return combine_levels(membership, members, children)
+
+
+def community_members(membership: IntArray) -> list[IntArray]:
+    """Group the nodes by their community, returning the (sorted) nodes of every community of the given membership array."""
+    k = int(membership.max(initial=-1)) + 1
+    order = np.argsort(membership, kind="stable")
+    bounds = np.searchsorted(membership[order], np.arange(k + 1))
+    return [order[bounds[c] : bounds[c + 1]] for c in range(k)]
+
+
+def combine_levels(membership: IntArray, members: list[IntArray], children: dict[int, list[IntArray]]) -> list[IntArray]:
+    """
+    Combine the membership array of a graph with the levels of the hierarchies computed for some of its communities into one list of levels.
+
+    `members` are the nodes of every community (see `community_members`), `children` the levels computed for the subgraphs induced by
+    them. The communities of every level are numbered consecutively in the order of their parents.
+    """
+    levels = [membership]
+    for depth in range(max((len(child) for child in children.values()), default=0)):
+        level = np.zeros(len(membership), dtype=np.int64)
+        offset = 0
+        for c, nodes in enumerate(members):
+            if c in children:
+                # Children with fewer levels than others carry their last level over to the following ones
+                child_level = children[c][min(depth, len(children[c]) - 1)]
+                level[nodes] = child_level + offset
+                offset += int(child_level.max()) + 1
+            else:
+                level[nodes] = offset
+                offset += 1
+        levels.append(level)
+    return levels
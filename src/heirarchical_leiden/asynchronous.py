@@ -0,0 +1,123 @@
+"""
+An asyncio front end for `leiden` and `hierarchical_leiden`.
+
+The clustering runs in a worker thread, so that it doesn't block the event loop. Its progress is streamed to the event loop as
+`ProgressEvent`s, and it can be cancelled cooperatively: the worker checks for cancellation between the node visits of the local moving
+phase (see `LeidenHooks.should_stop`). An `AsyncClusterer` limits the number of clusterings running at the same time, queueing further
+requests, so that a few slow clusterings can't occupy all workers of a service.
+
+While the NetworkX implementation holds the GIL, the compiled kernels of the array-based implementation release it (see
+`heirarchical_leiden.kernels`), so that graphs in array form are clustered concurrently to the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Generator
+from concurrent.futures import Executor
+from functools import partial
+from threading import Event
+from typing import Any, Generic, TypeVar
+
+from heirarchical_leiden.hierarchical_leiden import hierarchical_leiden
+from heirarchical_leiden.hooks import LeidenHooks, ProgressEvent
+from heirarchical_leiden.leiden import leiden
+
+R = TypeVar("R")
+
+
+class _JobHooks(LeidenHooks):
+    """Hooks forwarding the progress of a job to the event loop, and stopping it once it was cancelled."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, events: asyncio.Queue[ProgressEvent | None]) -> None:
+        self.loop = loop
+        self.events = events
+        self.cancelled = Event()
+
+    def should_stop(self) -> bool:
+        return self.cancelled.is_set()
+
+    def on_progress(self, event: ProgressEvent) -> None:
+        self.loop.call_soon_threadsafe(self.events.put_nowait, event)
+
+
+class ClusteringJob(Generic[R]):
+    """
+    A clustering running in the background, see `AsyncClusterer`.
+
+    Awaiting the job (or `result()`) returns the result of the clustering. `events()` streams its progress, and `cancel()` stops it.
+    """
+
+    def __init__(self, run: Callable[[LeidenHooks], R], semaphore: asyncio.Semaphore, executor: Executor | None) -> None:
+        loop = asyncio.get_running_loop()
+        self._events: asyncio.Queue[ProgressEvent | None] = asyncio.Queue()
+        self._hooks = _JobHooks(loop, self._events)
+        self._task = loop.create_task(self._run(run, semaphore, executor))
+
+    async def _run(self, run: Callable[[LeidenHooks], R], semaphore: asyncio.Semaphore, executor: Executor | None) -> R:
+        try:
+            async with semaphore:
+                if self._hooks.cancelled.is_set():
+                    raise asyncio.CancelledError
+                future = asyncio.get_running_loop().run_in_executor(executor, run, self._hooks)
+                try:
+                    result = await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # Stop the worker and wait for it, so that it doesn't keep running without occupying a slot of the semaphore
+                    self._hooks.cancelled.set()
+                    await asyncio.gather(future, return_exceptions=True)
+                    raise
+            # A cancelled clustering returns an incomplete result, which is discarded
+            if self._hooks.cancelled.is_set():
+                raise asyncio.CancelledError
+            return result
+        finally:
+            # Mark the end of the progress events
+            self._events.put_nowait(None)
+
+    async def events(self) -> AsyncIterator[ProgressEvent]:
+        """Stream the progress events of the clustering, until it is finished (this can be iterated over only once)."""
+        while (event := await self._events.get()) is not None:
+            yield event
+
+    async def result(self) -> R:
+        """Wait for the result of the clustering. Raises `asyncio.CancelledError`, if it was cancelled."""
+        return await asyncio.shield(self._task)
+
+    def __await__(self) -> Generator[Any, None, R]:
+        return self.result().__await__()
+
+    def cancel(self) -> None:
+        """Cancel the clustering. The worker stops at its next check for cancellation."""
+        self._hooks.cancelled.set()
+        self._task.cancel()
+
+    def done(self) -> bool:
+        """Determine whether the clustering is finished, has failed, or was cancelled."""
+        return self._task.done()
+
+
+class AsyncClusterer:
+    """An asyncio front end for running clusterings in worker threads, of which at most `max_concurrency` run at the same time."""
+
+    def __init__(self, max_concurrency: int = 1, executor: Executor | None = None) -> None:
+        """
+        Create a new front end.
+
+        `executor` is the executor to run the clusterings on, it defaults to the event loop's default executor. Note that it should be
+        a thread pool, as the progress events and cancellations are exchanged with the workers through shared memory.
+        """
+        self.executor = executor
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def leiden(self, *args: Any, **kwargs: Any) -> ClusteringJob[Any]:
+        """Start a clustering using `leiden`, with the given arguments (except for `hooks`). This has to be called in an event loop."""
+        return ClusteringJob(partial(_call_with_hooks, leiden, args, kwargs), self._semaphore, self.executor)
+
+    def hierarchical_leiden(self, *args: Any, **kwargs: Any) -> ClusteringJob[Any]:
+        """Start a clustering using `hierarchical_leiden`, with the given arguments (except for `hooks`), see `leiden`."""
+        return ClusteringJob(partial(_call_with_hooks, hierarchical_leiden, args, kwargs), self._semaphore, self.executor)
+
+
+def _call_with_hooks(f: Callable[..., R], args: tuple[Any, ...], kwargs: dict[str, Any], hooks: LeidenHooks) -> R:
+    return f(*args, **kwargs, hooks=hooks)
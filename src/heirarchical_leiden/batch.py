@@ -0,0 +1,86 @@
+"""
+Batched clustering of many small graphs in one call.
+
+Clustering a small graph costs little more than the overhead of a single call of the Leiden algorithm, so clustering many of them one by
+one is dominated by that overhead. Instead, the graphs are packed into a single block-diagonal graph (see `CSRGraph.block_diagonal`),
+which is clustered in one run. As there are no edges between the graphs, nodes never move into a community of another graph, and the
+quality function is normalized per graph (e.g. by the total edge weight of each graph for `Modularity`), so every graph is partitioned
+just as if it was clustered on its own.
+
+Large batches are split into chunks, which are clustered in parallel on a process pool. Every chunk is processed with a seed derived from
+the given seed and the index of the chunk, so the result doesn't depend on the number of workers (but on the chunk size).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from heirarchical_leiden.array_leiden import ArrayGraph, array_leiden, consecutive_labels
+from heirarchical_leiden.conversion import to_csr_graph, to_result
+from heirarchical_leiden.csr import CSRGraph, IntArray
+from heirarchical_leiden.parallel import derive_seed
+from heirarchical_leiden.quality_functions import QualityFunction
+from heirarchical_leiden.utils import Partition, seeded_random
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+def _cluster_chunk(graphs: Sequence[CSRGraph], 𝓗: QualityFunction[int], θ: float, γ: float, seed: int) -> list[IntArray]:
+    # Cluster the packed graphs of a chunk in one run, splitting the membership array of the packed graph into one per graph
+    packed, offsets = CSRGraph.block_diagonal(graphs)
+    groups = np.repeat(np.arange(len(graphs), dtype=np.int64), np.diff(offsets))
+    with seeded_random(seed):
+        membership = array_leiden(packed, 𝓗, None, θ, γ, groups=groups)
+    return [consecutive_labels(membership[offsets[i] : offsets[i + 1]]) for i in range(len(graphs))]
+
+
+def batch_leiden(
+    graphs: Sequence[Graph | ArrayGraph],
+    𝓗: QualityFunction[int],
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    *,
+    seed: int = 0,
+    chunk_size: int = 1024,
+    max_workers: int = 1,
+) -> list[Partition[Any] | IntArray]:
+    """
+    Perform the Leiden algorithm on every one of the given graphs, packing them into a few large graphs to reduce the overhead per graph.
+
+    Parameters
+    ----------
+    graphs : Sequence[Graph | ArrayGraph]
+        The graphs to process, each either as a NetworkX graph or in array form (see `leiden`).
+    𝓗 : QualityFunction[int]
+        The quality function to optimize, either `Modularity` or `CPM`.
+    θ, γ, weight
+        The same as for `leiden`.
+    seed : int, optional
+        The seed from which the seeds of the chunks are derived, default value of 0.
+    chunk_size : int, optional
+        The number of graphs packed into one graph, default value of 1024.
+    max_workers : int, optional
+        The number of worker processes to distribute the chunks over, default value of 1, which processes them in this process.
+
+    :returns: The partitions of the graphs, in the same order. For graphs in array form, an array mapping every node to the index of its
+        community.
+    """
+    converted = [to_csr_graph(G, weight) for G in graphs]
+    chunks = [[graph for graph, _ in converted[i : i + chunk_size]] for i in range(0, len(converted), chunk_size)]
+    tasks = [(chunk, 𝓗, θ, γ, derive_seed(seed, i)) for i, chunk in enumerate(chunks)]
+
+    if max_workers == 1:
+        results = [_cluster_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers) as pool:
+            futures = [pool.submit(_cluster_chunk, *task) for task in tasks]
+            results = [future.result() for future in futures]
+
+    memberships = [membership for result in results for membership in result]
+    return [to_result(G, nodes, weight, membership) for G, (_, nodes), membership in zip(graphs, converted, memberships)]
@@ -0,0 +1,217 @@
+"""
+A persistent cache for the results of `hierarchical_leiden`, keyed on a fingerprint of the input graph and the parameters.
+
+The fingerprint of a graph is a hash over its nodes and its edge arrays, sorted canonically, so that it doesn't depend on the order in
+which the edges were added to the graph. Combined with the quality function, the parameters and the seed of the random number generator,
+it identifies a result uniquely. The results are stored on disk, evicting the least recently used ones once the cache exceeds its size.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import random
+from hashlib import blake2b
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import time_ns
+from typing import TYPE_CHECKING, Any, cast
+
+import numpy as np
+
+from heirarchical_leiden.array_leiden import ArrayGraph, as_csr_graph
+from heirarchical_leiden.csr import CSRGraph, IntArray
+from heirarchical_leiden.hierarchical_leiden import HierarchicalPartition, hierarchical_leiden
+from heirarchical_leiden.quality_functions import QualityFunction
+from heirarchical_leiden.utils import Partition, TerminationReason, is_graph, package_version, preprocess_graph
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+def graph_fingerprint(G: Graph | ArrayGraph, weight: str | None = None) -> str:
+    """
+    Calculate a structural fingerprint of the given graph, which is the same for equal graphs, regardless of the order of their edges.
+
+    For NetworkX graphs, the node labels and their order are part of the fingerprint, as they determine the result of the clustering.
+    Edges without the `weight` attribute count with a weight of 1, other attributes are ignored.
+    """
+    h = blake2b(digest_size=16)
+    if is_graph(G):
+        graph, nodes = CSRGraph.from_networkx(G, weight)
+        h.update(repr(nodes).encode())
+    else:
+        graph = as_csr_graph(G)
+    h.update(np.int64(graph.order()).tobytes())
+    h.update(np.ascontiguousarray(graph.node_weights, dtype=np.float64).tobytes())
+
+    # Hash the edges (u, v, w) with u ≤ v, sorted by u, then v
+    chunks = list(graph.edges())
+    src, dst, w = (np.concatenate([chunk[i] for chunk in chunks]) if chunks else np.zeros(0) for i in range(3))
+    order = np.lexsort((dst, src))
+    for array, dtype in ((src, np.int64), (dst, np.int64), (w, np.float64)):
+        h.update(np.ascontiguousarray(array[order], dtype=dtype).tobytes())
+    return h.hexdigest()
+
+
+# The version of the format of the cache entries, which is part of every key, so that entries of an older format are never read
+CACHE_FORMAT = 1
+
+
+def result_key(fingerprint: str, 𝓗: QualityFunction[Any], **parameters: Any) -> str:
+    """
+    Combine the fingerprint of a graph with the quality function (its type and attributes) and further parameters into a cache key.
+
+    The key also covers the version of the package and the format of the cache, as the results of the same run can change between
+    versions. Entries of other versions are thus never reused, and are evicted eventually.
+    """
+    quality_function = (type(𝓗).__module__, type(𝓗).__qualname__, sorted(vars(𝓗).items()))
+    h = blake2b(digest_size=16)
+    h.update(repr((CACHE_FORMAT, package_version(), fingerprint, quality_function, sorted(parameters.items()))).encode())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    An on-disk cache of pickled results with least-recently-used eviction.
+
+    Every entry is stored in a file of its own, whose modification time records when it was last used. Whenever an entry is added and
+    the total size of the cache exceeds `max_bytes`, the least recently used entries are removed.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str], max_bytes: int = 2**30) -> None:
+        """Create a cache stored in the given directory (which is created if it doesn't exist), holding up to `max_bytes` of results."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._clock = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pkl"
+
+    def _touch(self, path: Path) -> None:
+        # Use a strictly increasing clock, so that the order of uses is preserved even if the system clock is coarse
+        self._clock = max(time_ns(), self._clock + 1)
+        os.utime(path, ns=(self._clock, self._clock))
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get the entry with the given key, marking it as used, or `default` if there is no such entry."""
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                value = pickle.load(f)
+            self._touch(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            # The entry doesn't exist or was evicted (or is being written) concurrently
+            return default
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store the given value under the key, evicting the least recently used entries if the cache grows too large."""
+        # Write to a temporary file first, so that no other process reads a partially written entry
+        with NamedTemporaryFile("wb", dir=self.directory, suffix=".tmp", delete=False) as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, self._path(key))
+        self._touch(self._path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the total size of the cache is at most `max_bytes`."""
+        entries = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def size(self) -> int:
+        """Get the total size of all entries in bytes."""
+        return sum(path.stat().st_size for path in self.directory.glob("*.pkl"))
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        for path in self.directory.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+
+
+def default_cache_directory() -> Path:
+    """Get the default directory of the result cache, which is `hierarchical-leiden` in the user's cache directory."""
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "hierarchical-leiden"
+
+
+def cached_hierarchical_leiden(
+    G: Graph | ArrayGraph,
+    𝓗: QualityFunction[Any],
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    partition_max_size: int = 64,
+    *,
+    seed: int = 0,
+    cache: ResultCache | str | os.PathLike[str] | None = None,
+) -> HierarchicalPartition[Any] | list[IntArray]:
+    """
+    Perform the hierarchical Leiden algorithm like `hierarchical_leiden`, reusing the result of an earlier run with the same input.
+
+    Parameters
+    ----------
+    G, 𝓗, θ, γ, weight, partition_max_size
+        The same as for `hierarchical_leiden`.
+    seed : int, optional
+        The seed of the random number generator used for the run, default value of 0. The state of the global random number generator is
+        restored afterwards.
+    cache : ResultCache | str | os.PathLike | None, optional
+        The cache, or the directory of the cache, to use. Defaults to a cache in the user's cache directory (see `default_cache_directory`).
+
+    :returns: The same result as `hierarchical_leiden` with the random number generator seeded with `seed`.
+    """
+    if not isinstance(cache, ResultCache):
+        cache = ResultCache(default_cache_directory() if cache is None else cache)
+
+    key = result_key(graph_fingerprint(G, weight), 𝓗, θ=θ, γ=γ, partition_max_size=partition_max_size, seed=seed)
+    stored = cache.get(key)
+    if stored is not None:
+        return cast("list[IntArray]", stored) if not is_graph(G) else _restore(preprocess_graph(G, weight), stored)
+
+    # Run the algorithm with a seeded random number generator, restoring the state of the generator afterwards
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        result: HierarchicalPartition[Any] | list[IntArray] = hierarchical_leiden(G, 𝓗, None, θ, γ, weight, partition_max_size)
+    finally:
+        random.setstate(state)
+
+    cache.put(key, _store(result) if isinstance(result, dict) else result)
+    return result
+
+
+def _store(𝓗𝓟: HierarchicalPartition[Any]) -> dict[str, Any]:
+    # Partitions reference their graphs, so only store their communities; the graphs are provided again when restoring them.
+    𝓟 = 𝓗𝓟["partition"]
+    return {
+        "communities": [list(C) for C in 𝓟],
+        "weight": 𝓟._weight,
+        "termination_reason": 𝓟.termination_reason and 𝓟.termination_reason.value,
+        "level": 𝓗𝓟["level"],
+        "children": {idx: _store(child) for idx, child in 𝓗𝓟["children"].items()},
+    }
+
+
+def _restore(G: Graph, stored: dict[str, Any]) -> HierarchicalPartition[Any]:
+    # Rebuild the partitions on the same (sub)graphs as `hierarchical_leiden` creates them on
+    communities = stored["communities"]
+    𝓟: Partition[Any] = Partition.from_partition(G, communities, stored["weight"])
+    𝓟.termination_reason = stored["termination_reason"] and TerminationReason(stored["termination_reason"])
+    children = {idx: _restore(G.subgraph(communities[idx]).copy(), child) for idx, child in stored["children"].items()}
+    return {"partition": 𝓟, "level": stored["level"], "children": children}
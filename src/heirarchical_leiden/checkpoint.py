@@ -0,0 +1,132 @@
+"""
+Checkpointing for long runs of the hierarchical Leiden algorithm, so that they can be resumed after the process was killed.
+
+The hierarchy is built one subtree at a time, and the partition of every subtree (starting with the top level) is written to the
+checkpoint directory as soon as it is computed. Resuming a run loads the finished subtrees from the directory and only computes the
+missing ones. Just as in `parallel_hierarchical_leiden`, every subtree is processed with a seed derived from the given seed and its path
+in the hierarchy, so a resumed run yields the same result as an uninterrupted one (and as `parallel_hierarchical_leiden`).
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from heirarchical_leiden.array_leiden import ArrayGraph, array_leiden, community_members
+from heirarchical_leiden.cache import graph_fingerprint, result_key
+from heirarchical_leiden.conversion import assemble_hierarchy, to_csr_graph
+from heirarchical_leiden.csr import IntArray
+from heirarchical_leiden.hierarchical_leiden import HierarchicalPartition
+from heirarchical_leiden.hooks import SubtreePath
+from heirarchical_leiden.parallel import derive_seed
+from heirarchical_leiden.quality_functions import QualityFunction
+from heirarchical_leiden.utils import package_version, seeded_random
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+_MANIFEST = "manifest.pkl"
+
+
+def _write_atomically(path: Path, write: Any) -> None:
+    # Write to a temporary file first, so that a killed process never leaves a partially written file behind
+    with NamedTemporaryFile("wb", dir=path.parent, suffix=".tmp", delete=False) as f:
+        write(f)
+    os.replace(f.name, path)
+
+
+def _subtree_file(directory: Path, path: SubtreePath) -> Path:
+    return directory / ("subtree-" + "-".join(map(str, path)) + ".npy")
+
+
+def checkpointed_hierarchical_leiden(
+    G: Graph | ArrayGraph,
+    𝓗: QualityFunction[int],
+    directory: str | os.PathLike[str],
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    partition_max_size: int = 64,
+    *,
+    seed: int = 0,
+) -> HierarchicalPartition[Any] | list[IntArray]:
+    """
+    Perform the hierarchical Leiden algorithm, checkpointing every finished subtree to the given directory.
+
+    If the directory already contains the checkpoint of an interrupted run with the same graph and parameters, that run is resumed,
+    skipping all finished subtrees. The checkpoint is left in place after the run; remove the directory once it is no longer needed.
+
+    Parameters
+    ----------
+    G, 𝓗, θ, γ, weight, partition_max_size, seed
+        The same as for `parallel_hierarchical_leiden`.
+    directory : str | os.PathLike
+        The directory to write the checkpoint to, which is created if it doesn't exist.
+
+    :returns: The same result as `parallel_hierarchical_leiden` with the given seed.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    parameters = {"𝓗": 𝓗, "θ": θ, "γ": γ, "weight": weight, "partition_max_size": partition_max_size, "seed": seed}
+    fingerprint = graph_fingerprint(G, weight)
+    key = result_key(fingerprint, 𝓗, θ=θ, γ=γ, weight=weight, partition_max_size=partition_max_size, seed=seed)
+
+    # Check that an existing checkpoint belongs to the same run, or record the run in a new checkpoint. The key covers the version of
+    # the package, as other versions may partition the subtrees differently, but a mismatch of the version is reported separately.
+    manifest = directory / _MANIFEST
+    version = package_version()
+    if manifest.exists():
+        with manifest.open("rb") as f:
+            stored = pickle.load(f)
+        if stored.get("version") != version:
+            raise ValueError(
+                f"The checkpoint in {directory} was made by version {stored.get('version', 'unknown')} of hierarchical-leiden, but this is "
+                f"version {version}. Resume it with that version, or remove the directory to start over."
+            )
+        if stored["key"] != key:
+            raise ValueError(f"The directory {directory} contains the checkpoint of a run with a different graph or different parameters.")
+    else:
+        _write_atomically(manifest, lambda f: pickle.dump({"key": key, "version": version, "fingerprint": fingerprint, **parameters}, f))
+
+    graph, labels = to_csr_graph(G, weight)
+    results: dict[SubtreePath, IntArray] = {}
+
+    # Build the hierarchy depth first, so that finished subtrees are complete as early as possible
+    stack: list[tuple[SubtreePath, IntArray]] = [((), np.arange(graph.order(), dtype=np.int64))]
+    while stack:
+        path, nodes = stack.pop()
+        file = _subtree_file(directory, path)
+        if file.exists():
+            membership = np.load(file)
+        else:
+            # Seed the subtree's run, leaving the state of the caller's random number generator unchanged
+            with seeded_random(derive_seed(seed, *path)):
+                membership = array_leiden(graph if len(path) == 0 else graph.subgraph(nodes), 𝓗, None, θ, γ)
+            _write_atomically(file, lambda f: np.save(f, membership))
+        results[path] = membership
+
+        if int(membership.max(initial=-1)) > 0:
+            children = [((*path, c), nodes[members]) for c, members in enumerate(community_members(membership))]
+            stack.extend(child for child in reversed(children) if len(child[1]) > partition_max_size)
+
+    return assemble_hierarchy(G, weight, labels, results)
+
+
+def resume_hierarchical_leiden(G: Graph | ArrayGraph, directory: str | os.PathLike[str]) -> HierarchicalPartition[Any] | list[IntArray]:
+    """
+    Resume an interrupted run of `checkpointed_hierarchical_leiden` from its checkpoint directory, using the parameters recorded there.
+
+    :returns: The same result as the interrupted run would have returned.
+    """
+    with (Path(directory) / _MANIFEST).open("rb") as f:
+        stored = pickle.load(f)
+    if graph_fingerprint(G, stored["weight"]) != stored["fingerprint"]:
+        raise ValueError(f"The checkpoint in {directory} was made for a different graph.")
+    parameters = {name: stored[name] for name in ("θ", "γ", "weight", "partition_max_size", "seed")}
+    return checkpointed_hierarchical_leiden(G, stored["𝓗"], directory, **parameters)
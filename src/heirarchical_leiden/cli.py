@@ -0,0 +1,218 @@
+"""
+Command-line interface, clustering graphs given as edge-list files.
+
+Run `hierarchical-leiden <edge list> [options]` (or `python -m heirarchical_leiden.cli`), see `hierarchical-leiden --help`. An edge list
+has one edge per line, given by the ids of its end points and an optional weight, separated by commas, tabs or spaces, such as
+`datasets/jazz_data/edges.csv` or `datasets/cora_data/cora.cites`. A header line and lines starting with `#` or `%` are skipped. The
+file is read in chunks of lines, which are parsed into arrays, and the graph is built from these arrays in CSR format.
+
+The result is written in one of two formats, depending on the name of the output file:
+
+* Text (the default, written to the standard output if no file is given): a header line, followed by a tab-separated line per node with
+  its id and the index of its community on every level of the hierarchy (a single level with `--flat`).
+* NumPy (for file names ending with `.npz`): a compressed archive of the arrays `nodes`, the node ids, and `levels`, the membership arrays
+  of the levels, with a row per level.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import pstats
+import random
+import sys
+from collections.abc import Sequence
+from itertools import islice
+from time import monotonic, perf_counter
+from typing import Any, cast
+
+import numpy as np
+import numpy.typing as npt
+
+from heirarchical_leiden.csr import CSRGraph, IntArray
+from heirarchical_leiden.hierarchical_leiden import hierarchical_leiden
+from heirarchical_leiden.hooks import LeidenHooks
+from heirarchical_leiden.leiden import leiden
+from heirarchical_leiden.memory import MemoryLimitExceededError
+from heirarchical_leiden.ordering import ORDERINGS
+from heirarchical_leiden.parallel import leiden_restarts
+from heirarchical_leiden.quality_functions import CPM, Modularity, QualityFunction
+from heirarchical_leiden.scheduler import parallel_hierarchical_leiden
+
+# The column of the optional edge weights in an edge list, following the ids of the end points
+_WEIGHT_COLUMN = 2
+
+
+def read_edge_list(path: str, chunk_size: int = 2**20) -> tuple[npt.NDArray[Any], CSRGraph]:
+    """
+    Read a graph from an edge-list file (see `heirarchical_leiden.cli`), parsing `chunk_size` lines at a time.
+
+    :returns: The ids of the nodes, numbered in the order of their ids (as integers if all of them are integers), and the graph.
+    """
+    ids: list[npt.NDArray[np.str_]] = []
+    weights: list[npt.NDArray[np.float64]] = []
+    # The delimiter of the fields (None for whitespace), which is determined from the first line
+    delimiter: str | None = None
+
+    with open(path) as f:
+        first = True
+        # The first line, if it isn't numeric and the next line hasn't been read yet, i.e. it isn't known yet whether it is a header
+        held: list[str] = []
+        while True:
+            chunk = list(islice(f, chunk_size))
+            lines = held + [line for line in chunk if line.strip() and not line.startswith(("#", "%"))]
+            held = []
+            # At the end of the file, `chunk` is empty, and a line held back is a lone line, i.e. an edge rather than a header
+            if first and lines and chunk:
+                delimiter = "," if "," in lines[0] else None
+                # Skip a header line, whose fields aren't numbers while those of the next line are
+                if not _is_edge(lines[0], delimiter):
+                    if len(lines) == 1:
+                        held = lines
+                        continue
+                    if _is_edge(lines[1], delimiter):
+                        lines = lines[1:]
+                first = False
+            if lines:
+                fields = np.loadtxt(lines, dtype=str, delimiter=delimiter, ndmin=2)
+                ids.append(fields[:, :_WEIGHT_COLUMN])
+                weights.append(fields[:, _WEIGHT_COLUMN].astype(np.float64) if fields.shape[1] > _WEIGHT_COLUMN else np.ones(len(fields)))
+            if not chunk:
+                break
+
+    # Number the nodes in the order of their ids, and the ends of every edge accordingly
+    all_ids: npt.NDArray[Any] = np.concatenate(ids) if ids else np.empty((0, 2), dtype=str)
+    try:
+        all_ids = all_ids.astype(np.int64)
+    except ValueError:
+        pass
+    nodes, index = np.unique(all_ids, return_inverse=True)
+    index = index.reshape(-1, 2)
+    w = np.concatenate(weights) if weights else np.ones(0)
+    return nodes, CSRGraph.from_edges(index[:, 0], index[:, 1], w, len(nodes))
+
+
+def _is_edge(line: str, delimiter: str | None) -> bool:
+    # Determine whether the line consists of numbers only, as opposed to a header line
+    try:
+        [float(field) for field in line.split(delimiter)]
+    except ValueError:
+        return False
+    return True
+
+
+class _Deadline(LeidenHooks):
+    """Hooks stopping the run after the given number of seconds."""
+
+    def __init__(self, seconds: float) -> None:
+        self.deadline = monotonic() + seconds
+
+    def should_stop(self) -> bool:
+        return monotonic() > self.deadline
+
+
+def cluster(graph: CSRGraph, 𝓗: QualityFunction[int], args: argparse.Namespace) -> list[IntArray]:
+    """Cluster the graph as requested by the parsed command-line arguments, returning the membership arrays of all levels."""
+    random.seed(args.seed)
+    θ, γ = args.theta, args.gamma
+    memory_limit = None if args.memory_limit is None else int(args.memory_limit * 2**20)
+    if args.flat:
+        if args.restarts > 1:
+            return [cast("IntArray", leiden_restarts(graph, 𝓗, args.restarts, θ, γ, seed=args.seed, max_workers=args.workers))]
+        membership = leiden(graph, 𝓗, None, θ, γ, time_budget=args.time_budget, ordering=args.ordering, memory_limit=memory_limit)
+        return [cast("IntArray", membership)]
+    if args.workers > 1:
+        levels = parallel_hierarchical_leiden(
+            graph, 𝓗, θ, γ, None, args.max_size, seed=args.seed, max_workers=args.workers, memory_limit=memory_limit
+        )
+        return cast("list[IntArray]", levels)
+    hooks = None if args.time_budget is None else _Deadline(args.time_budget)
+    levels = hierarchical_leiden(graph, 𝓗, None, θ, γ, None, args.max_size, hooks=hooks, ordering=args.ordering, memory_limit=memory_limit)
+    return cast("list[IntArray]", levels)
+
+
+def write_levels(path: str, nodes: npt.NDArray[Any], levels: Sequence[IntArray]) -> None:
+    """Write the membership arrays of the levels to the given file, in the format given by its name (see `heirarchical_leiden.cli`)."""
+    if path.endswith(".npz"):
+        np.savez_compressed(path, nodes=nodes, levels=np.array(levels, dtype=np.int64).reshape(len(levels), len(nodes)))
+        return
+
+    header = "\t".join(["node", *(f"level_{i}" for i in range(len(levels)))])
+    table = np.column_stack([nodes.astype(str), *(level.astype(str) for level in levels)]) if len(nodes) else np.empty((0, 0), dtype=str)
+    np.savetxt(sys.stdout if path == "-" else path, table, fmt="%s", delimiter="\t", header=header, comments="")
+
+
+def parser() -> argparse.ArgumentParser:
+    """Create the parser of the command-line arguments."""
+    p = argparse.ArgumentParser(
+        prog="hierarchical-leiden", description="Cluster the graph given by an edge-list file using the (hierarchical) Leiden algorithm."
+    )
+    p.add_argument("edges", help="the edge-list file: a line per edge, with the ids of its end points and an optional weight")
+    p.add_argument("-o", "--output", default="-", help="the output file, written as NumPy archive if it ends with .npz (default: stdout)")
+    p.add_argument("--flat", action="store_true", help="run the (flat) Leiden algorithm instead of computing a hierarchy")
+    p.add_argument("--quality", choices=("modularity", "cpm"), default="modularity", help="the quality function (default: modularity)")
+    p.add_argument("--resolution", type=float, default=1.0, help="the resolution of the quality function (default: 1)")
+    p.add_argument("--theta", type=float, default=0.3, help="the randomness θ of the refinement (default: 0.3)")
+    p.add_argument("--gamma", type=float, default=0.05, help="the connectivity threshold γ of the refinement (default: 0.05)")
+    p.add_argument("--max-size", type=int, default=64, help="the size up to which communities aren't split up further (default: 64)")
+    p.add_argument("--ordering", choices=ORDERINGS, help="renumber the nodes to improve the memory locality (default: none)")
+    p.add_argument("--restarts", type=int, default=1, help="with --flat, the number of runs to take the best partition of (default: 1)")
+    p.add_argument("--workers", type=int, default=1, help="the number of worker processes for restarts or subtrees (default: 1)")
+    p.add_argument("--seed", type=int, default=0, help="the seed of the random number generator (default: 0)")
+    p.add_argument("--time-budget", type=float, help="the number of seconds after which the clustering stops early (default: none)")
+    p.add_argument("--memory-limit", type=float, help="the memory limit in MiB, see heirarchical_leiden.memory (default: none)")
+    p.add_argument("--chunk-size", type=int, default=2**20, help="the number of lines of the edge list parsed at once (default: 2^20)")
+    p.add_argument("--profile", action="store_true", help="report the time taken by every phase and the hottest functions on stderr")
+    return p
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the command-line interface with the given arguments (default: those of the process), returning the exit status."""
+    p = parser()
+    args = p.parse_args(argv)
+    parallel = args.restarts > 1 if args.flat else args.workers > 1
+    if args.flat and args.restarts == 1 and args.workers > 1:
+        p.error("--workers with --flat is only supported for restarts")
+    if parallel and args.time_budget is not None:
+        p.error("--time-budget is not supported for parallel runs")
+    if args.flat and args.restarts > 1 and args.memory_limit is not None:
+        p.error("--memory-limit is not supported for restarts")
+    if parallel and args.ordering is not None:
+        p.error("--ordering is not supported for parallel runs")
+    𝓗: QualityFunction[int] = Modularity(args.resolution) if args.quality == "modularity" else CPM(args.resolution)
+
+    profiler = cProfile.Profile() if args.profile else None
+    timings: dict[str, float] = {}
+
+    start = perf_counter()
+    nodes, graph = read_edge_list(args.edges, args.chunk_size)
+    timings["read"] = perf_counter() - start
+
+    start = perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        levels = cluster(graph, 𝓗, args)
+    except MemoryLimitExceededError as error:
+        print(f"{p.prog}: {error}", file=sys.stderr)
+        return 1
+    if profiler is not None:
+        profiler.disable()
+    timings["cluster"] = perf_counter() - start
+
+    start = perf_counter()
+    write_levels(args.output, nodes, levels)
+    timings["write"] = perf_counter() - start
+
+    if profiler is not None:
+        print(f"Graph with {graph.order()} nodes and {graph.size():g} total edge weight", file=sys.stderr)
+        for i, level in enumerate(levels):
+            print(f"Level {i}: {int(level.max(initial=-1)) + 1} communities", file=sys.stderr)
+        for phase, seconds in timings.items():
+            print(f"{phase:<8}{seconds:>10.3f}s", file=sys.stderr)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(20)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
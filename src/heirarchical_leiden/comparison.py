@@ -0,0 +1,214 @@
+"""
+Metrics comparing two partitions of the same nodes, e.g. for monitoring how stable the communities are between runs.
+
+All metrics are computed from the contingency table of the two partitions, whose entry `(i, j)` is the number of nodes in community i
+of the first and in community j of the second partition. Only its non-zero entries (at most one per node) are determined, by counting
+the pairs of community indices of all nodes, so the metrics take time linear in the number of nodes, regardless of the numbers of
+communities.
+
+Partitions are given as membership arrays (mapping every node to the index of its community), or as `Partition`s. Hierarchical
+partitions (`HierarchicalPartition`s or lists of membership arrays, as returned by `hierarchical_leiden`) are compared level by level.
+"""
+
+from __future__ import annotations
+
+from typing import Any, TypedDict
+
+import numpy as np
+import numpy.typing as npt
+
+from heirarchical_leiden.array_leiden import combine_levels, community_members
+from heirarchical_leiden.csr import FloatArray, IntArray
+from heirarchical_leiden.hierarchical_leiden import HierarchicalPartition
+from heirarchical_leiden.utils import Partition
+
+# A partition, given as a membership array or as a `Partition`
+Clustering = Partition[Any] | npt.ArrayLike
+
+
+class Contingency:
+    """The non-zero entries of the contingency table of two partitions, along with the sizes of their communities."""
+
+    def __init__(self, first: Clustering, second: Clustering) -> None:
+        """
+        Build the contingency table of the given partitions.
+
+        Membership arrays have to cover the same nodes in the same order. For two `Partition`s, only the nodes contained in both are
+        taken into account, e.g. for comparing the partitions of a graph which changed between the runs. The communities are renumbered
+        consecutively in the order of their indices, skipping unused indices (e.g. of communities without any common nodes).
+        """
+        a, b = _aligned(first, second)
+        ka, kb = int(a.max(initial=-1)) + 1, int(b.max(initial=-1)) + 1
+        self.n: int = len(a)
+        self.first_sizes: IntArray = np.bincount(a, minlength=ka)
+        self.second_sizes: IntArray = np.bincount(b, minlength=kb)
+
+        # Count the pairs of community indices, as entries of a dense table if it is small, and by sorting them otherwise
+        keys = a * kb + b
+        if ka * kb <= 4 * len(a) + 64:
+            counts = np.bincount(keys, minlength=ka * kb)
+            keys = np.flatnonzero(counts)
+            counts = counts[keys]
+        else:
+            keys, counts = np.unique(keys, return_counts=True)
+        # The rows, columns and values of the non-zero entries, ordered by row and column
+        self.rows: IntArray = (keys // max(kb, 1)).astype(np.int64)
+        self.columns: IntArray = (keys % max(kb, 1)).astype(np.int64)
+        self.counts: IntArray = counts.astype(np.int64)
+
+
+def _aligned(first: Clustering, second: Clustering) -> tuple[IntArray, IntArray]:
+    # Turn both partitions into membership arrays of the same nodes
+    if isinstance(first, Partition) and isinstance(second, Partition):
+        nodes = [v for v in first.G.nodes if v in second._node_part]
+        a = np.fromiter((first._node_part[v] for v in nodes), dtype=np.int64, count=len(nodes))
+        b = np.fromiter((second._node_part[v] for v in nodes), dtype=np.int64, count=len(nodes))
+        # Number the communities consecutively, as some of them might not contain any of the common nodes
+        return np.unique(a, return_inverse=True)[1].astype(np.int64), np.unique(b, return_inverse=True)[1].astype(np.int64)
+    if isinstance(first, Partition) or isinstance(second, Partition):
+        raise TypeError("Both partitions have to be given either as Partitions or as membership arrays.")
+
+    a, b = np.asarray(first, dtype=np.int64), np.asarray(second, dtype=np.int64)
+    if a.shape != b.shape:
+        raise ValueError(f"The membership arrays have to cover the same nodes, but have the shapes {a.shape} and {b.shape}.")
+    return np.unique(a, return_inverse=True)[1].astype(np.int64), np.unique(b, return_inverse=True)[1].astype(np.int64)
+
+
+def _as_contingency(first: Clustering | Contingency, second: Clustering | None) -> Contingency:
+    if isinstance(first, Contingency):
+        return first
+    if second is None:
+        raise TypeError("The second partition is missing.")
+    return Contingency(first, second)
+
+
+def normalized_mutual_information(first: Clustering | Contingency, second: Clustering | None = None) -> float:
+    """
+    Compute the normalized mutual information of two partitions, normalized by the arithmetic mean of their entropies.
+
+    The partitions can also be given by their `Contingency` table (as the first argument only), to compute several metrics from it.
+
+    :returns: The NMI, between 0 (independent partitions) and 1 (equal partitions). It is 1 if both partitions consist of a single
+        community.
+    """
+    table = _as_contingency(first, second)
+    n = table.n
+    if n == 0:
+        return 1.0
+
+    def entropy(sizes: IntArray) -> float:
+        p = sizes[sizes > 0] / n
+        return float(-np.sum(p * np.log(p)))
+
+    h_first, h_second = entropy(table.first_sizes), entropy(table.second_sizes)
+    if h_first == h_second == 0:
+        return 1.0
+    expected = table.first_sizes[table.rows] * table.second_sizes[table.columns]
+    mutual_information = float(np.sum(table.counts / n * np.log(n * table.counts / expected)))
+    return max(0.0, mutual_information / ((h_first + h_second) / 2))
+
+
+def adjusted_rand_index(first: Clustering | Contingency, second: Clustering | None = None) -> float:
+    """
+    Compute the adjusted Rand index of two partitions, given as for `normalized_mutual_information`.
+
+    :returns: The ARI, which is 1 for equal partitions, and 0 in expectation for random ones (it can also be negative).
+    """
+    table = _as_contingency(first, second)
+
+    def pairs(counts: IntArray) -> float:
+        return float(np.sum(counts * (counts - 1) / 2))
+
+    together = pairs(table.counts)
+    first_pairs, second_pairs = pairs(table.first_sizes), pairs(table.second_sizes)
+    expected = first_pairs * second_pairs / (table.n * (table.n - 1) / 2) if table.n > 1 else 0.0
+    maximum = (first_pairs + second_pairs) / 2
+    # Both partitions put all nodes into a single community, or all nodes into communities of their own
+    if maximum == expected:
+        return 1.0
+    return (together - expected) / (maximum - expected)
+
+
+def jaccard_matching(first: Clustering | Contingency, second: Clustering | None = None) -> tuple[IntArray, FloatArray]:
+    """
+    Match every community of the first partition with the community of the second partition, which is most similar to it.
+
+    The similarity of two communities is their Jaccard index, i.e. the number of nodes they share relative to the number of nodes in
+    either of them. The partitions are given as for `normalized_mutual_information`.
+
+    :returns: The index of the best matching community of the second partition for every community of the first one, and the Jaccard
+        index of the match. The indices are those of the communities renumbered as described for `Contingency`.
+    """
+    table = _as_contingency(first, second)
+    sizes = table.first_sizes[table.rows] + table.second_sizes[table.columns] - table.counts
+    jaccard = table.counts / sizes
+
+    # Find the best entry of every row: sort the entries by row and decreasing Jaccard index, and take the first entry per row
+    order = np.lexsort((-jaccard, table.rows))
+    rows = table.rows[order]
+    first_of_row = np.ones(len(rows), dtype=bool)
+    first_of_row[1:] = rows[1:] != rows[:-1]
+    best = order[first_of_row]
+    return table.columns[best], jaccard[best]
+
+
+class LevelComparison(TypedDict):
+    """The comparison of two hierarchical partitions on a single level, see `compare_hierarchies`."""
+
+    level: int
+    nmi: float
+    ari: float
+    # The best matching community of the second hierarchy for every community of the first one on this level, and their Jaccard index
+    matches: IntArray
+    jaccard: FloatArray
+
+
+def compare_hierarchies(
+    first: HierarchicalPartition[Any] | list[IntArray], second: HierarchicalPartition[Any] | list[IntArray]
+) -> list[LevelComparison]:
+    """
+    Compare two hierarchical partitions of the same nodes level by level.
+
+    On every level, the communities not split up any further are carried over from the level above, so every level is a partition of all
+    nodes (just as the levels returned by `hierarchical_leiden` for graphs in array form). If one hierarchy is shallower than the other,
+    its last level is compared with the remaining levels of the other one. For `HierarchicalPartition`s, only the nodes contained in
+    both are compared.
+
+    :returns: The comparison of every level, starting with the top level.
+    """
+    first_levels, first_nodes = _levels(first)
+    second_levels, second_nodes = _levels(second)
+    if first_nodes is not None and second_nodes is not None:
+        # Restrict both hierarchies to their common nodes, in the order of the first one
+        position = {v: i for i, v in enumerate(second_nodes)}
+        common = [i for i, v in enumerate(first_nodes) if v in position]
+        counterpart = np.array([position[first_nodes[i]] for i in common], dtype=np.int64)
+        first_levels = [level[common] for level in first_levels]
+        second_levels = [level[counterpart] for level in second_levels]
+    elif first_nodes is not None or second_nodes is not None:
+        raise TypeError("Both hierarchies have to be given either as HierarchicalPartitions or as lists of membership arrays.")
+
+    comparisons: list[LevelComparison] = []
+    for depth in range(max(len(first_levels), len(second_levels))):
+        table = Contingency(first_levels[min(depth, len(first_levels) - 1)], second_levels[min(depth, len(second_levels) - 1)])
+        matches, jaccard = jaccard_matching(table)
+        nmi, ari = normalized_mutual_information(table), adjusted_rand_index(table)
+        comparisons.append({"level": depth, "nmi": nmi, "ari": ari, "matches": matches, "jaccard": jaccard})
+    return comparisons
+
+
+def _levels(hierarchy: HierarchicalPartition[Any] | list[IntArray]) -> tuple[list[IntArray], list[Any] | None]:
+    # Get the membership arrays of all levels of the hierarchy, and the nodes they refer to (None for lists of membership arrays)
+    if isinstance(hierarchy, list):
+        return [np.asarray(level, dtype=np.int64) for level in hierarchy], None
+    nodes = list(hierarchy["partition"].G.nodes)
+    return _subtree_levels(hierarchy, nodes), nodes
+
+
+def _subtree_levels(subtree: HierarchicalPartition[Any], nodes: list[Any]) -> list[IntArray]:
+    # Get the levels of the given subtree, in which `nodes` lists the nodes of the subtree in the order of the membership arrays
+    node_part = subtree["partition"]._node_part
+    membership = np.fromiter((node_part[v] for v in nodes), dtype=np.int64, count=len(nodes))
+    members = community_members(membership)
+    children = {c: _subtree_levels(child, [nodes[i] for i in members[c].tolist()]) for c, child in subtree["children"].items()}
+    return combine_levels(membership, members, children)
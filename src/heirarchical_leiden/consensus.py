@@ -0,0 +1,127 @@
+"""
+Consensus clustering, combining the partitions of several runs of the Leiden algorithm into a more stable one.
+
+The random visit order of the local moving phase and the randomized merges of the refinement phase make nodes at the boundaries of
+communities end up in different communities from run to run. Consensus clustering runs the Leiden algorithm several times with different
+seeds, and then clusters the consensus graph, whose edges are weighted by the fraction of runs which put their end points into the same
+community (Lancichinetti & Fortunato, 2012). Nodes consistently clustered together are thus tightly connected in the consensus graph,
+while the unstable boundaries are only loosely connected.
+
+The co-assignments are only counted for the edges of the graph, not for all pairs of nodes: a counter per stored edge is incremented for
+every run, which puts both end points into the same community. The memberships of the runs are accumulated as they complete, so the
+memory stays linear in the number of edges, regardless of the number of runs.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from heirarchical_leiden.array_leiden import ArrayGraph, array_leiden
+from heirarchical_leiden.conversion import to_csr_graph, to_result
+from heirarchical_leiden.csr import CSRGraph, IntArray
+from heirarchical_leiden.parallel import SharedCSRGraph, derive_seed, initialize_worker, worker_graph
+from heirarchical_leiden.quality_functions import QualityFunction
+from heirarchical_leiden.utils import Partition, seeded_random
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+def _run_membership(𝓗: QualityFunction[int], θ: float, γ: float, seed: int) -> IntArray:
+    # Run the Leiden algorithm on the worker's shared graph, only returning the membership (the quality isn't needed for the consensus)
+    with seeded_random(seed):
+        return array_leiden(worker_graph(), 𝓗, None, θ, γ)
+
+
+def _memberships(
+    graph: CSRGraph, 𝓗: QualityFunction[int], runs: int, θ: float, γ: float, seed: int, max_workers: int
+) -> Iterator[IntArray]:
+    # Yield the memberships of the runs in the order of the runs, as they complete
+    if max_workers == 1:
+        for i in range(runs):
+            # Restore the caller's random state after every run, also when the generator is abandoned between runs
+            with seeded_random(derive_seed(seed, i)):
+                membership = array_leiden(graph, 𝓗, None, θ, γ)
+            yield membership
+        return
+
+    with SharedCSRGraph(graph) as shared, ProcessPoolExecutor(max_workers, initializer=initialize_worker, initargs=(shared,)) as pool:
+        # Only keep a few runs in flight, so that finished memberships don't pile up while waiting for earlier runs
+        pending: deque[Future[IntArray]] = deque()
+        for i in range(runs):
+            pending.append(pool.submit(_run_membership, 𝓗, θ, γ, derive_seed(seed, i)))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def consensus_graph(graph: CSRGraph, memberships: Iterator[IntArray], threshold: float = 0.0) -> CSRGraph:
+    """
+    Build the consensus graph of the given memberships of the nodes of the graph, consuming them one at a time.
+
+    The consensus graph has the edges of the graph, weighted by the fraction of the memberships which put their end points into the same
+    community. Edges with a fraction of at most `threshold` are left out. The node weights of the graph are kept.
+    """
+    # The row of every stored edge, and the number of memberships co-assigning its end points
+    rows = np.repeat(np.arange(graph.order(), dtype=np.int64), np.diff(graph.indptr))
+    indices = np.asarray(graph.indices)
+    together = np.zeros(len(indices), dtype=np.int64)
+    runs = 0
+    for membership in memberships:
+        together += membership[rows] == membership[indices]
+        runs += 1
+
+    fraction = together / max(runs, 1)
+    keep = fraction > threshold
+    indptr = np.zeros(graph.order() + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows[keep], minlength=graph.order()), out=indptr[1:])
+    return CSRGraph(indptr, indices[keep], fraction[keep], np.asarray(graph.node_weights))
+
+
+def consensus_leiden(
+    G: Graph | ArrayGraph,
+    𝓗: QualityFunction[int],
+    runs: int = 10,
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    *,
+    seed: int = 0,
+    threshold: float = 0.0,
+    max_workers: int = 1,
+) -> Partition[Any] | IntArray:
+    """
+    Run the Leiden algorithm several times with different seeds, and cluster the consensus graph of their partitions.
+
+    Parameters
+    ----------
+    G : Graph | ArrayGraph
+        The graph to process, either as a NetworkX graph or in array form (see `leiden`).
+    𝓗 : QualityFunction[int]
+        The quality function to optimize in every run and on the consensus graph, either `Modularity` or `CPM`.
+    runs : int, optional
+        The number of runs, default value of 10.
+    θ, γ, weight
+        The same as for `leiden`.
+    seed : int, optional
+        The seed from which the seeds of the runs and of the final clustering are derived, default value of 0.
+    threshold : float, optional
+        Edges whose end points are put into the same community by at most this fraction of the runs are left out of the consensus graph,
+        default value of 0, which only leaves out edges never within a community.
+    max_workers : int, optional
+        The number of worker processes to distribute the runs over (sharing the graph, see `SharedCSRGraph`), default value of 1, which
+        performs them in this process.
+
+    :returns: The partition of the consensus graph. For graphs in array form, an array mapping every node to the index of its community.
+    """
+    graph, nodes = to_csr_graph(G, weight)
+    consensus = consensus_graph(graph, _memberships(graph, 𝓗, runs, θ, γ, seed, max_workers), threshold)
+    with seeded_random(derive_seed(seed, "consensus")):
+        membership = array_leiden(consensus, 𝓗, None, θ, γ)
+    return to_result(G, nodes, weight, membership)
@@ -0,0 +1,88 @@
+"""
+Conversions between the graphs and partitions of the NetworkX-based and the array-based implementations.
+
+The parallel, distributed, batched, consensus and checkpointed runs all convert their input into a `CSRGraph`, run the array-based
+implementation on it (or on its subgraphs), and convert the resulting membership arrays back into the form `leiden` and
+`hierarchical_leiden` return for the input: partitions for NetworkX graphs, membership arrays for graphs in array form.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from heirarchical_leiden.array_leiden import ArrayGraph, as_csr_graph, combine_levels, community_members
+from heirarchical_leiden.csr import CSRGraph, IntArray
+from heirarchical_leiden.hierarchical_leiden import HierarchicalPartition
+from heirarchical_leiden.hooks import SubtreePath
+from heirarchical_leiden.utils import DataKeys as Keys
+from heirarchical_leiden.utils import Partition, is_graph, preprocess_graph
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+def to_csr_graph(G: Graph | ArrayGraph, weight: str | None) -> tuple[CSRGraph, list[Any] | None]:
+    """Convert the graph into a `CSRGraph`, also returning the nodes of NetworkX graphs (in the order of their indices) or None."""
+    if is_graph(G):
+        return CSRGraph.from_networkx(G, weight)
+    return as_csr_graph(G), None
+
+
+def to_result(G: Graph | ArrayGraph, nodes: list[Any] | None, weight: str | None, membership: IntArray) -> Partition[Any] | IntArray:
+    """Return the membership array of G as a partition for NetworkX graphs, just as `leiden` does, and unchanged otherwise."""
+    if not is_graph(G) or nodes is None:
+        return membership
+    G = preprocess_graph(G, weight)
+    node_part = dict(zip(nodes, membership.tolist()))
+    return Partition._from_membership(G, node_part, int(membership.max(initial=-1)) + 1, Keys.WEIGHT)
+
+
+def assemble_hierarchy(
+    G: Graph | ArrayGraph, weight: str | None, labels: list[Any] | None, results: dict[SubtreePath, IntArray]
+) -> HierarchicalPartition[Any] | list[IntArray]:
+    """
+    Assemble the result of a hierarchical run from the membership arrays of all of its subtrees, by their paths in the hierarchy.
+
+    :returns: The result in the same form as `hierarchical_leiden` returns it for G, where `labels` are the nodes of NetworkX graphs, as
+        returned by `to_csr_graph`.
+    """
+    if labels is None:
+        levels = _levels(results, ())
+        return [np.zeros(len(results[()]), dtype=np.int64)] if levels is None else levels
+
+    G = preprocess_graph(G, weight)
+    hierarchy = _hierarchy(results, (), G, labels, 0)
+    if hierarchy is None:
+        return {"partition": Partition.from_partition(G, [G.nodes]), "level": 0, "children": {}}
+    return hierarchy
+
+
+def _levels(results: dict[SubtreePath, IntArray], path: SubtreePath) -> list[IntArray] | None:
+    # Assemble the levels of the subtree at the given path, just as `array_hierarchical_leiden` does
+    membership = results[path]
+    if int(membership.max(initial=-1)) + 1 == 1:
+        return None
+    children = {c: child for c in range(int(membership.max()) + 1) if (*path, c) in results and (child := _levels(results, (*path, c)))}
+    return combine_levels(membership, community_members(membership), children)
+
+
+def _hierarchy(
+    results: dict[SubtreePath, IntArray], path: SubtreePath, G: Graph, labels: list[Any], level: int
+) -> HierarchicalPartition[Any] | None:
+    # Assemble the hierarchical partition of the subtree at the given path, where `labels[i]` is the node of G with index i in the subtree
+    membership = results[path]
+    k = int(membership.max(initial=-1)) + 1
+    if k == 1:
+        return None
+    𝓟: Partition[Any] = Partition._from_membership(G, dict(zip(labels, membership.tolist())), k, Keys.WEIGHT)
+
+    children: dict[int, HierarchicalPartition[Any]] = {}
+    for c, members in enumerate(community_members(membership)):
+        if (*path, c) in results:
+            community = [labels[i] for i in members.tolist()]
+            child = _hierarchy(results, (*path, c), G.subgraph(community).copy(), community, level + 1)
+            if child is not None:
+                children[c] = child
+    return {"partition": 𝓟, "level": level, "children": children}
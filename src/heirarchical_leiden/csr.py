@@ -0,0 +1,313 @@
+"""
+This module provides a compact representation of graphs in compressed sparse row (CSR) format.
+
+A `CSRGraph` stores the adjacency of an undirected graph in three flat arrays, which either live in memory or are memory-mapped from
+a directory on disk (see `write_csr` and `CSRGraph.load`). Self-loops are stored once, in the row of their node, while every other
+edge is stored twice, once in the row of each of its end points. As in NetworkX, self-loops count twice towards the degree of a node.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import numpy.typing as npt
+
+from heirarchical_leiden.utils import DataKeys, import_networkx
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+IntArray = npt.NDArray[np.int64]
+FloatArray = npt.NDArray[np.float64]
+
+EdgeChunk = tuple[IntArray, IntArray, FloatArray | None]
+
+CSR_ARRAYS = ("indptr", "indices", "weights", "node_weights", "degrees")
+
+
+class CSRGraph:
+    """An undirected, weighted graph with the nodes `0, …, n-1`, stored in CSR format."""
+
+    def __init__(
+        self,
+        indptr: IntArray,
+        indices: IntArray,
+        weights: FloatArray,
+        node_weights: FloatArray | None = None,
+        degrees: FloatArray | None = None,
+    ) -> None:
+        """
+        Create a graph from its CSR arrays.
+
+        The neighbors of node `v` are `indices[indptr[v]:indptr[v+1]]`, the weights of the corresponding edges are stored in the same
+        range of `weights`. The node weights (used for aggregate graphs) default to 1, the degrees are calculated if not given.
+        """
+        assert len(indptr) >= 1 and len(indices) == len(weights) == indptr[-1], "Inconsistent CSR arrays."
+        self.indptr: IntArray = indptr
+        self.indices: IntArray = indices
+        self.weights: FloatArray = weights
+
+        n = len(indptr) - 1
+        self.node_weights: FloatArray = np.ones(n) if node_weights is None else node_weights
+        self.degrees: FloatArray = self._calculate_degrees() if degrees is None else degrees
+
+    @classmethod
+    def from_edges(
+        cls,
+        src: npt.ArrayLike,
+        dst: npt.ArrayLike,
+        weight: npt.ArrayLike | None = None,
+        n: int | None = None,
+        node_weights: FloatArray | None = None,
+    ) -> CSRGraph:
+        """
+        Create a graph in memory from arrays of edges `(src[i], dst[i])` with the weights `weight[i]` (default 1).
+
+        Every edge needs to be given once only; parallel edges are combined into a single edge, summing their weights.
+        """
+        s = np.asarray(src, dtype=np.int64)
+        d = np.asarray(dst, dtype=np.int64)
+        w = np.ones(len(s)) if weight is None else np.asarray(weight, dtype=np.float64)
+        if n is None:
+            n = int(max(s.max(initial=-1), d.max(initial=-1))) + 1
+
+        # Store every edge in both directions, except for self-loops, which are stored once
+        loops = s == d
+        rows = np.concatenate((s, d[~loops]))
+        cols = np.concatenate((d, s[~loops]))
+        vals = np.concatenate((w, w[~loops]))
+
+        # Sort the entries by row and column and combine duplicate entries
+        keys, inverse = np.unique(rows * n + cols, return_inverse=True)
+        vals = np.bincount(inverse, weights=vals, minlength=len(keys))
+        rows, cols = keys // n, keys % n
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return cls(indptr, cols, vals.astype(np.float64), node_weights)
+
+    @classmethod
+    def from_networkx(cls, G: Graph, weight: str | None = None) -> tuple[CSRGraph, list[object]]:
+        """
+        Create a graph from the NetworkX graph G, using the given edge weight attribute (default 1).
+
+        Returns the graph and the list of G's nodes, in which the position of a node is its index in the new graph.
+        Node weights are taken from the `DataKeys.WEIGHT` attribute, as used by aggregate graphs.
+        """
+        nodes = list(G.nodes)
+        index = {v: i for i, v in enumerate(nodes)}
+        edges = [(index[u], index[v], w) for u, v, w in G.edges(data=weight, default=1)]
+        src, dst, wts = zip(*edges) if edges else ((), (), ())
+        node_weights = np.array([w for _, w in G.nodes(data=DataKeys.WEIGHT, default=1)], dtype=np.float64)
+        return cls.from_edges(src, dst, wts, len(nodes), node_weights), nodes
+
+    @classmethod
+    def load(cls, directory: str | os.PathLike[str], mmap: bool = True) -> CSRGraph:
+        """Load a graph stored in `directory` by `write_csr` or `CSRGraph.save`, memory-mapping its arrays unless `mmap` is False."""
+        path = Path(directory)
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None) for name in CSR_ARRAYS}
+        return cls(**arrays)
+
+    def save(self, directory: str | os.PathLike[str]) -> None:
+        """Store this graph in the given directory, in the format read by `CSRGraph.load`."""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in CSR_ARRAYS:
+            np.save(path / f"{name}.npy", getattr(self, name))
+
+    def order(self) -> int:
+        """Return the number of nodes of this graph."""
+        return len(self.indptr) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """Get the number of bytes taken by the arrays of this graph (on disk, for memory-mapped graphs)."""
+        return sum(np.asarray(getattr(self, field)).nbytes for field in CSR_ARRAYS)
+
+    def size(self) -> float:
+        """Return the total weight of all edges of this graph, as NetworkX' `G.size(weight=...)` does."""
+        return float(self.degrees.sum()) / 2
+
+    def blocks(self, max_edges: int | None = None) -> list[tuple[int, int]]:
+        """
+        Split the nodes into consecutive ranges `[start, stop)`, whose rows contain at most `max_edges` entries combined.
+
+        A single node with more than `max_edges` entries forms a block on its own. Without `max_edges`, one block contains all nodes.
+        """
+        n = self.order()
+        if max_edges is None or n == 0:
+            return [(0, n)]
+
+        blocks = []
+        start = 0
+        while start < n:
+            # Find the last node boundary, at which the block is still small enough
+            stop = int(np.searchsorted(self.indptr, self.indptr[start] + max_edges, side="right")) - 1
+            stop = min(max(stop, start + 1), n)
+            blocks.append((start, stop))
+            start = stop
+        return blocks
+
+    def block(self, start: int, stop: int) -> tuple[IntArray, IntArray, FloatArray]:
+        """Read the rows of the nodes `start, …, stop-1` into memory, returning the parts of `indptr`, `indices` and `weights`."""
+        indptr = np.asarray(self.indptr[start : stop + 1])
+        lo, hi = int(indptr[0]), int(indptr[-1])
+        return indptr, np.asarray(self.indices[lo:hi]), np.asarray(self.weights[lo:hi])
+
+    def rows(self, start: int = 0, stop: int | None = None) -> Iterator[tuple[int, list[int], list[float]]]:
+        """Iterate over the nodes `start, …, stop-1`, yielding tuples of a node, its neighbors and the weights of the edges to them."""
+        stop = self.order() if stop is None else stop
+        lo = int(self.indptr[start])
+        ptr = (self.indptr[start : stop + 1] - lo).tolist()
+        # Reading the whole block at once turns the accesses of the memory-mapped arrays into sequential reads
+        indices = self.indices[lo : int(self.indptr[stop])].tolist()
+        weights = self.weights[lo : int(self.indptr[stop])].tolist()
+        for i, v in enumerate(range(start, stop)):
+            yield v, indices[ptr[i] : ptr[i + 1]], weights[ptr[i] : ptr[i + 1]]
+
+    def edges(self, max_edges: int | None = None) -> Iterator[EdgeChunk]:
+        """Iterate over all edges of this graph in chunks of arrays `(src, dst, weight)`, listing every edge once."""
+        for start, stop in self.blocks(max_edges):
+            lo, hi = int(self.indptr[start]), int(self.indptr[stop])
+            src = np.repeat(np.arange(start, stop, dtype=np.int64), np.diff(self.indptr[start : stop + 1]))
+            dst = np.asarray(self.indices[lo:hi])
+            keep = src <= dst
+            yield src[keep], dst[keep], np.asarray(self.weights[lo:hi])[keep]
+
+    @classmethod
+    def block_diagonal(cls, graphs: Sequence[CSRGraph]) -> tuple[CSRGraph, IntArray]:
+        """
+        Pack the given graphs into a single graph, whose adjacency matrix is block diagonal, i.e. without edges between the graphs.
+
+        :returns: The packed graph and the offsets of the graphs, such that the node `v` of the i-th graph is node `offsets[i] + v`.
+        """
+        offsets = np.zeros(len(graphs) + 1, dtype=np.int64)
+        np.cumsum([graph.order() for graph in graphs], out=offsets[1:])
+        entries = np.zeros(len(graphs) + 1, dtype=np.int64)
+        np.cumsum([len(graph.indices) for graph in graphs], out=entries[1:])
+
+        def concatenate(arrays: Iterable[npt.NDArray[Any]], dtype: type[np.generic]) -> Any:
+            return np.concatenate([np.zeros(0, dtype=dtype), *arrays]).astype(dtype)
+
+        indptr = concatenate([*(graph.indptr[:-1] + entries[i] for i, graph in enumerate(graphs)), entries[-1:]], np.int64)
+        indices = concatenate((graph.indices + offsets[i] for i, graph in enumerate(graphs)), np.int64)
+        weights = concatenate((graph.weights for graph in graphs), np.float64)
+        node_weights = concatenate((graph.node_weights for graph in graphs), np.float64)
+        degrees = concatenate((graph.degrees for graph in graphs), np.float64)
+        return cls(indptr, indices, weights, node_weights, degrees), offsets
+
+    def subgraph(self, nodes: npt.ArrayLike) -> CSRGraph:
+        """Create the subgraph induced by the given nodes in memory, in which node `nodes[i]` becomes node `i`."""
+        selected = np.asarray(nodes, dtype=np.int64)
+        mapping = np.full(self.order(), -1, dtype=np.int64)
+        mapping[selected] = np.arange(len(selected))
+
+        # Gather the rows of the selected nodes, dropping the entries of neighbors outside of the subgraph
+        starts = self.indptr[selected]
+        lengths = self.indptr[selected + 1] - starts
+        positions = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        rows = np.repeat(np.arange(len(selected)), lengths)
+        cols = mapping[self.indices[positions]]
+        keep = cols >= 0
+
+        indptr = np.zeros(len(selected) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows[keep], minlength=len(selected)), out=indptr[1:])
+        return CSRGraph(indptr, cols[keep], np.asarray(self.weights[positions][keep]), np.asarray(self.node_weights[selected]))
+
+    def permute(self, order: npt.ArrayLike) -> CSRGraph:
+        """Renumber the nodes of this graph, such that node `order[i]` becomes node `i` (see `heirarchical_leiden.ordering`)."""
+        assert len(np.asarray(order)) == self.order(), "The order has to list every node."
+        return self.subgraph(order)
+
+    def to_networkx(self) -> Graph:
+        """
+        Convert this graph into a NetworkX graph with the nodes `0, …, n-1`.
+
+        Edge and node weights are stored in the `DataKeys.WEIGHT` attributes, as done for aggregate graphs.
+        """
+        G = import_networkx().Graph()
+        G.add_nodes_from((v, {DataKeys.WEIGHT: w}) for v, w in enumerate(self.node_weights.tolist()))
+        for src, dst, weight in self.edges():
+            G.add_weighted_edges_from(zip(src.tolist(), dst.tolist(), weight.tolist()), weight=DataKeys.WEIGHT)  # type: ignore
+        return G
+
+    def _calculate_degrees(self, max_edges: int = 2**24) -> FloatArray:
+        """Calculate the weighted node degrees, counting self-loops twice, in a single pass over the (possibly memory-mapped) arrays."""
+        degrees = np.zeros(self.order())
+        for start, stop in self.blocks(max_edges):
+            lo, hi = int(self.indptr[start]), int(self.indptr[stop])
+            rows = np.repeat(np.arange(start, stop, dtype=np.int64), np.diff(self.indptr[start : stop + 1]))
+            weights = np.asarray(self.weights[lo:hi])
+            weights = np.where(np.asarray(self.indices[lo:hi]) == rows, 2 * weights, weights)
+            degrees[start:stop] = np.bincount(rows - start, weights=weights, minlength=stop - start)
+        return degrees
+
+
+def write_csr(
+    directory: str | os.PathLike[str],
+    edges: Callable[[], Iterable[EdgeChunk]],
+    n: int | None = None,
+    node_weights: FloatArray | None = None,
+) -> CSRGraph:
+    """
+    Build a graph on disk from a stream of edge chunks, without holding its adjacency in memory, and return it memory-mapped.
+
+    `edges` is called twice and has to produce the same chunks `(src, dst, weight)` both times, listing every edge once.
+    The first pass counts the node degrees, the second one writes the adjacency into memory-mapped files. Parallel edges are kept as
+    separate entries, which the algorithms treat like a single edge carrying the sum of their weights.
+    """
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+
+    # First pass: count the entries of every row, growing the counts as new nodes show up
+    counts = np.zeros(n or 0, dtype=np.int64)
+    for chunk_src, chunk_dst, _ in edges():
+        src, dst = np.asarray(chunk_src, dtype=np.int64), np.asarray(chunk_dst, dtype=np.int64)
+        ends = np.concatenate((src, dst[src != dst]))
+        chunk_counts = np.bincount(ends, minlength=len(counts))
+        if len(chunk_counts) > len(counts):
+            counts = np.concatenate((counts, np.zeros(len(chunk_counts) - len(counts), dtype=np.int64)))
+        counts += chunk_counts
+
+    order = len(counts)
+    indptr = np.lib.format.open_memmap(path / "indptr.npy", mode="w+", dtype=np.int64, shape=(order + 1,))
+    indptr[0] = 0
+    np.cumsum(counts, out=indptr[1:])
+    nnz = int(indptr[-1])
+    indices = np.lib.format.open_memmap(path / "indices.npy", mode="w+", dtype=np.int64, shape=(nnz,))
+    weights = np.lib.format.open_memmap(path / "weights.npy", mode="w+", dtype=np.float64, shape=(nnz,))
+
+    # Second pass: place every entry at the next free position of its row
+    fill = np.array(indptr[:-1])
+    for chunk_src, chunk_dst, weight in edges():
+        src, dst = np.asarray(chunk_src, dtype=np.int64), np.asarray(chunk_dst, dtype=np.int64)
+        w = np.ones(len(src)) if weight is None else np.asarray(weight, dtype=np.float64)
+        loops = src == dst
+        rows = np.concatenate((src, dst[~loops]))
+        cols = np.concatenate((dst, src[~loops]))
+        vals = np.concatenate((w, w[~loops]))
+
+        # Within a chunk, a row can occur multiple times, so determine the rank of every entry within its row
+        perm = np.argsort(rows, kind="stable")
+        rows, cols, vals = rows[perm], cols[perm], vals[perm]
+        first = np.searchsorted(rows, rows, side="left")
+        positions = fill[rows] + np.arange(len(rows)) - first
+        indices[positions] = cols
+        weights[positions] = vals
+        fill += np.bincount(rows, minlength=order)
+
+    indptr.flush()
+    indices.flush()
+    weights.flush()
+    del indptr, indices, weights
+
+    # Finally, store the node weights and the degrees, which are calculated in another pass over the memory-mapped files
+    np.save(path / "node_weights.npy", np.ones(order) if node_weights is None else np.asarray(node_weights, dtype=np.float64))
+    graph = CSRGraph(*(np.load(path / f"{name}.npy", mmap_mode="r") for name in CSR_ARRAYS[:-1]))
+    np.save(path / "degrees.npy", graph.degrees)
+    return CSRGraph.load(path)
@@ -0,0 +1,288 @@
+"""
+Distributed execution of the hierarchical Leiden algorithm and of resolution sweeps, through a pluggable backend.
+
+The work is split into tasks, each of which partitions a single (sub)graph with the Leiden algorithm: a subtree of the hierarchy, or a
+run of a resolution sweep. Every task carries a compact copy of its subgraph (see `SubgraphPayload`), so that it doesn't depend on any
+state of the worker, and is returned a membership array. The driver keeps the graph, extracts the subgraphs of the next subtrees from
+it, and assembles the results, just as `parallel_hierarchical_leiden` and `resolution_sweep` do.
+
+A task is identified by its id (the path of its subtree, or the index of its run) and its seed, which is derived from the id and the seed
+of the whole computation. Running a task only depends on the task itself, so running it again yields the same membership. Tasks whose
+futures fail, e.g. because the machine running them was lost, are thus simply submitted again, and results for tasks already completed
+are ignored. The result is the same as that of `parallel_hierarchical_leiden` or `resolution_sweep` with the same seed.
+
+Backends implement `Backend`, submitting tasks to be run by `run_task` and returning `concurrent.futures.Future`s of their results:
+
+* `InProcessBackend` runs the tasks right away in this process, for tests and debugging.
+* `ProcessBackend` runs the tasks on a pool of worker processes on this machine.
+* `ExecutorBackend` runs the tasks on any `concurrent.futures.Executor`, e.g. that of a Dask cluster (`client.get_executor()`), except
+  for a `ThreadPoolExecutor`: the Leiden algorithm draws from the global random number generator, which threads would share.
+
+Other backends, e.g. for Ray, only have to implement `submit`, such as by returning `ray.remote(run_task).remote(task).future()`.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, cast
+
+import numpy as np
+import numpy.typing as npt
+
+from heirarchical_leiden.array_leiden import ArrayGraph, array_leiden, community_members
+from heirarchical_leiden.conversion import assemble_hierarchy, to_csr_graph, to_result
+from heirarchical_leiden.csr import CSRGraph, FloatArray, IntArray
+from heirarchical_leiden.hierarchical_leiden import HierarchicalPartition
+from heirarchical_leiden.parallel import derive_seed
+from heirarchical_leiden.quality_functions import QualityFunction
+from heirarchical_leiden.scheduler import Path
+from heirarchical_leiden.utils import Partition, seeded_random
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+# The id of a task, e.g. ("subtree", 0, 3) for the subtree of community 3 within community 0, and the key identifying its result
+TaskId = tuple[object, ...]
+TaskKey = tuple[TaskId, int]
+
+
+class SubgraphPayload:
+    """A compact copy of a graph, to be shipped to a worker with a task."""
+
+    def __init__(self, graph: CSRGraph) -> None:
+        """Copy the arrays of the graph, leaving out its degrees, which are recalculated by the worker, and weights which are all 1."""
+        # Node indices and edge offsets fit into 32 bits for all but the largest graphs, which halves the size of the largest arrays
+        self.indptr: npt.NDArray[np.integer[Any]] = np.asarray(graph.indptr, dtype=np.int32 if graph.indptr[-1] < 2**31 else np.int64)
+        self.indices: npt.NDArray[np.integer[Any]] = np.asarray(graph.indices, dtype=np.int32 if graph.order() < 2**31 else np.int64)
+        weights, node_weights = np.asarray(graph.weights), np.asarray(graph.node_weights)
+        self.weights: FloatArray | None = None if np.all(weights == 1) else weights
+        self.node_weights: FloatArray | None = None if np.all(node_weights == 1) else node_weights
+
+    @property
+    def nbytes(self) -> int:
+        """Get the number of bytes taken by the arrays of this payload."""
+        return sum(array.nbytes for array in (self.indptr, self.indices, self.weights, self.node_weights) if array is not None)
+
+    def graph(self) -> CSRGraph:
+        """Recreate the graph from this payload."""
+        indptr, indices = self.indptr.astype(np.int64), self.indices.astype(np.int64)
+        weights = np.ones(len(indices)) if self.weights is None else self.weights.copy()
+        return CSRGraph(indptr, indices, weights, None if self.node_weights is None else self.node_weights.copy())
+
+
+class Task:
+    """A unit of work: partitioning the graph of the payload with the Leiden algorithm, using the given seed."""
+
+    def __init__(self, task_id: TaskId, seed: int, payload: SubgraphPayload, 𝓗: QualityFunction[int], θ: float, γ: float) -> None:
+        self.task_id = task_id
+        self.seed = seed
+        self.payload = payload
+        self.𝓗 = 𝓗
+        self.θ = θ
+        self.γ = γ
+
+    @property
+    def key(self) -> TaskKey:
+        """Get the key identifying the result of this task, which is the same for every attempt to run it."""
+        return self.task_id, self.seed
+
+    def __repr__(self) -> str:
+        return f"Task({self.task_id!r}, seed={self.seed}, nodes={len(self.payload.indptr) - 1})"
+
+
+def run_task(task: Task) -> IntArray:
+    """Run the task, returning the membership array of the nodes of its graph. This only depends on the task, not on the worker."""
+    # Seed the run without changing the random state of the worker, e.g. of an in-process backend's caller
+    with seeded_random(task.seed):
+        return array_leiden(task.payload.graph(), task.𝓗, None, task.θ, task.γ)
+
+
+class Backend(ABC):
+    """The execution backend to run tasks on. Backends can be used as context managers, closing them on exit."""
+
+    @abstractmethod
+    def submit(self, task: Task) -> Future[IntArray]:
+        """Submit the task to be run by `run_task`, returning the future of its result."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the resources of the backend, such as worker processes."""
+
+    def __enter__(self) -> Backend:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+class InProcessBackend(Backend):
+    """A backend running every task right away in this process, once it is submitted."""
+
+    def __init__(self) -> None:
+        # The number of tasks run, including tasks run again after a failure
+        self.runs: int = 0
+
+    def submit(self, task: Task) -> Future[IntArray]:
+        future: Future[IntArray] = Future()
+        self.runs += 1
+        try:
+            future.set_result(run_task(task))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+
+class ExecutorBackend(Backend):
+    """
+    A backend running the tasks on a `concurrent.futures.Executor`.
+
+    The executor is only shut down when the backend is closed if the backend `owns` it, i.e. executors passed in by the caller, such as
+    that of a shared Dask client, stay usable by default. Thread pools are rejected, as the tasks running on them would share (and race
+    on) the global random number generator, which seeds every task.
+    """
+
+    def __init__(self, executor: Executor, owns: bool = False) -> None:
+        if isinstance(executor, ThreadPoolExecutor):
+            raise ValueError("Tasks can't run on a ThreadPoolExecutor, as they would share the global random number generator.")
+        self.executor = executor
+        self.owns = owns
+
+    def submit(self, task: Task) -> Future[IntArray]:
+        return self.executor.submit(run_task, task)
+
+    def close(self) -> None:
+        if self.owns:
+            self.executor.shutdown()
+
+
+class ProcessBackend(ExecutorBackend):
+    """A backend running the tasks on a pool of `max_workers` worker processes (by default, one per processor)."""
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        # The pool is created by (and thus owned by) the backend, so it is shut down when the backend is closed
+        super().__init__(ProcessPoolExecutor(max_workers), owns=True)
+
+
+class _Dispatcher:
+    """Submit tasks to a backend, submitting failed tasks again, and yield the result of every task once."""
+
+    def __init__(self, backend: Backend, retries: int) -> None:
+        self.backend = backend
+        self.retries = retries
+        self.pending: dict[Future[IntArray], Task] = {}
+        self.attempts: dict[TaskKey, int] = {}
+        self.completed: set[TaskKey] = set()
+
+    def submit(self, task: Task) -> None:
+        if task.key in self.completed:
+            return
+        self.attempts[task.key] = self.attempts.get(task.key, 0) + 1
+        self.pending[self.backend.submit(task)] = task
+
+    def results(self) -> Iterator[tuple[Task, IntArray]]:
+        # Yield the tasks and their results as they complete, including those of tasks submitted in the meantime
+        while self.pending:
+            done, _ = wait(list(self.pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                task = self.pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    if self.attempts[task.key] > self.retries:
+                        raise error
+                    self.submit(task)
+                # Ignore duplicate results, e.g. of a task submitted again while its first attempt was only delayed
+                elif task.key not in self.completed:
+                    self.completed.add(task.key)
+                    yield task, future.result()
+
+
+def distributed_hierarchical_leiden(
+    G: Graph | ArrayGraph,
+    𝓗: QualityFunction[int],
+    backend: Backend,
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    partition_max_size: int = 64,
+    *,
+    seed: int = 0,
+    retries: int = 2,
+) -> HierarchicalPartition[Any] | list[IntArray]:
+    """
+    Perform the hierarchical Leiden algorithm, running the subtrees of the hierarchy as tasks on the given backend.
+
+    Parameters
+    ----------
+    G : Graph | ArrayGraph
+        The graph to process, either as a NetworkX graph or in array form (see `hierarchical_leiden`).
+    𝓗 : QualityFunction[int]
+        The quality function to optimize, either `Modularity` or `CPM`.
+    backend : Backend
+        The backend to run the tasks on, which is left open, so that it can be used for further runs.
+    θ, γ, weight, partition_max_size
+        The same as for `hierarchical_leiden`.
+    seed : int, optional
+        The seed from which the seeds of the subtrees are derived, default value of 0.
+    retries : int, optional
+        The number of times a failed task is submitted again, before its error is raised, default value of 2.
+
+    :returns: The same as `parallel_hierarchical_leiden`, which returns the same result for the same seed.
+    """
+    graph, labels = to_csr_graph(G, weight)
+    dispatcher = _Dispatcher(backend, retries)
+
+    # The original nodes of every subtree, and the membership arrays computed for the subtrees
+    nodes: dict[Path, IntArray] = {(): np.arange(graph.order(), dtype=np.int64)}
+    results: dict[Path, IntArray] = {}
+
+    def task(path: Path) -> Task:
+        subgraph = graph if len(path) == 0 else graph.subgraph(nodes[path])
+        return Task(("subtree", *path), derive_seed(seed, *path), SubgraphPayload(subgraph), 𝓗, θ, γ)
+
+    dispatcher.submit(task(()))
+    for finished, membership in dispatcher.results():
+        path = cast(Path, finished.task_id[1:])
+        results[path] = membership
+
+        # Submit the communities, which are too large, largest first (unless the subtree wasn't split up at all)
+        if int(membership.max(initial=-1)) > 0:
+            children = [(c, members) for c, members in enumerate(community_members(membership)) if len(members) > partition_max_size]
+            for c, members in sorted(children, key=lambda child: -len(child[1])):
+                nodes[(*path, c)] = nodes[path][members]
+                dispatcher.submit(task((*path, c)))
+
+    return assemble_hierarchy(G, weight, labels, results)
+
+
+def distributed_resolution_sweep(
+    G: Graph | ArrayGraph,
+    quality_functions: Sequence[QualityFunction[int]],
+    backend: Backend,
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    *,
+    seed: int = 0,
+    retries: int = 2,
+) -> list[Partition[Any] | IntArray]:
+    """
+    Run the Leiden algorithm for every given quality function as a task on the given backend, e.g. for a range of resolutions.
+
+    The parameters are the same as for `distributed_hierarchical_leiden`, except that the runs use the given quality functions. Every
+    task carries a copy of the whole graph.
+
+    :returns: The same as `resolution_sweep`, which returns the same partitions for the same seed.
+    """
+    graph, labels = to_csr_graph(G, weight)
+    dispatcher = _Dispatcher(backend, retries)
+    payload = SubgraphPayload(graph)
+    for i, 𝓗 in enumerate(quality_functions):
+        dispatcher.submit(Task(("sweep", i), derive_seed(seed, i), payload, 𝓗, θ, γ))
+
+    memberships: dict[int, IntArray] = {}
+    for finished, membership in dispatcher.results():
+        memberships[cast(int, finished.task_id[1])] = membership
+    return [to_result(G, labels, weight, memberships[i]) for i in range(len(quality_functions))]
@@ -1,10 +1,24 @@
-from typing import Generic, TypedDict, TypeVar
+from __future__ import annotations
 
-from networkx import Graph
+from collections.abc import Iterator, Mapping
+from concurrent.futures import Executor, Future
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Generic, TypedDict, TypeVar, overload
 
+import numpy as np
+
+from heirarchical_leiden.array_leiden import ArrayGraph, array_hierarchical_leiden, array_leiden, as_csr_graph, community_members
+from heirarchical_leiden.csr import CSRGraph, IntArray
+from heirarchical_leiden.hooks import LeidenHooks, SubtreePath
 from heirarchical_leiden.leiden import leiden
+from heirarchical_leiden.memory import MemoryBudget
+from heirarchical_leiden.ordering import Ordering, reorder_graph, restore_partition
 from heirarchical_leiden.quality_functions import QualityFunction
-from heirarchical_leiden.utils import Partition
+from heirarchical_leiden.utils import Partition, is_graph
+from heirarchical_leiden.visiting import VisitStrategy
+
+if TYPE_CHECKING:
+    from networkx import Graph
 
 T = TypeVar("T")
 
@@ -12,8 +26,10 @@ T = TypeVar("T")
 class HierarchicalPartition(TypedDict, Generic[T]):
     partition: Partition[T]
     level: int
-    children: dict[int, "HierarchicalPartition[T]"]
+    children: dict[int, HierarchicalPartition[T]]
+
 
+@overload
 def hierarchical_leiden(
     G: Graph,
     𝓗: QualityFunction[T],
@@ -23,18 +39,62 @@ def hierarchical_leiden(
     weight: str | None = None,
     partition_max_size: int = 64,
     level: int = 0,
-) -> HierarchicalPartition:
+    *,
+    hooks: LeidenHooks | None = None,
+    ordering: Ordering | None = None,
+    strategy: VisitStrategy | None = None,
+    memory_limit: int | None = None,
+    refine_samples: int | None = None,
+) -> HierarchicalPartition: ...
+
+
+@overload
+def hierarchical_leiden(
+    G: ArrayGraph,
+    𝓗: QualityFunction[int],
+    𝓟: None = None,
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    partition_max_size: int = 64,
+    level: int = 0,
+    *,
+    hooks: LeidenHooks | None = None,
+    ordering: Ordering | None = None,
+    strategy: VisitStrategy | None = None,
+    memory_limit: int | None = None,
+    refine_samples: int | None = None,
+) -> list[IntArray]: ...
+
+
+def hierarchical_leiden(
+    G: Graph | ArrayGraph,
+    𝓗: QualityFunction[Any],
+    𝓟: Partition[Any] | None = None,
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    partition_max_size: int = 64,
+    level: int = 0,
+    *,
+    hooks: LeidenHooks | None = None,
+    ordering: Ordering | None = None,
+    strategy: VisitStrategy | None = None,
+    memory_limit: int | None = None,
+    refine_samples: int | None = None,
+) -> HierarchicalPartition | list[IntArray]:
     """
     Perform the Leiden algorithm for community detection.
 
     Parameters
     ----------
-    G : Graph
-        The graph / network to process.
+    G : Graph | ArrayGraph
+        The graph / network to process. As for `leiden`, graphs can also be given in array form, e.g. as sparse adjacency matrices.
     𝓗 : QualityFunction[T]
         A quality function to optimize.
     𝓟 : Partition[T], optional
-        A partition to use as basis, leave at the default of `None` when none is available.
+        A partition to use as basis, leave at the default of `None` when none is available. Like `weight` and `level`, it is not
+        supported for graphs in array form.
     θ : float, optional
         The θ parameter of the Leiden method, which determines the randomness in the refinement phase of the Leiden
         algorithm, default value of 0.3.
@@ -45,18 +105,51 @@ def hierarchical_leiden(
     partition_max_size : int, optional
         The maximum size of a partition. If the partition is larger than this size, it will be split into smaller partitions.
         Default value of 64.
+    hooks : LeidenHooks | None, optional
+        Callbacks to report the progress to (per level of every run of `leiden` and per subtree), and to check whether to stop early.
+        Once the hooks request to stop, no further subtrees are split up, so the hierarchy is incomplete.
+    ordering : Ordering | None, optional
+        A node ordering to renumber (graphs in array form) or traverse (NetworkX graphs) the nodes in, see `leiden`.
+    strategy : VisitStrategy | None, optional
+        For NetworkX graphs, the order in which the local moving phases visit the nodes, see `leiden`.
+    memory_limit : int | None, optional
+        A limit for the memory of the process in bytes, see `leiden`. Close to the limit, the subtrees of NetworkX graphs are partitioned
+        as views of the communities' subgraphs instead of copies. By default, there is no limit.
+    refine_samples : int | None, optional
+        For NetworkX graphs, refine approximately, only considering up to this many communities for merging every node, see `leiden`.
+        This mostly speeds up the top levels of the hierarchy, which have the largest communities. By default, the refinement is exact.
 
-    :returns: A HierarchicalPartition of G into communities.
+    :returns: A HierarchicalPartition of G into communities. For graphs in array form, a list of membership arrays, one per level of
+        the hierarchy, is returned instead (see `array_hierarchical_leiden`).
     """
-    result = _hierarchical_leiden(G, 𝓗, 𝓟, θ, γ, weight, partition_max_size, level)
+    if memory_limit is not None:
+        hooks = MemoryBudget(memory_limit, hooks=hooks)
+    if not is_graph(G):
+        # The membership arrays of graphs in array form don't carry a partition to start from, edge attributes or levels
+        if 𝓟 is not None or weight is not None or level != 0:
+            raise ValueError("A partition to use as basis, a weight attribute and a level are only supported for NetworkX graphs.")
+        return array_hierarchical_leiden(G, 𝓗, θ, γ, partition_max_size, hooks=hooks, ordering=ordering)
+
+    # Run on a copy of G, which is traversed in the given order, see `leiden`
+    original = G
+    if ordering is not None:
+        G = reorder_graph(G, ordering, weight)
+        if 𝓟 is not None:
+            𝓟 = Partition.from_partition(G, 𝓟.communities, weight)
+
+    result = _hierarchical_leiden(G, 𝓗, 𝓟, θ, γ, weight, partition_max_size, level, hooks, (), strategy, refine_samples)
     if result is None:
         return {
-            "partition": Partition.from_partition(G, [G.nodes]),
+            "partition": Partition.from_partition(original, [original.nodes]),
             "level": level,
             "children": {},
         }
+    # The top level refers to G itself, the levels below to the subgraphs of the communities
+    if ordering is not None:
+        result["partition"] = restore_partition(original, result["partition"], weight)
     return result
 
+
 def _hierarchical_leiden(
     G: Graph,
     𝓗: QualityFunction[T],
@@ -66,9 +159,17 @@ def _hierarchical_leiden(
     weight: str | None = None,
     partition_max_size: int = 64,
     level: int = 0,
+    hooks: LeidenHooks | None = None,
+    path: SubtreePath = (),
+    strategy: VisitStrategy | None = None,
+    refine_samples: int | None = None,
 ) -> HierarchicalPartition | None:
     # Apply Leiden algorithm to get the partition
-    partition = leiden(G, 𝓗, 𝓟, θ, γ, weight)
+    partition = leiden(
+        G, 𝓗, 𝓟, θ, γ, weight, hooks=hooks.at(path) if hooks is not None else None, strategy=strategy, refine_samples=refine_samples
+    )
+    if hooks is not None:
+        hooks.on_progress({"kind": "subtree", "path": path, "level": level, "nodes": G.order(), "communities": len(partition)})
     if len(partition.communities) == 1:
         return None
 
@@ -80,12 +181,14 @@ def _hierarchical_leiden(
         community: set[T]
 
         # If the community is larger than the maximum size, recursively partition it
-        if len(community) > partition_max_size:
-            # Create a subgraph for this community
-            subgraph = G.subgraph(community).copy()
+        if len(community) > partition_max_size and not (hooks is not None and hooks.should_stop()):
+            # Create a subgraph for this community, or only a view of it, if memory is getting scarce
+            subgraph = G.subgraph(community) if hooks is not None and hooks.memory_pressure() else G.subgraph(community).copy()
 
             # Recursively apply hierarchical Leiden to the subgraph
-            child_partition = _hierarchical_leiden(subgraph, 𝓗, None, θ, γ, weight, partition_max_size, level + 1)
+            child_partition = _hierarchical_leiden(
+                subgraph, 𝓗, None, θ, γ, weight, partition_max_size, level + 1, hooks, (*path, idx), strategy, refine_samples
+            )
             if child_partition is not None:
                 children[idx] = child_partition
 
@@ -93,3 +196,253 @@ def _hierarchical_leiden(
     result: HierarchicalPartition = {"partition": partition, "level": level, "children": children}
 
     return result
+
+
+class _LazySettings(Generic[T]):
+    """The parameters shared by all nodes of a lazy hierarchical partition."""
+
+    def __init__(
+        self,
+        𝓗: QualityFunction[T],
+        θ: float,
+        γ: float,
+        weight: str | None,
+        partition_max_size: int,
+        executor: Executor | None,
+        prefetch_limit: int | None,
+    ) -> None:
+        self.𝓗 = 𝓗
+        self.θ = θ
+        self.γ = γ
+        self.weight = weight
+        self.partition_max_size = partition_max_size
+        self.executor = executor
+        self.prefetch_limit = prefetch_limit
+
+
+class LazyHierarchicalPartition(Generic[T]):
+    """
+    A hierarchical partition, whose children are only computed when they are first accessed, see `lazy_hierarchical_leiden`.
+
+    Just like a `HierarchicalPartition`, it provides the keys "partition", "level" and "children". The children are a mapping of the
+    indices of the communities, which might be split up further, to their hierarchical partitions. Accessing a single child computes
+    (only) that child, while iterating over the children or determining their number doesn't compute any of them: they cover all
+    communities larger than the maximum size. A community, which turns out not to be split up, is a leaf: its partition consists of a
+    single community, and it has no children. Computed children are memoized.
+    """
+
+    def __init__(
+        self, G: Graph, 𝓟: Partition[T], level: int, settings: _LazySettings[T], split: bool = True, prefetch: bool = True
+    ) -> None:
+        self.partition: Partition[T] = 𝓟
+        self.level: int = level
+        # If `split` is unset, the communities are not split up any further, i.e. there are no children
+        self.children: _LazyChildren[T] = _LazyChildren(G, 𝓟 if split else None, level, settings, prefetch)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in ("partition", "level", "children"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def expand(self) -> HierarchicalPartition[T]:
+        """Compute the complete hierarchy below this partition, returning it as a `HierarchicalPartition`."""
+        return {
+            "partition": self.partition,
+            "level": self.level,
+            # Just as in `hierarchical_leiden`, communities which aren't split up (i.e. the leaves) have no child
+            "children": {idx: child.expand() for idx, child in self.children.items() if len(child.partition) > 1},
+        }
+
+
+class _LazyChildren(Mapping[int, LazyHierarchicalPartition[T]]):
+    """The children of a `LazyHierarchicalPartition`, which are computed on demand."""
+
+    def __init__(self, G: Graph, 𝓟: Partition[T] | None, level: int, settings: _LazySettings[T], prefetch: bool) -> None:
+        self._G = G
+        self._level = level
+        self._settings = settings
+        # The communities which are larger than the maximum size and thus might be split up, by their index
+        communities = 𝓟.communities if 𝓟 is not None else ()
+        self._candidates: dict[int, set[T]] = {
+            idx: community for idx, community in enumerate(communities) if len(community) > settings.partition_max_size
+        }
+        # The (pending) computations of the children, which are started at most once per child
+        self._futures: dict[int, Future[LazyHierarchicalPartition[T]]] = {}
+        self._lock = Lock()
+        self._prefetched = False
+        if prefetch:
+            self._prefetch()
+
+    def _prefetch(self) -> None:
+        # Prefetch (at most `prefetch_limit` of) the children in the background, starting with the largest communities, which are the
+        # most likely ones to be expanded. The children only prefetch their own children once they are accessed, i.e. the prefetching
+        # stays a single level ahead of the caller, instead of computing the whole hierarchy in the background.
+        with self._lock:
+            if self._settings.executor is None or self._prefetched:
+                return
+            self._prefetched = True
+        largest = sorted(self._candidates, key=lambda idx: -len(self._candidates[idx]))
+        for idx in largest[: self._settings.prefetch_limit]:
+            self._future(idx)
+
+    def _compute(self, idx: int) -> LazyHierarchicalPartition[T]:
+        subgraph = self._G.subgraph(self._candidates[idx]).copy()
+        s = self._settings
+        partition = leiden(subgraph, s.𝓗, None, s.θ, s.γ, s.weight)
+        # Communities which aren't split up are leaves, just like the top level of a graph consisting of a single community
+        if len(partition.communities) == 1:
+            leaf = Partition.from_partition(subgraph, [subgraph.nodes])
+            return LazyHierarchicalPartition(subgraph, leaf, self._level + 1, s, split=False, prefetch=False)
+        return LazyHierarchicalPartition(subgraph, partition, self._level + 1, s, prefetch=False)
+
+    def _future(self, idx: int) -> Future[LazyHierarchicalPartition[T]]:
+        with self._lock:
+            if idx in self._futures:
+                return self._futures[idx]
+            if self._settings.executor is not None:
+                future = self._settings.executor.submit(self._compute, idx)
+                self._futures[idx] = future
+                return future
+            # Without an executor, claim the child and compute it in the calling thread
+            future = self._futures[idx] = Future()
+        try:
+            future.set_result(self._compute(idx))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def __getitem__(self, idx: int) -> LazyHierarchicalPartition[T]:
+        if idx not in self._candidates:
+            raise KeyError(idx)
+        child = self._future(idx).result()
+        child.children._prefetch()
+        return child
+
+    def __contains__(self, idx: object) -> bool:
+        return idx in self._candidates
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._candidates)
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+    def computed(self) -> list[int]:
+        """Get the indices of the communities, whose children have been computed already (without computing any further ones)."""
+        return [idx for idx, future in self._futures.items() if future.done()]
+
+
+def lazy_hierarchical_leiden(
+    G: Graph,
+    𝓗: QualityFunction[T],
+    𝓟: Partition[T] | None = None,
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    partition_max_size: int = 64,
+    level: int = 0,
+    *,
+    prefetch: Executor | None = None,
+    prefetch_limit: int | None = None,
+) -> LazyHierarchicalPartition[T]:
+    """
+    Perform the hierarchical Leiden algorithm lazily: only the top level is computed right away, the levels below on demand.
+
+    The parameters are the same as for `hierarchical_leiden`, except for:
+
+    Parameters
+    ----------
+    prefetch : Executor | None, optional
+        An executor (e.g. a `concurrent.futures.ThreadPoolExecutor`), on which the children are computed in the background, starting
+        with the largest communities. By default, children are only computed in the calling thread when they are accessed. The children
+        of a child are only prefetched once that child is accessed.
+    prefetch_limit : int | None, optional
+        The maximum number of children of every accessed partition to prefetch, by default all of them.
+
+    :returns: A LazyHierarchicalPartition of G into communities, which computes its children on first access. `expand()` turns it
+        into a complete HierarchicalPartition.
+    """
+    settings = _LazySettings(𝓗, θ, γ, weight, partition_max_size, prefetch, prefetch_limit)
+    partition = leiden(G, 𝓗, 𝓟, θ, γ, weight)
+    if len(partition.communities) == 1:
+        return LazyHierarchicalPartition(G, Partition.from_partition(G, [G.nodes]), level, settings, split=False)
+    return LazyHierarchicalPartition(G, partition, level, settings)
+
+
+def stream_hierarchical_leiden(
+    G: Graph | ArrayGraph,
+    𝓗: QualityFunction[Any],
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    partition_max_size: int = 64,
+    *,
+    hooks: LeidenHooks | None = None,
+) -> Iterator[tuple[SubtreePath, Any]]:
+    """
+    Perform the hierarchical Leiden algorithm, yielding every community of the hierarchy as soon as it is found.
+
+    In contrast to `hierarchical_leiden`, no HierarchicalPartition is built: the communities are yielded as records `(path, members)`,
+    where `path` is the path of the community in the hierarchy, i.e. the indices of the communities leading to it, starting from the top
+    level (so `path[:-1]` is the path of its parent). The subgraph and the partition of every subtree are released as soon as its
+    communities are yielded, so only the nodes of the communities still to be split up are kept in memory.
+
+    The parameters are the same as for `hierarchical_leiden`. The communities are the same as those of `hierarchical_leiden` (and are
+    yielded in depth-first order), given the same state of the random number generator.
+
+    :returns: An iterator over the communities of the hierarchy, whose members are sets of nodes, or for graphs in array form, arrays of
+        node indices.
+    """
+    if not is_graph(G):
+        yield from _stream_array_hierarchical_leiden(as_csr_graph(G), 𝓗, θ, γ, partition_max_size, hooks)
+        return
+
+    # The subtrees still to be partitioned, with their nodes (the whole graph for the top level)
+    stack: list[tuple[SubtreePath, set[Any] | None]] = [((), None)]
+    while stack:
+        path, nodes = stack.pop()
+        subgraph = G if nodes is None else G.subgraph(nodes).copy()
+        partition = leiden(subgraph, 𝓗, None, θ, γ, weight, hooks=hooks.at(path) if hooks is not None else None)
+        communities = partition.communities
+        if hooks is not None:
+            hooks.on_progress(
+                {"kind": "subtree", "path": path, "level": len(path), "nodes": len(partition.G), "communities": len(communities)}
+            )
+        # Release the subgraph and the partition before the communities are processed by the consumer
+        del subgraph, partition
+
+        # Just as in `hierarchical_leiden`, communities which aren't split up have no children (except for the top level)
+        if len(communities) == 1 and path:
+            continue
+        for idx, community in enumerate(communities):
+            yield (*path, idx), community
+        if len(communities) == 1 or (hooks is not None and hooks.should_stop()):
+            continue
+
+        # Continue with the first of the communities, which are too large, so that the subtrees are processed depth first
+        large = [((*path, idx), community) for idx, community in enumerate(communities) if len(community) > partition_max_size]
+        stack.extend(reversed(large))
+
+
+def _stream_array_hierarchical_leiden(
+    graph: CSRGraph, 𝓗: QualityFunction[int], θ: float, γ: float, partition_max_size: int, hooks: LeidenHooks | None
+) -> Iterator[tuple[SubtreePath, IntArray]]:
+    stack: list[tuple[SubtreePath, IntArray]] = [((), np.arange(graph.order(), dtype=np.int64))]
+    while stack:
+        path, nodes = stack.pop()
+        subgraph = graph if not path else graph.subgraph(nodes)
+        membership = array_leiden(subgraph, 𝓗, None, θ, γ, hooks=hooks.at(path) if hooks is not None else None)
+        k = int(membership.max(initial=-1)) + 1
+        if hooks is not None:
+            hooks.on_progress({"kind": "subtree", "path": path, "level": len(path), "nodes": len(nodes), "communities": k})
+        if k == 1 and path:
+            continue
+        # Map the members of every community back to the nodes of the whole graph
+        communities = [nodes[members] for members in community_members(membership)]
+        del subgraph, membership
+        for idx, community in enumerate(communities):
+            yield (*path, idx), community
+        if k == 1 or (hooks is not None and hooks.should_stop()):
+            continue
+        large = [((*path, idx), community) for idx, community in enumerate(communities) if len(community) > partition_max_size]
+        stack.extend(reversed(large))
@@ -0,0 +1,115 @@
+"""
+Hooks for observing and controlling runs of the Leiden algorithm.
+
+`leiden` and `hierarchical_leiden` accept a `LeidenHooks` object, whose methods they call at certain points of the algorithm: to report
+progress, and to check whether they should stop early. Subclasses override the methods they are interested in.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal, TypedDict
+
+if TYPE_CHECKING:
+    from heirarchical_leiden.utils import TerminationReason
+
+# The path of a subtree in a hierarchical partition: the indices of the communities leading to it, starting from the root
+SubtreePath = tuple[int, ...]
+
+
+class ProgressEvent(TypedDict):
+    """
+    A progress report of a run of the Leiden algorithm.
+
+    "level" events are reported after the local moving phase of every level, "subtree" events whenever `hierarchical_leiden` has
+    partitioned a subtree. `path` identifies the subtree in the hierarchy (it is empty for the top level, and for plain `leiden` runs),
+    `level` is the level within the run of `leiden` or the depth of the subtree, respectively. `nodes` is the number of nodes of the
+    (aggregate) graph processed and `communities` the number of communities found.
+    """
+
+    kind: Literal["level", "subtree"]
+    path: SubtreePath
+    level: int
+    nodes: int
+    communities: int
+
+
+class LocalMovingStats(TypedDict):
+    """
+    Statistics about a local moving phase of the NetworkX implementation of the Leiden algorithm, for profiling the visit strategies.
+
+    `strategy` is the name of the visit strategy used (see `heirarchical_leiden.visiting`), `visits` the number of nodes visited, and
+    `evaluations` the number of evaluations of the quality function's `delta`, i.e. of moves considered. `moves` is the number of nodes
+    actually moved.
+    """
+
+    path: SubtreePath
+    level: int
+    strategy: str
+    visits: int
+    evaluations: int
+    moves: int
+
+
+class LeidenHooks:
+    """Callbacks invoked during a run of the Leiden algorithm. The default implementations do nothing."""
+
+    def should_stop(self) -> bool:
+        """
+        Determine whether the run should stop as soon as possible, e.g. because it was cancelled.
+
+        This is checked between the node visits of the local moving phase. `leiden` then returns the best partition found so far,
+        with its termination reason set to `TerminationReason.CANCELLED`, and `hierarchical_leiden` doesn't split up further subtrees.
+        """
+        return False
+
+    def on_progress(self, event: ProgressEvent) -> None:
+        """Receive a progress report."""
+
+    def memory_pressure(self) -> bool:
+        """
+        Determine whether memory is getting scarce, so that the run should save memory at the expense of speed (see `MemoryBudget`).
+
+        This is checked before memory-intensive steps, such as aggregating the graph or inducing the subgraph of a community.
+        """
+        return False
+
+    def on_local_moving(self, stats: LocalMovingStats) -> None:
+        """Receive the statistics of a local moving phase of the NetworkX implementation, see `LocalMovingStats`."""
+
+    def on_termination(self, reason: TerminationReason) -> None:
+        """
+        Receive the reason for which a run of `leiden` terminated, once it did.
+
+        Partitions of NetworkX graphs also record it as their `termination_reason`, while the membership arrays returned for graphs in
+        array form have no place for it, so this is how their runs report it.
+        """
+
+    def at(self, path: SubtreePath) -> LeidenHooks:
+        """Get hooks for the run of `leiden` on the subtree at the given path, which report that path in their progress events."""
+        return _SubtreeHooks(self, path) if path else self
+
+
+class _SubtreeHooks(LeidenHooks):
+    """Hooks which forward to other hooks, setting the path of the progress events."""
+
+    def __init__(self, hooks: LeidenHooks, path: SubtreePath) -> None:
+        self.hooks = hooks
+        self.path = path
+
+    def should_stop(self) -> bool:
+        return self.hooks.should_stop()
+
+    def on_progress(self, event: ProgressEvent) -> None:
+        self.hooks.on_progress({**event, "path": self.path})
+
+    def memory_pressure(self) -> bool:
+        return self.hooks.memory_pressure()
+
+    def on_local_moving(self, stats: LocalMovingStats) -> None:
+        self.hooks.on_local_moving({**stats, "path": self.path})
+
+    def on_termination(self, reason: TerminationReason) -> None:
+        self.hooks.on_termination(reason)
+
+    def at(self, path: SubtreePath) -> LeidenHooks:
+        return self.hooks.at(path)
@@ -0,0 +1,357 @@
+"""
+Array-based kernels of the Leiden algorithm, operating on graphs in CSR format (see `heirarchical_leiden.csr`).
+
+The kernels implement the same steps as `move_nodes_fast`, `merge_nodes_subset` and `Partition.aggregate_graph`, but represent
+partitions as membership arrays, mapping every node to the index of its community, instead of lists of sets.
+The graph is processed in blocks of consecutive nodes, so that a memory-mapped graph is read sequentially, one block at a time.
+
+Only quality functions with a known closed form of the delta are supported, that is, `Modularity` and `CPM`.
+For both of them, the increase of the quality when moving node v from community S into community T is
+
+    c₁ · (w(v,T) - w(v,S - {v})) - c₂ · x(v) · (x(v) + x(T) - x(S)),
+
+where w(v,C) is the total weight of edges between v and C and x(C) is the sum of the degrees (Modularity) or node weights (CPM) of the
+nodes in C. This module calls (c₁, c₂, x) the *coefficients* of the quality function. Nodes can be divided into groups, each with
+coefficients (c₁, c₂) of its own, so that several graphs packed into one are clustered as if they were separate graphs.
+
+The inner loops of the kernels are implemented in `heirarchical_leiden._kernels`. If Numba is installed, it is imported and they are
+compiled at their first use, otherwise they are run by the Python interpreter. Since both backends run the same code on the same random
+numbers, their results are identical.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Iterator
+from importlib.util import find_spec
+from random import random, shuffle
+from time import monotonic
+from typing import Any, cast
+
+import numpy as np
+import numpy.typing as npt
+
+from heirarchical_leiden import _kernels
+from heirarchical_leiden.csr import CSRGraph, EdgeChunk, FloatArray, IntArray
+from heirarchical_leiden.hooks import LeidenHooks
+from heirarchical_leiden.quality_functions import CPM, Modularity, QualityFunction
+
+# The coefficients c₁ and c₂ per group, x per node, and the group of every node
+Coefficients = tuple[FloatArray, FloatArray, FloatArray, IntArray]
+Membership = list[int] | IntArray
+
+
+def quality_coefficients(𝓗: QualityFunction[int], graph: CSRGraph, groups: npt.ArrayLike | None = None) -> Coefficients:
+    """
+    Determine the coefficients (c₁, c₂, x) of the delta of the quality function 𝓗 on the given graph.
+
+    If `groups` assigns the nodes to groups `0, …, k-1`, which aren't connected to each other, every group gets the coefficients of 𝓗
+    on the subgraph induced by it. Otherwise, all nodes form a single group.
+    """
+    labels = np.zeros(graph.order(), dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+    k = int(labels.max(initial=0)) + 1
+    if isinstance(𝓗, Modularity):
+        m = np.bincount(labels, weights=graph.degrees, minlength=k) / 2
+        # Modularity is not defined for graphs without edges. Just as for the NaN values calculated by `Modularity.delta`, no move is
+        # an improvement then.
+        c1 = np.divide(1, m, out=np.zeros(k), where=m > 0)
+        c2 = np.divide(𝓗.γ, 2 * m * m, out=np.zeros(k), where=m > 0)
+        return c1, c2, graph.degrees, labels
+    if isinstance(𝓗, CPM):
+        return np.ones(k), np.full(k, 𝓗.γ, dtype=np.float64), graph.node_weights, labels
+    raise TypeError(f"The array-based kernels only support Modularity and CPM, not {type(𝓗).__name__}.")
+
+
+_KERNELS = ("local_move", "cut_sizes", "refine")
+
+# Whether Numba is installed. It is only imported, and the kernels compiled, at the first use of a kernel with the numba backend, as
+# importing it takes longer than importing the rest of the package.
+NUMBA_AVAILABLE: bool = find_spec("numba") is not None
+_COMPILED: dict[str, Callable[..., Any]] | None = None
+
+
+def _compiled_kernels() -> dict[str, Callable[..., Any]]:
+    """Compile the inner loops in `heirarchical_leiden._kernels` using Numba on first use."""
+    global _COMPILED  # noqa: PLW0603
+    if _COMPILED is None:
+        import numba  # noqa: PLC0415 (imported lazily, see NUMBA_AVAILABLE)
+
+        _COMPILED = {name: numba.njit(cache=True, nogil=True)(getattr(_kernels, name)) for name in _KERNELS}
+    return _COMPILED
+
+
+def _validate_backend(backend: str) -> str:
+    """Check that the given backend is known and available, returning it."""
+    if backend not in ("python", "numba"):
+        raise ValueError(f"Unknown backend {backend!r}, expected 'python' or 'numba'.")
+    if backend == "numba" and not NUMBA_AVAILABLE:
+        raise ImportError("The numba backend requires the numba package to be installed.")
+    return backend
+
+
+# The backend running the inner loops: "numba" if Numba is available, else "python". It can be overridden by the environment variable
+# HIERARCHICAL_LEIDEN_BACKEND or by calling `set_backend`.
+BACKEND: str = _validate_backend(os.environ.get("HIERARCHICAL_LEIDEN_BACKEND", "numba" if NUMBA_AVAILABLE else "python"))
+
+
+def set_backend(backend: str) -> None:
+    """Select the backend running the inner loops of the kernels, either "python" or "numba"."""
+    global BACKEND  # noqa: PLW0603
+    BACKEND = _validate_backend(backend)
+
+
+def _kernel(name: str) -> Callable[..., Any]:
+    """Get the implementation of the named inner loop for the selected backend."""
+    if BACKEND == "numba":
+        return _compiled_kernels()[name]
+    return cast(Callable[..., Any], getattr(_kernels, name))
+
+
+def _array(values: npt.ArrayLike, dtype: type[np.generic], copy: bool = False) -> Any:
+    """
+    Convert the given values into the representation that the selected backend works with best: lists for Python, else arrays.
+
+    Arrays of the right type are passed on as they are, unless a `copy` is requested, which the kernels can modify independently.
+    """
+    array = np.array(values, dtype=dtype) if copy else np.asarray(values, dtype=dtype)
+    return array.tolist() if BACKEND == "python" else array
+
+
+class _LocalMovingState:
+    """The arrays of `_kernels.local_move` that persist while moving the nodes of a graph."""
+
+    def __init__(self, membership: Membership, coefficients: Coefficients) -> None:
+        n = len(membership)
+        c1, c2, x, groups = coefficients
+        labels = np.asarray(membership, dtype=np.int64)
+        sizes = np.bincount(labels, minlength=n)
+        # The stack of unused community indices, from which new communities are taken (the smallest index is on top)
+        free = np.zeros(n, dtype=np.int64)
+        unused = np.flatnonzero(sizes == 0)[::-1]
+        free[: len(unused)] = unused
+
+        self.c1 = _array(c1, np.float64)
+        self.c2 = _array(c2, np.float64)
+        self.x = _array(x, np.float64)
+        self.groups = _array(groups, np.int64)
+        self.membership = _array(labels, np.int64, copy=True)
+        self.totals = _array(np.bincount(labels, weights=x, minlength=n), np.float64)
+        self.sizes = _array(sizes, np.int64)
+        self.free = _array(free, np.int64)
+        self.queue = _array(np.zeros(n), np.int64)
+        self.queued = _array(np.zeros(n), np.bool_)
+        self.links = _array(np.zeros(n), np.float64)
+        self.linked = _array(np.zeros(n), np.bool_)
+        self.touched = _array(np.zeros(n), np.int64)
+        self.state = _array([0, 0, len(unused)], np.int64)
+        # The block of the graph converted for the backend last, which is reused as long as the same block is processed
+        self._block: tuple[int, int, Any, Any, Any] | None = None
+
+    def enqueue(self, nodes: list[int]) -> None:
+        """Replace the contents of the (empty) queue with the given nodes."""
+        for i, v in enumerate(nodes):
+            self.queue[i] = v
+            self.queued[v] = True
+        self.state[0] = 0
+        self.state[1] = len(nodes)
+
+    def run(self, graph: CSRGraph, start: int, stop: int, requeue: bool, budget: int) -> tuple[int, int]:
+        """Process up to `budget` nodes of the queue, which all have to be in the block `[start, stop)` of the graph."""
+        if self._block is None or self._block[:2] != (start, stop):
+            indptr, indices, weights = graph.block(start, stop)
+            self._block = (start, stop, _array(indptr, np.int64), _array(indices, np.int64), _array(weights, np.float64))
+        _, _, indptr, indices, weights = self._block
+        lo = int(indptr[0])
+        return cast(
+            tuple[int, int],
+            _kernel("local_move")(
+                indptr, indices, weights, start, lo, self.x, self.membership,
+                self.totals, self.sizes, self.free, self.queue, self.queued, self.links, self.linked, self.touched, self.state,
+                self.groups, self.c1, self.c2, requeue, budget,
+            ),
+        )  # fmt: skip
+
+
+def move_nodes_queue(
+    graph: CSRGraph,
+    membership: Membership,
+    𝓗: QualityFunction[int],
+    max_iterations: int | None = None,
+    deadline: float | None = None,
+    hooks: LeidenHooks | None = None,
+    groups: npt.ArrayLike | None = None,
+) -> list[int]:
+    """
+    Perform fast local node moves, visiting the nodes using a queue, just as `move_nodes_fast` does.
+
+    The phase ends early after `max_iterations` node visits, once the `time.monotonic()` clock passes the `deadline`, or once the
+    `hooks` request to stop. These conditions are checked every few thousand node visits. For `groups`, see `quality_coefficients`.
+    """
+    state = _LocalMovingState(membership, quality_coefficients(𝓗, graph, groups))
+
+    # Create a queue to visit all nodes in random order
+    order = list(range(graph.order()))
+    shuffle(order)
+    state.enqueue(order)
+
+    # Run the kernel in slices, so that the budgets can be checked in between
+    remaining = max_iterations
+    while state.state[1] > 0 and (remaining is None or remaining > 0) and (deadline is None or monotonic() < deadline):
+        if hooks is not None and hooks.should_stop():
+            break
+        budget = _SLICE if remaining is None else min(_SLICE, remaining)
+        visits, _ = state.run(graph, 0, graph.order(), True, budget)
+        if remaining is not None:
+            remaining -= visits
+
+    return list(state.membership) if BACKEND == "python" else cast(list[int], state.membership.tolist())
+
+
+# The number of node visits between two checks of the budgets in `move_nodes_queue`
+_SLICE = 4096
+
+
+def move_nodes_blocks(
+    graph: CSRGraph, membership: Membership, 𝓗: QualityFunction[int], max_edges: int | None = None, max_sweeps: int | None = None
+) -> IntArray:
+    """
+    Perform local node moves in sweeps over the blocks of the graph, until a sweep doesn't move any node.
+
+    In contrast to `move_nodes_fast`, the nodes are not visited using a queue, as this would require random access to the graph.
+    Instead, every sweep reads the blocks in random order and visits the nodes of each block in random order.
+    """
+    state = _LocalMovingState(membership, quality_coefficients(𝓗, graph))
+    blocks = graph.blocks(max_edges)
+
+    sweeps = 0
+    while max_sweeps is None or sweeps < max_sweeps:
+        sweeps += 1
+        moved = 0
+        shuffle(blocks)
+        for start, stop in blocks:
+            order = list(range(start, stop))
+            shuffle(order)
+            state.enqueue(order)
+            moved += state.run(graph, start, stop, False, len(order))[1]
+        if moved == 0:
+            break
+
+    return np.asarray(state.membership, dtype=np.int64)
+
+
+def refine_partition(
+    graph: CSRGraph,
+    membership: Membership,
+    𝓗: QualityFunction[int],
+    θ: float,
+    γ: float,
+    max_edges: int | None = None,
+    groups: npt.ArrayLike | None = None,
+) -> IntArray:
+    """
+    Refine all communities of the given membership array by merging nodes, starting from a singleton partition.
+
+    This is the array-based counterpart of `refine_partition` and `merge_nodes_subset`, taking two passes over the graph's blocks:
+    The first one determines how well each node is connected to the rest of its community, the second one merges the nodes.
+    Returns the refined membership array, with the communities numbered consecutively. For `groups`, see `quality_coefficients`.
+    """
+    c1, c2, x, node_groups = quality_coefficients(𝓗, graph, groups)
+    n = graph.order()
+    labels = np.asarray(membership, dtype=np.int64)
+    members = _array(labels, np.int64)
+    # The total node weight of every community S of the partition to refine
+    size_s = _array(np.bincount(labels, weights=graph.node_weights, minlength=n), np.float64)
+
+    # First pass: calculate the cut sizes w(v, S - {v})
+    cut = _array(np.zeros(n), np.float64)
+    for start, stop in graph.blocks(max_edges):
+        indptr, indices, weights = graph.block(start, stop)
+        _kernel("cut_sizes")(
+            _array(indptr, np.int64), _array(indices, np.int64), _array(weights, np.float64), start, stop, int(indptr[0]), members, cut
+        )
+
+    # Start with the singleton partition, keeping track of the size, node weight, sum of x and cut size w(C, S - C) per community
+    refined = _array(np.arange(n), np.int64)
+    refined_size = _array(np.ones(n), np.int64)
+    refined_weight = _array(graph.node_weights, np.float64, copy=True)
+    refined_x = _array(x, np.float64, copy=True)
+    refined_cut = _array(cut, np.float64, copy=True)
+    node_weights = _array(graph.node_weights, np.float64)
+    links, linked, touched = _array(np.zeros(n), np.float64), _array(np.zeros(n), np.bool_), _array(np.zeros(n), np.int64)
+    candidates, cumulative = _array(np.zeros(n + 1), np.int64), _array(np.zeros(n + 1), np.float64)
+    groups_of, coefficient_1, coefficient_2 = _array(node_groups, np.int64), _array(c1, np.float64), _array(c2, np.float64)
+
+    # Second pass: merge every well-connected node, which is still a singleton, into a well-connected community within S
+    for start, stop in graph.blocks(max_edges):
+        indptr, indices, weights = graph.block(start, stop)
+        order = list(range(start, stop))
+        shuffle(order)
+        uniforms = [random() for _ in order]
+        _kernel("refine")(
+            _array(indptr, np.int64), _array(indices, np.int64), _array(weights, np.float64), start, int(indptr[0]),
+            _array(order, np.int64), _array(uniforms, np.float64), members, node_weights, _array(x, np.float64), size_s, cut,
+            refined, refined_size, refined_weight, refined_x, refined_cut, links, linked, touched, candidates, cumulative,
+            groups_of, coefficient_1, coefficient_2, θ, γ,
+        )  # fmt: skip
+
+    # Number the refined communities consecutively
+    _, consecutive = np.unique(np.asarray(refined, dtype=np.int64), return_inverse=True)
+    return consecutive.astype(np.int64)
+
+
+def aggregate_edges(graph: CSRGraph, membership: IntArray, max_edges: int | None = None) -> Iterator[EdgeChunk]:
+    """
+    Produce the edges of the aggregate graph of the given membership array in chunks, one chunk per block of the graph.
+
+    Edges within a community become self-loops of the community's node. Edges occurring multiple times within a chunk are combined.
+    """
+    k = int(membership.max(initial=-1)) + 1
+    for src, dst, weight in graph.edges(max_edges):
+        a, b = membership[src], membership[dst]
+        keys, inverse = np.unique(np.minimum(a, b) * k + np.maximum(a, b), return_inverse=True)
+        yield keys // k, keys % k, np.bincount(inverse, weights=weight, minlength=len(keys)).astype(np.float64)
+
+
+def aggregate_graph(graph: CSRGraph, membership: IntArray, max_edges: int | None = None) -> CSRGraph:
+    """Create the aggregate graph of the given membership array in memory, which has one node per community."""
+    src, dst, weight = (np.concatenate(parts) for parts in zip(*aggregate_edges(graph, membership, max_edges)))
+    k = int(membership.max(initial=-1)) + 1
+    return CSRGraph.from_edges(src, dst, weight, k, aggregate_node_weights(graph, membership))
+
+
+def aggregate_node_weights(graph: CSRGraph, membership: IntArray) -> FloatArray:
+    """Sum up the node weights of the given graph per community of the given membership array."""
+    k = int(membership.max(initial=-1)) + 1
+    return np.bincount(membership, weights=graph.node_weights, minlength=k).astype(np.float64)
+
+
+def quality(𝓗: QualityFunction[int], graph: CSRGraph, membership: Membership, groups: npt.ArrayLike | None = None) -> float:
+    """
+    Measure the quality of the partition given by the membership array, with the same value as `𝓗(𝓟)` for the corresponding 𝓟.
+
+    If `groups` is given (see `quality_coefficients`), this is the sum of the qualities of the partitions of the groups' subgraphs.
+    """
+    labels = np.asarray(membership, dtype=np.int64)
+    k = int(labels.max(initial=-1)) + 1
+
+    # Determine the total weight of edges within each community
+    internal = np.zeros(k)
+    for src, dst, weight in graph.edges():
+        same = labels[src] == labels[dst]
+        internal += np.bincount(labels[src[same]], weights=np.asarray(weight)[same], minlength=k)
+
+    if isinstance(𝓗, Modularity):
+        # Determine the number of edges of the group every community belongs to
+        group_of = np.zeros(graph.order(), dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+        group_sizes = np.bincount(group_of, weights=graph.degrees, minlength=1) / 2
+        if np.any(group_sizes == 0):
+            return float("NaN")
+        community_group = np.zeros(k, dtype=np.int64)
+        community_group[labels] = group_of
+        m = group_sizes[community_group]
+        degree_sums = np.bincount(labels, weights=graph.degrees, minlength=k)
+        return float(((2 * internal - 𝓗.γ / (2 * m) * degree_sums**2) / (2 * m)).sum())
+    if isinstance(𝓗, CPM):
+        sizes = np.bincount(labels, weights=graph.node_weights, minlength=k)
+        return float((internal - 𝓗.γ * sizes * (sizes - 1) / 2).sum())
+    raise TypeError(f"The array-based kernels only support Modularity and CPM, not {type(𝓗).__name__}.")
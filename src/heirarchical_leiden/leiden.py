@@ -5,21 +5,49 @@ This implementation follows the outline provided in the supplementary material o
 guaranteeing well-connected communities" by V.A. Traag, L. Waltman and N.J. van Eck.
 """
 
+from __future__ import annotations
+
 from collections.abc import Set
 from math import exp
-from random import choices, shuffle
-from typing import TypeVar
-
-import networkx as nx
-from networkx import Graph
-
-from heirarchical_leiden.quality_functions import QualityFunction
+from random import choices, getstate, sample, setstate
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, Any, TypedDict, TypeVar, cast, overload
+
+import numpy.typing as npt
+
+from heirarchical_leiden.array_leiden import ArrayGraph, array_leiden, as_csr_graph
+from heirarchical_leiden.csr import IntArray
+from heirarchical_leiden.hooks import LeidenHooks, LocalMovingStats
+from heirarchical_leiden.memory import MemoryBudget
+from heirarchical_leiden.ordering import Ordering, reorder_graph, restore_partition
+from heirarchical_leiden.quality_functions import Modularity, QualityFunction
+from heirarchical_leiden.reduction import reduce_graph
 from heirarchical_leiden.utils import DataKeys as Keys
-from heirarchical_leiden.utils import Partition, argmax, freeze, node_total, preprocess_graph
+from heirarchical_leiden.utils import Partition, TerminationReason, argmax, freeze, import_networkx, is_graph, node_total, preprocess_graph
+from heirarchical_leiden.visiting import FIFOQueue, VisitStrategy
+
+if TYPE_CHECKING:
+    from networkx import Graph
 
 T = TypeVar("T")
 
 
+class RefinementComparison(TypedDict):
+    """
+    The quality of the approximate refinement relative to the exact one, see `compare_refinement`.
+
+    `exact` and `approximate` are the qualities of the refined partitions, `change` is the difference between them (negative, if the
+    approximate refinement is worse), and `exact_time` and `approximate_time` are the seconds taken by both refinements.
+    """
+
+    exact: float
+    approximate: float
+    change: float
+    exact_time: float
+    approximate_time: float
+
+
+@overload
 def leiden(
     G: Graph,
     𝓗: QualityFunction[T],
@@ -27,26 +55,188 @@ def leiden(
     θ: float = 0.3,
     γ: float = 0.05,
     weight: str | None = None,
-) -> Partition[T]:
+    *,
+    max_levels: int | None = None,
+    max_iterations: int | None = None,
+    min_quality_gain: float | None = None,
+    time_budget: float | None = None,
+    hooks: LeidenHooks | None = None,
+    reduce: bool = False,
+    ordering: Ordering | None = None,
+    strategy: VisitStrategy | None = None,
+    memory_limit: int | None = None,
+    refine_samples: int | None = None,
+    max_tree_size: int | None = None,
+) -> Partition[T]: ...
+
+
+@overload
+def leiden(
+    G: ArrayGraph,
+    𝓗: QualityFunction[int],
+    𝓟: npt.ArrayLike | None = None,
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    *,
+    max_levels: int | None = None,
+    max_iterations: int | None = None,
+    min_quality_gain: float | None = None,
+    time_budget: float | None = None,
+    hooks: LeidenHooks | None = None,
+    reduce: bool = False,
+    ordering: Ordering | None = None,
+    strategy: VisitStrategy | None = None,
+    memory_limit: int | None = None,
+    refine_samples: int | None = None,
+    max_tree_size: int | None = None,
+) -> IntArray: ...
+
+
+def leiden(
+    G: Graph | ArrayGraph,
+    𝓗: QualityFunction[Any],
+    𝓟: Partition[Any] | npt.ArrayLike | None = None,
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    *,
+    max_levels: int | None = None,
+    max_iterations: int | None = None,
+    min_quality_gain: float | None = None,
+    time_budget: float | None = None,
+    hooks: LeidenHooks | None = None,
+    reduce: bool = False,
+    ordering: Ordering | None = None,
+    strategy: VisitStrategy | None = None,
+    memory_limit: int | None = None,
+    refine_samples: int | None = None,
+    max_tree_size: int | None = None,
+) -> Partition[Any] | IntArray:
     """
     Perform the Leiden algorithm for community detection.
 
     Parameters
     ----------
-    G : Graph
-        The graph / network to process.
+    G : Graph | ArrayGraph
+        The graph / network to process. Besides NetworkX graphs, sparse adjacency matrices (e.g. `scipy.sparse.csr_matrix`), tuples of
+        edge arrays `(src, dst, weight)` and `CSRGraph`s are accepted, which are processed without converting them to NetworkX graphs.
     𝓗 : QualityFunction[T]
-        A quality function to optimize.
+        A quality function to optimize. For graphs in array form, this has to be `Modularity` or `CPM`.
     𝓟 : Partition[T], optional
         A partition to use as basis, leave at the default of `None` when none is available.
+        For graphs in array form, this is given as a membership array instead.
     θ : float, optional
         The θ parameter of the Leiden method, which determines the randomness in the refinement phase of the Leiden
         algorithm, default value of 0.3.
     γ : float, optional
         The γ parameter of the Leiden method, default value of 0.05.
-
-    :returns: A partition of G into communities.
+    weight : str | None, optional
+        The edge weight attribute to use, default value of None. This is not supported for graphs in array form, which carry their weights.
+    max_levels : int | None, optional
+        The maximum number of levels (rounds of local moving, each followed by an aggregation) to carry out.
+        By default, the number of levels is not limited.
+    max_iterations : int | None, optional
+        The maximum number of node visits in a single local moving phase. By default, the local moving phase only ends when its
+        queue of nodes to visit runs empty.
+    min_quality_gain : float | None, optional
+        The minimum relative improvement of 𝓗 that a level has to achieve over the previous one for the algorithm to continue.
+        By default, this check is disabled, as it requires evaluating 𝓗 once per level.
+    time_budget : float | None, optional
+        A wall-clock time budget in seconds. Once it is used up, the best partition found so far is returned.
+    hooks : LeidenHooks | None, optional
+        Callbacks to report the progress to after every level, and to check whether to stop early, e.g. because the run was cancelled
+        (see `heirarchical_leiden.hooks`).
+    reduce : bool, optional
+        Whether to reduce G before running the algorithm, by folding pendant trees into the nodes they are attached to and merging
+        structurally equivalent nodes (see `heirarchical_leiden.reduction`), default value of False. The result is still a partition of
+        G. This is only supported for `Modularity`, can't be combined with a partition 𝓟 to use as basis, and is not supported for
+        graphs in array form.
+    ordering : Ordering | None, optional
+        For graphs in array form, a node ordering ("rcm", "bfs" or "degree") to renumber the nodes with before running the algorithm,
+        improving the memory locality for graphs with arbitrary node ids (see `heirarchical_leiden.ordering`). The result refers to
+        the original nodes. By default, the nodes are not renumbered. NetworkX graphs are copied with their nodes inserted in this
+        order (see `reorder_graph`), whose neighborhoods are then traversed in this order, and the result refers to G itself.
+    strategy : VisitStrategy | None, optional
+        The order in which the local moving phase visits the nodes, e.g. `DegreeQueue()` or `PruneQueue()`, by default in random order
+        (see `heirarchical_leiden.visiting`). A strategy must not be shared by runs at the same time. This is not supported for graphs
+        in array form.
+    memory_limit : int | None, optional
+        A limit for the memory of the process in bytes. Close to the limit, the run saves memory at the expense of speed, and above it,
+        it fails with a `MemoryLimitExceededError` (see `heirarchical_leiden.memory`). Graphs in array form, which are unlikely to fit
+        into the remaining memory, are processed by `out_of_core_leiden`, ignoring the budgets and hooks. By default, there is no limit.
+    refine_samples : int | None, optional
+        Refine approximately, only considering up to this many communities, drawn from those of its neighbors, for merging every node,
+        which speeds up the refinement of very large communities at the expense of some quality (see `merge_nodes_subset` and
+        `compare_refinement`). By default, the refinement is exact. This is not supported for graphs in array form, whose refinement
+        only considers the communities of a node's neighbors anyway.
+    max_tree_size : int | None, optional
+        With `reduce`, the maximum size of the pendant trees to fold (see `reduce_graph`). By default, only single leaves are folded.
+
+    :returns: A partition of G into communities. Its `termination_reason` attribute records why the algorithm stopped.
+        For graphs in array form, an array mapping every node to the index of its community is returned instead, and the reason is
+        only reported to `hooks.on_termination`.
     """
+    budget = None if memory_limit is None else MemoryBudget(memory_limit, hooks=hooks)
+    hooks = hooks if budget is None else budget
+    if not is_graph(G):
+        # Graphs in array form carry their weights, and are clustered by the array kernels, which don't support these options
+        if weight is not None or reduce or strategy is not None or refine_samples is not None or max_tree_size is not None:
+            raise ValueError("weight, reduce, strategy, refine_samples and max_tree_size are only supported for NetworkX graphs.")
+        membership = cast("npt.ArrayLike | None", 𝓟)
+        graph = as_csr_graph(G)
+        # The graph, its aggregate graphs and the working arrays of the kernels take about three times the memory of the graph
+        if budget is not None and membership is None and not budget.fits(3 * graph.nbytes):
+            # Imported here, as `out_of_core` itself imports this module
+            from heirarchical_leiden.out_of_core import out_of_core_leiden  # noqa: PLC0415
+
+            return out_of_core_leiden(graph, 𝓗, θ, γ)
+        return array_leiden(
+            graph,
+            𝓗,
+            membership,
+            θ,
+            γ,
+            max_levels=max_levels,
+            max_iterations=max_iterations,
+            min_quality_gain=min_quality_gain,
+            time_budget=time_budget,
+            hooks=hooks,
+            ordering=ordering,
+        )
+    partition = cast("Partition[Any] | None", 𝓟)
+    if reduce and partition is not None:
+        raise ValueError("A partition to use as basis can't be combined with reducing the graph.")
+    # Folding leaves is only safe for modularity, e.g. for CPM, a leaf's best community depends on the sizes of the communities
+    if reduce and not isinstance(𝓗, Modularity):
+        raise ValueError("Reducing the graph is only supported for Modularity.")
+    original, original_weight = G, weight
+    # Run on a copy of G, which is traversed in the given order
+    if ordering is not None:
+        G = reorder_graph(G, ordering, weight)
+        if partition is not None:
+            partition = Partition.from_partition(G, partition.communities, weight)
+    if reduce:
+        G, weight = reduce_graph(G, weight, max_tree_size), Keys.WEIGHT
+    𝓠 = _leiden(G, 𝓗, partition, θ, γ, weight, max_levels, max_iterations, min_quality_gain, time_budget, hooks, strategy, refine_samples)
+    return 𝓠 if ordering is None else restore_partition(original, 𝓠, original_weight)
+
+
+def _leiden(
+    G: Graph,
+    𝓗: QualityFunction[T],
+    𝓟: Partition[T] | None,
+    θ: float,
+    γ: float,
+    weight: str | None,
+    max_levels: int | None,
+    max_iterations: int | None,
+    min_quality_gain: float | None,
+    time_budget: float | None,
+    hooks: LeidenHooks | None,
+    strategy: VisitStrategy | None = None,
+    refine_samples: int | None = None,
+) -> Partition[T]:
     # For every edge, assign an edge weight attribute of 1, if no weight is set yet.
     G = preprocess_graph(G, weight)
 
@@ -64,88 +254,171 @@ def leiden(
     # infinite loop.
     𝓟ₚ = None
 
+    # Determine the point in time at which the time budget is used up, and keep track of the levels and the quality reached so far.
+    deadline = None if time_budget is None else monotonic() + time_budget
+    level = 0
+    quality: float | None = None
+
     while True:
-        𝓟 = move_nodes_fast(G, 𝓟, 𝓗)
+        𝓟 = move_nodes_fast(G, 𝓟, 𝓗, max_iterations, deadline, hooks, strategy, level + 1)
+        level += 1
+
+        # Report the progress and stop, if requested to.
+        if hooks is not None:
+            hooks.on_progress({"kind": "level", "path": (), "level": level, "nodes": G.order(), "communities": len(𝓟)})
+            if hooks.should_stop():
+                return _terminate(𝓟, TerminationReason.CANCELLED, hooks)
+
+        # If the time budget was used up, the local moving phase may have been cut short, so check this first.
+        # As the local moving phase only ever improves 𝓟 and aggregating doesn't change its quality, the current partition 𝓟 is
+        # always the best partition found so far.
+        if deadline is not None and monotonic() >= deadline:
+            return _terminate(𝓟, TerminationReason.TIME_BUDGET, hooks)
 
         # When every community consists of a single node only, terminate, returning the flat partition given by 𝓟.
         # Also terminate, if the sequence of partition generated becomes stationary.
         if len(𝓟) == G.order() or 𝓟 == 𝓟ₚ:
             # Return the partition 𝓟 in terms of the original graph, which was passed to this function
-            return 𝓟.flatten()
+            return _terminate(𝓟, TerminationReason.CONVERGED, hooks)
+
+        # Check the remaining budgets
+        if max_levels is not None and level >= max_levels:
+            return _terminate(𝓟, TerminationReason.MAX_LEVELS, hooks)
+        if min_quality_gain is not None:
+            previous_quality, quality = quality, 𝓗(𝓟)
+            if previous_quality is not None and quality - previous_quality < min_quality_gain * abs(previous_quality):
+                return _terminate(𝓟, TerminationReason.MIN_QUALITY_GAIN, hooks)
 
         # Remember partition for termination check.
         𝓟ₚ = 𝓟
 
         # Refine the partition created by fast local moving, potentially splitting a community into multiple parts
-        𝓟ᵣ = refine_partition(G, 𝓟, 𝓗, θ, γ)
+        𝓟ᵣ = refine_partition(G, 𝓟, 𝓗, θ, γ, refine_samples)
+        # If memory is getting scarce, release the chain of aggregate graphs, by aggregating the original graph instead. This is slower,
+        # but only retains a single aggregate graph.
+        if hooks is not None and hooks.memory_pressure():
+            𝓟ᵣ, 𝓟 = 𝓟ᵣ.flatten(), 𝓟.flatten()
         # Create the aggregate graph of G based on 𝓟ᵣ …
         G = 𝓟ᵣ.aggregate_graph()
 
         # … but maintain partition 𝓟, that is, lift it to the aggregate graph.
-        # The following lines are equivalent to, but way faster than
-        # `partitions = [{v for v in G.nodes if G.nodes[v][Keys.NODES] <= C} for C in 𝓟]`.
-        partitions: dict[int, set[T]] = {id: set() for id in range(len(𝓟))}
-        # Iterate through the aggregate graph's nodes
-        for v_agg, nodes in G.nodes(data=Keys.NODES):
-            # Get the id of the community that the nodes collected in this super node were part of
-            community_id = 𝓟._node_part[next(iter(nodes))]
-            # Note that down in the partitions dict
-            partitions[community_id] = partitions[community_id] | {v_agg}
-        # Now, discard the indices and produce the list of values, i.e. the lifted partition
-        partitions_l: list[set[T]] = list(partitions.values())
-
-        𝓟 = Partition.from_partition(G, partitions_l, Keys.WEIGHT)
-
-
-def move_nodes_fast(G: Graph, 𝓟: Partition[T], 𝓗: QualityFunction[T]) -> Partition[T]:
+        # Every node of the aggregate graph belongs to the community of 𝓟 that the nodes collected in it were part of. This is
+        # linear in the number of aggregate nodes, and as aggregation preserves the degrees, 𝓟's degree sums carry over unchanged.
+        node_part: dict[Any, int] = {v_agg: 𝓟._node_part[next(iter(nodes))] for v_agg, nodes in G.nodes(data=Keys.NODES)}
+        𝓟 = Partition._from_membership(G, node_part, len(𝓟), Keys.WEIGHT, list(𝓟._partition_degree_sums))
+
+
+def _terminate(𝓟: Partition[T], reason: TerminationReason, hooks: LeidenHooks | None) -> Partition[T]:
+    """Flatten the partition 𝓟 to a partition of the original graph, recording (and reporting) the reason for the termination."""
+    𝓠 = 𝓟.flatten()
+    𝓠.termination_reason = reason
+    if hooks is not None:
+        hooks.on_termination(reason)
+    return 𝓠
+
+
+def move_nodes_fast(
+    G: Graph,
+    𝓟: Partition[T],
+    𝓗: QualityFunction[T],
+    max_iterations: int | None = None,
+    deadline: float | None = None,
+    hooks: LeidenHooks | None = None,
+    strategy: VisitStrategy | None = None,
+    level: int = 1,
+) -> Partition[T]:
     """
     Perform fast local node moves to communities to improve the partition's quality.
 
     For every node, greedily move it to a neighboring community, maximizing the improvement in the partition's quality.
+    The phase ends early after `max_iterations` node visits, once the `time.monotonic()` clock passes the `deadline`, or once the
+    `hooks` request to stop. The nodes are visited in the order given by the `strategy`, by default in random order using a FIFO queue.
+    The statistics of the phase are reported to the `hooks`, as the phase of the given `level`.
     """
-    # Create a queue to visit all nodes in random order.
-    Q = list(G.nodes)
-    shuffle(Q)
-
-    while True:
-        # Determine next node to visit by popping first node in the queue
-        v = Q.pop(0)
+    # Create a queue to visit all nodes in the order of the strategy.
+    Q = FIFOQueue() if strategy is None else strategy
+    Q.start(G)
+    iterations = evaluations = moves = 0
+
+    def gain(v: T, C: Set[T]) -> float:
+        nonlocal evaluations
+        evaluations += 1
+        return 𝓗.delta(𝓟, v, C)
+
+    while Q:
+        # Stop early, if the budget for this phase is used up
+        if (max_iterations is not None and iterations >= max_iterations) or (deadline is not None and monotonic() >= deadline):
+            break
+        if hooks is not None and hooks.should_stop():
+            break
+        iterations += 1
+
+        # Determine next node to visit by popping it from the queue
+        v = Q.pop()
 
         # Find an optimal community for node `v` to be in, potentially creating a new community.
         # Cₘ is the optimal community, 𝛥𝓗 is the increase of 𝓗 over 𝓗ₒ, reached at Cₘ.
-        (Cₘ, 𝛥𝓗, _) = argmax(lambda C: 𝓗.delta(𝓟, v, C), [*𝓟.adjacent_communities(v), set()])
+        (Cₘ, 𝛥𝓗, _) = argmax(lambda C: gain(v, C), [*𝓟.adjacent_communities(v), set()])
 
         # If we can achieve a strict improvement
         if 𝛥𝓗 > 0:
+            # Remember the neighbors of v, which stay behind in its current community
+            source = 𝓟.node_community(v)
+            left_behind = {u for u in G[v] if u in source and u != v}
+
             # Move node v to community Cₘ
             𝓟.move_node(v, Cₘ)
+            moves += 1
 
             # Identify neighbors of v that are not in Cₘ
             N = {u for u in G[v] if u not in Cₘ}
 
-            # Visit these neighbors as well
-            Q.extend(N - set(Q))
+            # Visit these neighbors as well (or those of them, which the strategy selects)
+            target = 𝓟.node_community(v)
+            Q.moved(v, 𝛥𝓗, N, left_behind, lambda u: gain(u, target))
+
+    # The queue is empty (or the phase was stopped early), return 𝓟
+    if hooks is not None:
+        stats: LocalMovingStats = {
+            "path": (), "level": level, "strategy": Q.name, "visits": iterations, "evaluations": evaluations, "moves": moves
+        }  # fmt: skip
+        hooks.on_local_moving(stats)
+    return 𝓟
 
-        # If queue is empty, return 𝓟
-        if len(Q) == 0:
-            return 𝓟
 
+def refine_partition(G: Graph, 𝓟: Partition[T], 𝓗: QualityFunction[T], θ: float, γ: float, samples: int | None = None) -> Partition[T]:
+    """
+    Refine all communities by merging repeatedly, starting from a singleton partition.
 
-def refine_partition(G: Graph, 𝓟: Partition[T], 𝓗: QualityFunction[T], θ: float, γ: float) -> Partition[T]:
-    """Refine all communities by merging repeatedly, starting from a singleton partition."""
+    With `samples`, the refinement is approximate, only considering up to this many communities for every node (see `merge_nodes_subset`).
+    """
     # Assign each node to its own community
     𝓟ᵣ: Partition[T] = Partition.singleton_partition(G, Keys.WEIGHT)
 
     # Visit all communities
     for C in 𝓟:
         # refine community
-        𝓟ᵣ = merge_nodes_subset(G, 𝓟ᵣ, 𝓗, θ, γ, C)
+        𝓟ᵣ = merge_nodes_subset(G, 𝓟ᵣ, 𝓗, θ, γ, C, samples)
 
     return 𝓟ᵣ
 
 
-def merge_nodes_subset(G: Graph, 𝓟: Partition[T], 𝓗: QualityFunction[T], θ: float, γ: float, S: Set[T]) -> Partition[T]:
-    """Merge the nodes in the subset S into one or more sets to refine the partition 𝓟."""
+def merge_nodes_subset(
+    G: Graph, 𝓟: Partition[T], 𝓗: QualityFunction[T], θ: float, γ: float, S: Set[T], samples: int | None = None
+) -> Partition[T]:
+    """
+    Merge the nodes in the subset S into one or more sets to refine the partition 𝓟.
+
+    By default, the refinement is exact, choosing among all well-connected communities within S for every node. For large subsets, this
+    dominates the run time, so with `samples`, it is approximate instead: Only up to `samples` communities, drawn at random from those of
+    v's neighbors within S, are considered for every node v, and the cuts of the communities are kept up to date as nodes are merged,
+    instead of being recalculated. The larger `samples`, the closer the result is to the exact refinement (see `compare_refinement`).
+    """
+    if samples is not None:
+        return _merge_nodes_sampled(G, 𝓟, 𝓗, θ, γ, S, samples)
+
+    nx = import_networkx()
+
     size_s = node_total(G, S)
 
     R = {
@@ -179,3 +452,83 @@ def merge_nodes_subset(G: Graph, 𝓟: Partition[T], 𝓗: QualityFunction[T], 
             𝓟.move_node(v, Cₙ)
 
     return 𝓟
+
+
+def compare_refinement(
+    G: Graph, 𝓟: Partition[T], 𝓗: QualityFunction[T], θ: float = 0.3, γ: float = 0.05, samples: int = 8, weight: str | None = None
+) -> RefinementComparison:
+    """
+    Refine the partition 𝓟 of G both exactly and approximately, with up to `samples` communities per node, and compare the results.
+
+    Both refinements start from the same state of the random number generator. This measures the loss of quality of a single
+    refinement, in order to choose `refine_samples` for `leiden`, before running it on a large graph.
+    """
+    G = preprocess_graph(G, weight)
+    state = getstate()
+
+    start = perf_counter()
+    exact = 𝓗(refine_partition(G, 𝓟, 𝓗, θ, γ))
+    exact_time = perf_counter() - start
+
+    setstate(state)
+    start = perf_counter()
+    approximate = 𝓗(refine_partition(G, 𝓟, 𝓗, θ, γ, samples))
+    approximate_time = perf_counter() - start
+
+    return {
+        "exact": exact, "approximate": approximate, "change": approximate - exact, "exact_time": exact_time,
+        "approximate_time": approximate_time,
+    }  # fmt: skip
+
+
+def _merge_nodes_sampled(G: Graph, 𝓟: Partition[T], 𝓗: QualityFunction[T], θ: float, γ: float, S: Set[T], samples: int) -> Partition[T]:
+    # Approximate merge_nodes_subset, considering only a sample of the communities of v's neighbors within S for every node v
+    size_s = node_total(G, S)
+
+    # Identify every community within S by a representative node, and record the total node weight and the cut (to the rest of S) of it.
+    # Communities reaching beyond S are left out, as they are never candidates.
+    rep: dict[T, T] = {}
+    for v in S:
+        C = 𝓟.node_community(v)
+        if v not in rep and C <= S:
+            rep.update((u, v) for u in C)
+    weight_of: dict[T, float] = {}
+    cut_of: dict[T, float] = {}
+    for v, r in rep.items():
+        weight_of[r] = weight_of.get(r, 0) + node_total(G, v)
+        cut_of[r] = cut_of.get(r, 0.0) + sum(d[Keys.WEIGHT] for u, d in G[v].items() if u in S and rep.get(u) != r)
+
+    for v in S:
+        # Only consider nodes, which are well-connected to S and have not yet been merged
+        n_v = node_total(G, v)
+        cut_v = sum(d[Keys.WEIGHT] for u, d in G[v].items() if u in S and u != v)
+        if cut_v < γ * n_v * (size_s - n_v) or len(𝓟.node_community(v)) != 1:
+            continue
+
+        # Sum up the weights of the edges from v into the communities of its neighbors within S
+        links: dict[T, float] = {}
+        for u, d in G[v].items():
+            if u != v and u in rep:
+                links[rep[u]] = links.get(rep[u], 0.0) + d[Keys.WEIGHT]
+        candidates = list(links)
+        if len(candidates) > samples:
+            candidates = sample(candidates, samples)
+
+        # Choose a random community among v's own one and the well-connected candidates, for which the quality function doesn't degrade
+        communities: list[tuple[T, float]] = [(v, 0.0)]
+        for r in candidates:
+            if cut_of[r] >= γ * weight_of[r] * (size_s - weight_of[r]):
+                𝛥𝓗 = 𝓗.delta(𝓟, v, 𝓟.node_community(r))
+                if 𝛥𝓗 >= 0:
+                    communities.append((r, 𝛥𝓗))
+        weights = [exp(𝛥𝓗 / θ) for (_, 𝛥𝓗) in communities]
+        r = choices(communities, weights=weights, k=1)[0][0]
+
+        # Move v there, merging its singleton community into the chosen one
+        if r != v:
+            𝓟.move_node(v, 𝓟.node_community(r))
+            rep[v] = r
+            weight_of[r] += weight_of.pop(v)
+            cut_of[r] += cut_of.pop(v) - 2 * links[r]
+
+    return 𝓟
@@ -0,0 +1,137 @@
+"""
+Memory budgets for runs of the Leiden algorithm, failing with a clear error instead of being killed when running out of memory.
+
+A `MemoryBudget` is a `LeidenHooks` object, which measures the memory of the process (its resident set size) while the algorithm runs:
+regularly when the algorithm checks whether it should stop, and after every phase it reports progress for. It records the memory used
+per phase, and raises `MemoryLimitExceededError` as soon as the memory exceeds the limit.
+
+Before that, once the memory exceeds the soft limit (a fraction of the limit), the budget reports memory pressure (see
+`LeidenHooks.memory_pressure`), and the algorithms adapt, saving memory at the expense of speed:
+
+* `leiden` on NetworkX graphs stops retaining the chain of aggregate graphs, aggregating the original graph on every level instead.
+* `hierarchical_leiden` on NetworkX graphs partitions views of the communities' subgraphs instead of copies.
+* `leiden` on graphs in array form switches to `out_of_core_leiden`, if the graph is unlikely to fit into the remaining memory.
+* `parallel_hierarchical_leiden` lowers the number of subtrees processed at the same time, also counting the memory of its workers.
+
+The functions above accept a `memory_limit` in bytes, for which they create the budget themselves.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from time import monotonic
+from typing import TYPE_CHECKING, TypedDict
+
+from heirarchical_leiden.hooks import LeidenHooks, LocalMovingStats, ProgressEvent, SubtreePath
+
+if TYPE_CHECKING:
+    from heirarchical_leiden.utils import TerminationReason
+
+
+class MemoryLimitExceededError(MemoryError):
+    """The memory used by a run of the Leiden algorithm exceeded its memory limit."""
+
+
+class MemoryUsage(TypedDict):
+    """
+    The memory used by a phase of the algorithm, identified as in the `ProgressEvent` reported after it.
+
+    `memory` is the memory of the process (in bytes) at the end of the phase, `peak` the highest memory measured during the phase.
+    """
+
+    kind: str
+    path: SubtreePath
+    level: int
+    memory: int
+    peak: int
+
+
+def process_memory(pid: int | None = None) -> int:
+    """
+    Determine the memory (resident set size, in bytes) of the process with the given id, by default of this process.
+
+    The current memory is read from `/proc` on Linux. Elsewhere, only the peak memory of this process is available, which is returned
+    instead (or 0 if even that is unavailable, e.g. on Windows).
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if pid is not None:
+        return 0
+    # The resource module is only available on Unix, so it is only imported when needed
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:
+        return 0
+    # The peak memory is given in bytes on macOS, and in kibibytes elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryBudget(LeidenHooks):
+    """Hooks measuring the memory of the process, reporting memory pressure above the soft limit and failing above the limit."""
+
+    def __init__(self, limit: int, soft_limit: float = 0.8, hooks: LeidenHooks | None = None, interval: float = 0.01) -> None:
+        """
+        Create a budget of `limit` bytes for the memory of the whole process, including the graph and everything else it holds.
+
+        Memory pressure is reported above `soft_limit` times the limit. The calls of all hooks are forwarded to the given `hooks`. The
+        memory is measured at most every `interval` seconds when checking whether the run should stop.
+        """
+        self.limit = limit
+        self.soft_limit = int(soft_limit * limit)
+        self.hooks = hooks
+        self.interval = interval
+        # The memory used per phase, and the highest memory measured since the last phase ended
+        self.usage: list[MemoryUsage] = []
+        self.peak = 0
+        # The last phase reported, for the error message, and the time of the next measurement
+        self._phase = "the start"
+        self._next_measurement = 0.0
+
+    def measure(self, extra: int = 0) -> int:
+        """
+        Measure the memory of the process, plus `extra` bytes used elsewhere (e.g. by worker processes), raising
+        `MemoryLimitExceededError` if it exceeds the limit.
+        """
+        memory = process_memory() + extra
+        self.peak = max(self.peak, memory)
+        self._next_measurement = monotonic() + self.interval
+        if memory > self.limit:
+            raise MemoryLimitExceededError(
+                f"The memory used ({memory / 2**20:.1f} MiB) exceeds the limit of {self.limit / 2**20:.1f} MiB after {self._phase}."
+            )
+        return memory
+
+    def should_stop(self) -> bool:
+        if monotonic() >= self._next_measurement:
+            self.measure()
+        return self.hooks is not None and self.hooks.should_stop()
+
+    def on_progress(self, event: ProgressEvent) -> None:
+        self._phase = (
+            f"{event['kind']} {event['level']} of the subtree {event['path']}" if event["path"] else f"{event['kind']} {event['level']}"
+        )
+        memory = self.measure()
+        self.usage.append({"kind": event["kind"], "path": event["path"], "level": event["level"], "memory": memory, "peak": self.peak})
+        self.peak = memory
+        if self.hooks is not None:
+            self.hooks.on_progress(event)
+
+    def on_local_moving(self, stats: LocalMovingStats) -> None:
+        if self.hooks is not None:
+            self.hooks.on_local_moving(stats)
+
+    def on_termination(self, reason: TerminationReason) -> None:
+        if self.hooks is not None:
+            self.hooks.on_termination(reason)
+
+    def memory_pressure(self) -> bool:
+        return self.measure() > self.soft_limit or (self.hooks is not None and self.hooks.memory_pressure())
+
+    def fits(self, nbytes: int) -> bool:
+        """Determine whether allocating another `nbytes` bytes keeps the memory below the soft limit."""
+        return self.measure() + nbytes <= self.soft_limit
@@ -0,0 +1,105 @@
+"""
+Node orderings improving the memory locality of graphs in CSR format, and the order of traversal of NetworkX graphs.
+
+The kernels of the array-based implementation traverse the adjacency lists of the nodes and look up the communities (and other data) of
+their neighbors. With arbitrary node ids, such as raw database ids, neighbors are scattered over the whole range of ids, and almost every
+lookup misses the cache. Renumbering the nodes, such that neighbors get close ids, makes these lookups mostly local:
+
+* "rcm": the Reverse Cuthill-McKee ordering, a breadth-first search which visits neighbors in the order of increasing degree, reversed.
+  It minimizes the bandwidth of the adjacency matrix, i.e. the distance of neighbors' ids.
+* "bfs": a plain breadth-first search, which is cheaper to compute and similarly groups neighbors together.
+* "degree": the nodes sorted by decreasing degree, which places the frequently accessed high-degree nodes next to each other.
+
+NetworkX graphs are traversed in the order in which their nodes and edges were inserted, so `reorder_graph` copies a graph, inserting
+its nodes in the given order, which then determines the order in which the local moving phase, the refinement and the aggregation
+visit the nodes and their neighbors.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Literal
+
+import numpy as np
+
+from heirarchical_leiden.csr import CSRGraph, IntArray
+from heirarchical_leiden.utils import DataKeys, Partition, preprocess_graph
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+Ordering = Literal["rcm", "bfs", "degree"]
+ORDERINGS: tuple[Ordering, ...] = ("rcm", "bfs", "degree")
+
+
+def node_order(graph: CSRGraph, ordering: Ordering) -> IntArray:
+    """
+    Compute the given ordering of the nodes of the graph.
+
+    :returns: A permutation of the nodes, listing the nodes in their new order, i.e. node `order[i]` becomes node `i`, as done by
+        `CSRGraph.permute`.
+    """
+    # The number of neighbors of every node
+    degrees = np.diff(graph.indptr)
+    if ordering == "degree":
+        return np.argsort(-degrees, kind="stable").astype(np.int64)
+    if ordering == "bfs":
+        return _breadth_first(graph, range(graph.order()), None)
+    if ordering == "rcm":
+        # Start every connected component at a node of minimal degree, visiting the neighbors in the order of increasing degree
+        starts = np.argsort(degrees, kind="stable").tolist()
+        return _breadth_first(graph, starts, degrees.tolist())[::-1].copy()
+    raise ValueError(f"Unknown ordering {ordering!r}, expected one of {', '.join(ORDERINGS)}.")
+
+
+def _breadth_first(graph: CSRGraph, starts: range | list[int], degrees: list[int] | None) -> IntArray:
+    # Visit all nodes breadth first, starting a new search at the first unvisited node of `starts` for every connected component.
+    # If degrees are given, the neighbors of every node are visited in the order of increasing degree.
+    indptr, indices = graph.indptr.tolist(), graph.indices.tolist()
+    visited = bytearray(graph.order())
+    order: list[int] = []
+
+    for start in starts:
+        if visited[start]:
+            continue
+        visited[start] = 1
+        order.append(start)
+        # The nodes of the current component, which are still to be expanded, are order[head:]
+        head = len(order) - 1
+        while head < len(order):
+            v = order[head]
+            head += 1
+            neighbors = indices[indptr[v] : indptr[v + 1]]
+            if degrees is not None:
+                neighbors.sort(key=degrees.__getitem__)
+            for u in neighbors:
+                if not visited[u]:
+                    visited[u] = 1
+                    order.append(u)
+
+    return np.asarray(order, dtype=np.int64)
+
+
+def reorder_graph(G: Graph, ordering: Ordering, weight: str | None = None) -> Graph:
+    """
+    Copy the NetworkX graph G, inserting its nodes in the given ordering (see `node_order`, using the given edge weight attribute).
+
+    The copy has the same nodes, edges and attributes as G, but it iterates over its nodes, and over the neighbors of every node, in the
+    new order.
+    """
+    graph, nodes = CSRGraph.from_networkx(G, weight)
+    ordered = [nodes[i] for i in node_order(graph, ordering).tolist()]
+    position = {v: i for i, v in enumerate(ordered)}
+    H = G.__class__()
+    H.graph.update(G.graph)
+    H.add_nodes_from((v, G.nodes[v]) for v in ordered)
+    # Adding the edges of every node in the new order of its neighbors, the neighbors of every node are ordered like the nodes themselves
+    H.add_edges_from((u, v, d) for u in ordered for v, d in sorted(G[u].items(), key=lambda item: position[item[0]]))
+    return H
+
+
+def restore_partition(G: Graph, 𝓟: Partition[Any], weight: str | None = None) -> Partition[Any]:
+    """Map the partition 𝓟 of a copy of G (see `reorder_graph`) to a partition of G itself, keeping its termination reason."""
+    # Preprocess G just like the graph of a run without reordering, whose partitions refer to the weights stored as `DataKeys.WEIGHT`
+    restored = Partition.from_partition(preprocess_graph(G, weight), 𝓟.communities, DataKeys.WEIGHT, validate=False)
+    restored.termination_reason = 𝓟.termination_reason
+    return restored
@@ -0,0 +1,103 @@
+"""
+Out-of-core variant of the Leiden algorithm for graphs whose adjacency does not fit into memory.
+
+The graph is read from memory-mapped CSR files (see `heirarchical_leiden.csr.write_csr`). As long as the (aggregate) graph is too large
+to be held in memory, the local moving, refinement and aggregation phases stream over the graph's blocks using the array-based kernels
+in `heirarchical_leiden.kernels`, writing every aggregate graph back to disk. Only the membership arrays, which have one entry per node,
+are kept in memory. As soon as an aggregate graph is small enough, it is handed to the in-memory implementation in `leiden`.
+"""
+
+from __future__ import annotations
+
+import os
+from functools import partial
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from heirarchical_leiden.csr import CSRGraph, IntArray, write_csr
+from heirarchical_leiden.kernels import aggregate_edges, aggregate_graph, aggregate_node_weights, move_nodes_blocks, refine_partition
+from heirarchical_leiden.leiden import leiden
+from heirarchical_leiden.quality_functions import QualityFunction
+from heirarchical_leiden.utils import DataKeys as Keys
+from heirarchical_leiden.utils import Partition
+
+
+def out_of_core_leiden(
+    graph: CSRGraph | str | os.PathLike[str],
+    𝓗: QualityFunction[int],
+    θ: float = 0.3,
+    γ: float = 0.05,
+    *,
+    max_in_memory_nodes: int = 2**20,
+    max_edges: int = 2**24,
+    workdir: str | os.PathLike[str] | None = None,
+) -> IntArray:
+    """
+    Perform the Leiden algorithm on a graph stored in CSR format on disk.
+
+    Parameters
+    ----------
+    graph : CSRGraph | str | os.PathLike
+        The graph to process, or the directory it was stored in by `write_csr` or `CSRGraph.save`.
+    𝓗 : QualityFunction[int]
+        The quality function to optimize, either `Modularity` or `CPM`.
+    θ : float, optional
+        The θ parameter of the Leiden method, default value of 0.3.
+    γ : float, optional
+        The γ parameter of the Leiden method, default value of 0.05.
+    max_in_memory_nodes : int, optional
+        The number of nodes up to which an aggregate graph is processed in memory by `leiden`, default value of 2²⁰.
+    max_edges : int, optional
+        The maximum number of adjacency entries read from disk at once, default value of 2²⁴.
+    workdir : str | os.PathLike | None, optional
+        The directory in which temporary directories holding the aggregate graphs are created, defaults to the system's default.
+
+    :returns: An array mapping every node of the graph to the index of its community.
+    """
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.load(graph)
+
+    # The mapping of the original nodes to the nodes of the current (aggregate) graph, and the partition 𝓟 of the current graph
+    nodes: IntArray = np.arange(graph.order(), dtype=np.int64)
+    𝓟: IntArray = np.arange(graph.order(), dtype=np.int64)
+
+    with TemporaryDirectory(dir=workdir) as tmp:
+        level = 0
+        while graph.order() > max_in_memory_nodes:
+            𝓟 = np.asarray(move_nodes_blocks(graph, 𝓟, 𝓗, max_edges), dtype=np.int64)
+            refined = refine_partition(graph, 𝓟, 𝓗, θ, γ, max_edges)
+
+            # If refinement didn't merge any nodes, aggregating wouldn't make any progress, so hand over to the in-memory implementation
+            k = int(refined.max(initial=-1)) + 1
+            if k == graph.order():
+                break
+
+            # Lift the partition 𝓟 to the aggregate graph: every aggregate node belongs to the community of the nodes it consists of
+            lifted = np.zeros(k, dtype=np.int64)
+            lifted[refined] = 𝓟
+            _, 𝓟 = np.unique(lifted, return_inverse=True)
+            nodes = refined[nodes]
+
+            if k > max_in_memory_nodes:
+                level += 1
+                directory = Path(tmp) / f"level-{level}"
+                node_weights = aggregate_node_weights(graph, refined)
+                graph = write_csr(directory, partial(aggregate_edges, graph, refined, max_edges), k, node_weights)
+            else:
+                graph = aggregate_graph(graph, refined, max_edges)
+
+        # The remaining graph fits into memory, so continue with the in-memory implementation, starting from the lifted partition.
+        # Number its communities consecutively, as the partition of the local moving phase is not, if the loop above ended early.
+        _, 𝓟 = np.unique(𝓟, return_inverse=True)
+        G = graph.to_networkx()
+        communities: list[set[int]] = [set() for _ in range(int(𝓟.max(initial=-1)) + 1)]
+        for v, c in enumerate(𝓟.tolist()):
+            communities[c].add(v)
+        𝓠 = leiden(G, 𝓗, Partition.from_partition(G, communities, Keys.WEIGHT), θ, γ, weight=Keys.WEIGHT)
+
+        membership = np.zeros(graph.order(), dtype=np.int64)
+        for i, C in enumerate(𝓠):
+            membership[list(C)] = i
+        return membership[nodes]
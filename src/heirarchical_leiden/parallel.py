@@ -0,0 +1,204 @@
+"""
+Process-based parallelism around the Leiden algorithm, sharing the graph between the worker processes instead of copying it.
+
+The graph is converted into a `CSRGraph` once, whose arrays are placed in shared memory (see `SharedCSRGraph`). Only a small handle is
+sent to the workers, which attach to the shared memory by name and read the arrays without copying them. The executors in this module,
+`leiden_restarts` and `resolution_sweep`, do so automatically.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from heirarchical_leiden.array_leiden import ArrayGraph, array_leiden
+from heirarchical_leiden.conversion import to_csr_graph, to_result
+from heirarchical_leiden.csr import CSR_ARRAYS, CSRGraph, IntArray
+from heirarchical_leiden.kernels import quality
+from heirarchical_leiden.quality_functions import QualityFunction
+from heirarchical_leiden.utils import Partition
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+class SharedCSRGraph:
+    """
+    A `CSRGraph` whose arrays live in shared memory, so that other processes can read them without copying.
+
+    Pickling a shared graph only transfers the names of its shared memory blocks; the unpickled copy attaches to them on first use of
+    `graph()`. The process creating the shared graph owns the blocks and has to release them using `unlink()`, or by using the shared
+    graph as a context manager.
+    """
+
+    def __init__(self, graph: CSRGraph) -> None:
+        """Copy the arrays of the given graph into new shared memory blocks."""
+        self._owner = True
+        self._blocks: dict[str, SharedMemory] = {}
+        # The field, block name, shape and data type of every array
+        self._specs: list[tuple[str, str, tuple[int, ...], str]] = []
+        self._graph: CSRGraph | None = None
+
+        for field in CSR_ARRAYS:
+            array = np.asarray(getattr(graph, field))
+            # Shared memory blocks can't be empty, so allocate at least one byte
+            block = SharedMemory(create=True, size=max(1, array.nbytes))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self._blocks[field] = block
+            self._specs.append((field, block.name, array.shape, array.dtype.str))
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"specs": self._specs}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self._owner = False
+        self._blocks = {}
+        self._specs = state["specs"]
+        self._graph = None
+
+    def _attach(self, field: str, name: str) -> SharedMemory:
+        if field not in self._blocks:
+            block = SharedMemory(name=name)
+            # Before Python 3.13, attaching registers the block with the resource tracker, which would then destroy it when this
+            # process exits, although it is owned by another process.
+            if sys.version_info < (3, 13):
+                resource_tracker.unregister(block._name, "shared_memory")  # type: ignore[attr-defined]
+            self._blocks[field] = block
+        return self._blocks[field]
+
+    def graph(self) -> CSRGraph:
+        """Get the graph, whose arrays are (read-only) views of the shared memory."""
+        if self._graph is None:
+            arrays: dict[str, Any] = {}
+            for field, name, shape, dtype in self._specs:
+                array: np.ndarray[Any, Any] = np.ndarray(shape, np.dtype(dtype), buffer=self._attach(field, name).buf)
+                array.flags.writeable = False
+                arrays[field] = array
+            self._graph = CSRGraph(**arrays)
+        return self._graph
+
+    def close(self) -> None:
+        """Detach from the shared memory. The graph returned by `graph()` must not be used anymore afterwards."""
+        self._graph = None
+        for block in self._blocks.values():
+            block.close()
+        self._blocks = {}
+
+    def unlink(self) -> None:
+        """Detach from and destroy the shared memory blocks, which is only possible in the process that created them."""
+        assert self._owner, "Only the process creating a shared graph can unlink it."
+        blocks = list(self._blocks.values())
+        self.close()
+        for block in blocks:
+            block.unlink()
+
+    def __enter__(self) -> SharedCSRGraph:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.unlink()
+
+
+def derive_seed(seed: int, *path: object) -> int:
+    """Derive a seed for a task from the seed of the whole computation and the path identifying the task, e.g. its index."""
+    return int.from_bytes(blake2b(repr((seed, *path)).encode(), digest_size=8).digest(), "little")
+
+
+# The shared graph of the worker process, see `initialize_worker`
+_shared: SharedCSRGraph | None = None
+
+
+def initialize_worker(shared: SharedCSRGraph) -> None:
+    global _shared  # noqa: PLW0603
+    _shared = shared
+
+
+def worker_graph() -> CSRGraph:
+    # Get the shared graph of the worker process
+    assert _shared is not None, "The worker has not been initialized with a shared graph."
+    return _shared.graph()
+
+
+def _run_leiden(𝓗: QualityFunction[int], θ: float, γ: float, seed: int) -> tuple[IntArray, float]:
+    # Run the Leiden algorithm on the worker's shared graph, returning the membership and its quality
+    graph = worker_graph()
+    random.seed(seed)
+    membership = array_leiden(graph, 𝓗, None, θ, γ)
+    return membership, quality(𝓗, graph, membership.tolist())
+
+
+def _map_leiden(
+    graph: CSRGraph, tasks: Sequence[tuple[QualityFunction[int], float, float, int]], max_workers: int | None
+) -> list[tuple[IntArray, float]]:
+    # Run `_run_leiden` for every task on a process pool sharing the graph
+    with SharedCSRGraph(graph) as shared, ProcessPoolExecutor(max_workers, initializer=initialize_worker, initargs=(shared,)) as pool:
+        futures = [pool.submit(_run_leiden, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+def leiden_restarts(
+    G: Graph | ArrayGraph,
+    𝓗: QualityFunction[int],
+    restarts: int = 8,
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    *,
+    seed: int = 0,
+    max_workers: int | None = None,
+) -> Partition[Any] | IntArray:
+    """
+    Run the Leiden algorithm several times with different seeds in parallel, returning the partition of the highest quality.
+
+    Parameters
+    ----------
+    G : Graph | ArrayGraph
+        The graph to process, either as a NetworkX graph or in array form (see `leiden`).
+    𝓗 : QualityFunction[int]
+        The quality function to optimize, either `Modularity` or `CPM`.
+    restarts : int, optional
+        The number of runs, default value of 8.
+    θ, γ, weight
+        The same as for `leiden`.
+    seed : int, optional
+        The seed from which the seeds of the runs are derived, default value of 0.
+    max_workers : int | None, optional
+        The number of worker processes, defaults to the number of processors.
+
+    :returns: The best partition found. For graphs in array form, an array mapping every node to the index of its community.
+    """
+    graph, nodes = to_csr_graph(G, weight)
+    results = _map_leiden(graph, [(𝓗, θ, γ, derive_seed(seed, i)) for i in range(restarts)], max_workers)
+    # Of the runs with the highest quality, take the first, so that the result doesn't depend on the order of completion
+    best, _ = max(results, key=lambda result: result[1])
+    return to_result(G, nodes, weight, best)
+
+
+def resolution_sweep(
+    G: Graph | ArrayGraph,
+    quality_functions: Sequence[QualityFunction[int]],
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    *,
+    seed: int = 0,
+    max_workers: int | None = None,
+) -> list[Partition[Any] | IntArray]:
+    """
+    Run the Leiden algorithm for every given quality function in parallel, e.g. for `Modularity` with a range of resolutions.
+
+    The parameters are the same as for `leiden_restarts`, except that the runs use the given quality functions.
+
+    :returns: The partitions found, one per quality function, in the same order.
+    """
+    graph, nodes = to_csr_graph(G, weight)
+    results = _map_leiden(graph, [(𝓗, θ, γ, derive_seed(seed, i)) for i, 𝓗 in enumerate(quality_functions)], max_workers)
+    return [to_result(G, nodes, weight, membership) for membership, _ in results]
@@ -4,13 +4,10 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections.abc import Set
-from copy import copy
 from math import comb
 from typing import Generic, TypeVar
 
-import networkx as nx
-
-from heirarchical_leiden.utils import Partition, single_node_neighbor_cut_size
+from heirarchical_leiden.utils import Partition, import_networkx, single_node_neighbor_cut_size
 
 T = TypeVar("T")
 
@@ -25,9 +22,17 @@ class QualityFunction(ABC, Generic[T]):
 
     @abstractmethod
     def delta(self, 𝓟: Partition[T], v: T, target: Set[T]) -> float:
-        """Measure the increase (or decrease, if negative) of this quality function when moving node v into the target community."""
-        moved = copy(𝓟).move_node(v, target)
-        return self(moved) - self(𝓟)
+        """
+        Measure the increase (or decrease, if negative) of this quality function when moving node v into the target community.
+
+        This default implementation carries out the move on 𝓟 and rolls it back afterwards, which is correct for every quality function,
+        but requires evaluating it twice. Subclasses should override this with a closed-form calculation of the delta, where possible.
+        """
+        before = self(𝓟)
+        checkpoint = 𝓟.checkpoint()
+        after = self(𝓟.move_node(v, target))
+        𝓟.rollback(checkpoint)
+        return after - before
 
 
 class Modularity(QualityFunction[T], Generic[T]):
@@ -47,6 +52,8 @@ class Modularity(QualityFunction[T], Generic[T]):
 
         norm: float = self.γ / (2 * m)
 
+        nx = import_networkx()
+
         def community_summand(C: Set[T]) -> float:
             # Calculate the summand representing the community `c`.
             # First, determine the total weight of edges within that community:
@@ -96,6 +103,8 @@ class CPM(QualityFunction[T], Generic[T]):
     def __call__(self, 𝓟: Partition[T]) -> float:
         """Measure the quality of the given partition 𝓟 of the graph G, as defined by the CPM quality function."""
 
+        nx = import_networkx()
+
         def community_summand(C: Set[T]) -> float:
             # Calculate the summand representing the community `c`.
             # First, determine the total weight of edges within that community:
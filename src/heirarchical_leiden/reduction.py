@@ -0,0 +1,105 @@
+"""
+A reduction of graphs before running the Leiden algorithm, shrinking the graph without losing the nodes it removes.
+
+Two kinds of nodes are merged into super-nodes, whose node and edge weights are those of an aggregate graph (see
+`Partition.aggregate_graph`):
+
+* Leaves, i.e. nodes of degree 1, which are folded into their only neighbor, as a leaf belongs to the community of its only neighbor in
+  any partition of maximal modularity. Optionally, whole pendant trees (chains or trees of such nodes, which are attached to the rest
+  of the graph by a single node) up to a given size are folded. This doesn't follow from the argument for single leaves: long chains
+  and large trees are split up into several communities by partitions of high modularity, so folding them lowers the quality.
+* Structurally equivalent nodes, i.e. nodes with the same (weighted) neighborhood, which are merged into one node.
+
+The reduced graph is an aggregate graph of the original graph, so partitions of it are flattened to (exact) partitions of the original
+graph by `Partition.flatten`, just like the partitions of the aggregate graphs created by the Leiden algorithm itself.
+
+As the argument for leaves only holds for modularity, `leiden` only reduces graphs when optimizing `Modularity`. With other quality
+functions, such as CPM, a leaf's best community depends on the sizes of the communities, so folding leaves can lower the quality.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+from heirarchical_leiden.utils import DataKeys as Keys
+from heirarchical_leiden.utils import Partition, preprocess_graph
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+def reduce_graph(G: Graph, weight: str | None = None, max_tree_size: int | None = None) -> Graph:
+    """
+    Reduce the graph G by folding its pendant trees into the nodes they are attached to, and by merging structurally equivalent nodes.
+
+    Parameters
+    ----------
+    G : Graph
+        The graph to reduce.
+    weight : str | None, optional
+        The edge weight attribute to use, default value of None.
+    max_tree_size : int | None, optional
+        The maximum number of nodes a folded tree may comprise (including the node it is attached to). Leaves are then folded
+        repeatedly, which may turn their neighbors into leaves, as long as the trees stay within this size. By default, only the leaves
+        of G are folded, except for those whose neighbor is a leaf as well (i.e. isolated edges).
+
+    :returns: The reduced graph, which is an aggregate graph of G (with its edge weights stored as `DataKeys.WEIGHT`).
+    """
+    G = preprocess_graph(G, weight)
+    anchors = _fold_pendant_trees(G, max_tree_size)
+
+    # Merge the remaining nodes with the same neighborhood: the same neighbors, connected by edges of the same weights, and the same
+    # weight of their self-loop, if any. Isolated nodes are not merged.
+    representatives: dict[tuple[frozenset[tuple[Any, float]], float], int] = {}
+    node_part: dict[Any, int] = {}
+    k = 0
+    for v in G.nodes:
+        if v in anchors:
+            continue
+        neighborhood = frozenset((u, data[Keys.WEIGHT]) for u, data in G[v].items() if u != v)
+        key = (neighborhood, G[v][v][Keys.WEIGHT] if v in G[v] else 0)
+        if neighborhood and key in representatives:
+            node_part[v] = representatives[key]
+        else:
+            node_part[v] = representatives[key] = k
+            k += 1
+
+    # Every folded node belongs to the group of the node its tree is attached to. Nodes are folded only after the nodes folded into
+    # them, so going through the folded nodes in reverse, the group of the node they were folded into is always known.
+    for v, u in reversed(anchors.items()):
+        node_part[v] = node_part[u]
+
+    𝓟: Partition[Any] = Partition._from_membership(G, node_part, k, Keys.WEIGHT)
+    return 𝓟.aggregate_graph()
+
+
+def _fold_pendant_trees(G: Graph, max_tree_size: int | None) -> dict[Any, Any]:
+    # Repeatedly remove leaves, which may turn their neighbors into leaves, returning the neighbor every removed node was folded into
+    degrees = {v: sum(1 for u in G[v] if u != v) for v in G.nodes}
+    if max_tree_size is None:
+        # Only fold the leaves of G into their neighbors, which aren't leaves themselves
+        return {v: u for v, d in degrees.items() if d == 1 for u in G[v] if u != v and degrees[u] > 1}
+
+    sizes = dict.fromkeys(G.nodes, 1)
+    anchors: dict[Any, Any] = {}
+    leaves = deque(v for v, d in degrees.items() if d == 1)
+
+    while leaves:
+        v = leaves.popleft()
+        # The degree of a leaf drops to 0, if its neighbor was folded into it in the meantime (i.e. it is the last node of a tree)
+        if degrees[v] != 1:
+            continue
+        u = next(u for u in G[v] if u != v and u not in anchors)
+        if max_tree_size is not None and sizes[u] + sizes[v] > max_tree_size:
+            continue
+
+        # Fold v into its only remaining neighbor u
+        anchors[v] = u
+        sizes[u] += sizes[v]
+        degrees[v] = 0
+        degrees[u] -= 1
+        if degrees[u] == 1:
+            leaves.append(u)
+
+    return anchors
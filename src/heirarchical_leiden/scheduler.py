@@ -0,0 +1,175 @@
+"""
+A parallel implementation of the hierarchical Leiden algorithm, scheduling the subtrees of the hierarchy on a process pool.
+
+Community sizes are typically heavy-tailed, so that a few large communities make up most of the work. Rather than mapping over the
+children of every community, all pending subtrees are kept in a single priority queue, ordered by their size (nodes plus edges). Whenever
+a worker becomes idle, it picks up the largest pending subtree, and the children of a subtree are queued as soon as it is finished, so
+that idle workers can take up grandchildren while their siblings are still being processed.
+
+The graph is shared with the workers through shared memory (see `heirarchical_leiden.parallel`). Every subtree is processed with a seed
+derived from the given seed and the subtree's path in the hierarchy, so the result doesn't depend on the number of workers or the order
+in which the subtrees are processed.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from heirarchical_leiden.array_leiden import ArrayGraph, array_leiden, community_members
+from heirarchical_leiden.conversion import assemble_hierarchy, to_csr_graph
+from heirarchical_leiden.csr import IntArray
+from heirarchical_leiden.hierarchical_leiden import HierarchicalPartition
+from heirarchical_leiden.memory import MemoryBudget, process_memory
+from heirarchical_leiden.parallel import SharedCSRGraph, derive_seed, initialize_worker, worker_graph
+from heirarchical_leiden.quality_functions import QualityFunction
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+# The path of a subtree in the hierarchy: the indices of the communities leading to it, starting from the root
+Path = tuple[int, ...]
+
+
+class WorkerStats:
+    """Statistics about the work done by a single worker process."""
+
+    def __init__(self) -> None:
+        self.tasks: int = 0
+        self.nodes: int = 0
+        # The time spent processing subtrees, in seconds
+        self.busy_time: float = 0.0
+        # The memory of the worker process after its last subtree, in bytes
+        self.memory: int = 0
+
+
+class SchedulerStats:
+    """Statistics about a run of `parallel_hierarchical_leiden`, for tuning `partition_max_size` and the number of workers."""
+
+    def __init__(self) -> None:
+        self.workers: dict[int, WorkerStats] = {}
+        self.wall_time: float = 0.0
+        # The largest number of subtrees waiting for a worker at any time
+        self.max_queue_length: int = 0
+        # The number of subtrees processed at the same time at the end of the run, which is lowered when memory gets scarce
+        self.parallelism: int = 0
+
+    @property
+    def tasks(self) -> int:
+        """Get the total number of subtrees processed."""
+        return sum(worker.tasks for worker in self.workers.values())
+
+    def utilization(self) -> dict[int, float]:
+        """Get the share of the wall time each worker (identified by its process id) spent processing subtrees."""
+        return {pid: worker.busy_time / self.wall_time if self.wall_time > 0 else 0.0 for pid, worker in self.workers.items()}
+
+
+def _run_subtree(
+    path: Path, nodes: IntArray, 𝓗: QualityFunction[int], θ: float, γ: float, seed: int
+) -> tuple[Path, IntArray, int, float, int]:
+    # Partition the subgraph induced by the given nodes of the worker's shared graph, also reporting the worker's memory
+    start = perf_counter()
+    graph = worker_graph()
+    subgraph = graph if len(path) == 0 else graph.subgraph(nodes)
+    random.seed(derive_seed(seed, *path))
+    membership = array_leiden(subgraph, 𝓗, None, θ, γ)
+    return path, membership, os.getpid(), perf_counter() - start, process_memory()
+
+
+def parallel_hierarchical_leiden(
+    G: Graph | ArrayGraph,
+    𝓗: QualityFunction[int],
+    θ: float = 0.3,
+    γ: float = 0.05,
+    weight: str | None = None,
+    partition_max_size: int = 64,
+    *,
+    seed: int = 0,
+    max_workers: int | None = None,
+    stats: SchedulerStats | None = None,
+    memory_limit: int | None = None,
+) -> HierarchicalPartition[Any] | list[IntArray]:
+    """
+    Perform the hierarchical Leiden algorithm, processing the subtrees of the hierarchy in parallel.
+
+    Parameters
+    ----------
+    G : Graph | ArrayGraph
+        The graph to process, either as a NetworkX graph or in array form (see `hierarchical_leiden`).
+    𝓗 : QualityFunction[int]
+        The quality function to optimize, either `Modularity` or `CPM`.
+    θ, γ, weight, partition_max_size
+        The same as for `hierarchical_leiden`.
+    seed : int, optional
+        The seed from which the seeds of the subtrees are derived, default value of 0.
+    max_workers : int | None, optional
+        The number of worker processes, defaults to the number of processors.
+    stats : SchedulerStats | None, optional
+        If given, the statistics of the run are recorded in this object.
+    memory_limit : int | None, optional
+        A limit for the memory of this process and its workers together, in bytes (see `heirarchical_leiden.memory`). Close to the limit,
+        the number of subtrees processed at the same time is halved whenever subtrees finish, down to one. Above it, the run fails
+        with a `MemoryLimitExceededError`. As the workers' memory is only known after each of their subtrees, and the shared graph
+        counts for every process reading it, this is an estimate. By default, there is no limit.
+
+    :returns: A HierarchicalPartition of G into communities, or for graphs in array form, a list of membership arrays, one per level of
+        the hierarchy, just as `hierarchical_leiden` returns them.
+    """
+    graph, labels = to_csr_graph(G, weight)
+    stats = SchedulerStats() if stats is None else stats
+    workers = max_workers or os.cpu_count() or 1
+    budget = None if memory_limit is None else MemoryBudget(memory_limit)
+    stats.parallelism = workers
+    start = perf_counter()
+
+    # The subtrees waiting for a worker, ordered by decreasing size (and by their order of creation for equal sizes)
+    queue: list[tuple[int, int, Path, IntArray]] = []
+    # The original nodes of every subtree, and the membership arrays computed for the subtrees
+    nodes: dict[Path, IntArray] = {(): np.arange(graph.order(), dtype=np.int64)}
+    results: dict[Path, IntArray] = {}
+
+    def push(path: Path, members: IntArray) -> None:
+        nodes[path] = members
+        # Estimate the number of edges of the subtree by the number of adjacency entries of its nodes
+        size = len(members) + int(np.sum(graph.indptr[members + 1] - graph.indptr[members])) // 2
+        heapq.heappush(queue, (-size, len(nodes), path, members))
+        stats.max_queue_length = max(stats.max_queue_length, len(queue))
+
+    with SharedCSRGraph(graph) as shared, ProcessPoolExecutor(workers, initializer=initialize_worker, initargs=(shared,)) as pool:
+        heapq.heappush(queue, (0, 0, (), nodes[()]))
+        running: set[Future[tuple[Path, IntArray, int, float, int]]] = set()
+        while queue or running:
+            # Hand the largest pending subtrees to the idle workers
+            while queue and len(running) < stats.parallelism:
+                _, _, path, members = heapq.heappop(queue)
+                running.add(pool.submit(_run_subtree, path, members, 𝓗, θ, γ, seed))
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, membership, pid, busy_time, memory = future.result()
+                worker = stats.workers.setdefault(pid, WorkerStats())
+                worker.tasks += 1
+                worker.nodes += len(membership)
+                worker.busy_time += busy_time
+                worker.memory = memory
+                results[path] = membership
+
+                # Queue the communities, which are too large, right away (unless the subtree wasn't split up at all)
+                if int(membership.max(initial=-1)) > 0:
+                    for c, members in enumerate(community_members(membership)):
+                        if len(members) > partition_max_size:
+                            push((*path, c), nodes[path][members])
+
+            # Lower the parallelism while memory is getting scarce (measuring it fails above the limit)
+            if budget is not None and budget.measure(sum(worker.memory for worker in stats.workers.values())) > budget.soft_limit:
+                stats.parallelism = max(1, stats.parallelism // 2)
+
+    stats.wall_time = perf_counter() - start
+    return assemble_hierarchy(G, weight, labels, results)
@@ -0,0 +1,124 @@
+"""
+Statistics about the communities of partitions and hierarchical partitions, e.g. for quality dashboards.
+
+The statistics of all communities are computed at once, by reducing arrays of the edges' endpoints and weights (`numpy.bincount`) in
+a single pass over the edges per level, instead of inducing a subgraph per community. They are returned as a columnar table, a dict of
+equally long arrays, which is easily turned into a data frame (e.g. `pandas.DataFrame(table)`), with the following columns:
+
+* "level": the level of the community in the hierarchy (0 for the top level).
+* "path": the path of the community in the hierarchy, i.e. the indices of the communities leading to it, ending with its own index.
+* "community": the index of the community in its partition.
+* "size": the number of nodes.
+* "internal_weight": the total weight of the edges within the community.
+* "cut_weight": the total weight of the edges between the community and the rest of the graph.
+* "degree_sum": the sum of the (weighted) degrees of the community's nodes, i.e. its volume.
+* "conductance": the cut weight relative to the smaller of the volumes of the community and of the rest of the graph (NaN if that is 0).
+* "density": the internal weight relative to the number of pairs of nodes in the community (NaN for communities of a single node).
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import numpy.typing as npt
+
+from heirarchical_leiden.csr import FloatArray, IntArray
+from heirarchical_leiden.hierarchical_leiden import HierarchicalPartition
+from heirarchical_leiden.utils import Partition
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+# A table of statistics, mapping the name of every column to its values
+CommunityStatistics = dict[str, npt.NDArray[Any]]
+
+
+def community_statistics(𝓟: Partition[Any]) -> CommunityStatistics:
+    """
+    Compute the statistics of the communities of the partition 𝓟, using the edge weights 𝓟 was created with.
+
+    :returns: A columnar table with a row per community, in the order of `𝓟.communities` (see `heirarchical_leiden.statistics`).
+    """
+    index, src, dst, w = _edge_arrays(𝓟.G, 𝓟._weight)
+    membership = np.empty(len(index), dtype=np.int64)
+    for c, C in enumerate(𝓟.communities):
+        membership[[index[v] for v in C]] = c
+    return _statistics(src, dst, w, membership, [(c,) for c in range(len(𝓟))], 0)
+
+
+def hierarchy_statistics(𝓗𝓟: HierarchicalPartition[Any]) -> CommunityStatistics:
+    """
+    Compute the statistics of the communities on all levels of the hierarchical partition 𝓗𝓟, relative to the whole graph.
+
+    The cut weight and the conductance of a community thus also include the edges leaving its parent community.
+
+    :returns: A columnar table with a row per community, ordered by level (see `heirarchical_leiden.statistics`).
+    """
+    root = 𝓗𝓟["partition"]
+    index, src, dst, w = _edge_arrays(root.G, root._weight)
+    tables: list[CommunityStatistics] = []
+
+    # The subtrees on the current level, with their paths
+    level: list[tuple[tuple[int, ...], HierarchicalPartition[Any]]] = [((), 𝓗𝓟)]
+    while level:
+        # The subtrees on the same level are disjoint, so the communities of all of them are combined into a single membership array,
+        # in which the nodes outside of these subtrees are marked by -1
+        membership = np.full(len(index), -1, dtype=np.int64)
+        paths: list[tuple[int, ...]] = []
+        for path, subtree in level:
+            for c, C in enumerate(subtree["partition"].communities):
+                membership[[index[v] for v in C]] = len(paths)
+                paths.append((*path, c))
+        tables.append(_statistics(src, dst, w, membership, paths, len(tables)))
+        level = [((*path, c), child) for path, subtree in level for c, child in subtree["children"].items()]
+
+    return {column: np.concatenate([table[column] for table in tables]) for column in tables[0]}
+
+
+def _edge_arrays(G: Graph, weight: str | None) -> tuple[dict[Any, int], IntArray, IntArray, FloatArray]:
+    # Number the nodes of G, and gather the endpoints and weights of its edges into arrays
+    index = {v: i for i, v in enumerate(G.nodes)}
+    edges = [(index[u], index[v], d) for u, v, d in G.edges(data=weight, default=1)]
+    src, dst, w = zip(*edges) if edges else ((), (), ())
+    return index, np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64), np.array(w, dtype=np.float64)
+
+
+def _statistics(
+    src: IntArray, dst: IntArray, w: FloatArray, membership: IntArray, paths: list[tuple[int, ...]], level: int
+) -> CommunityStatistics:
+    # Compute the statistics of the communities `0, …, k-1` of the membership array (where -1 marks nodes of no community)
+    k = len(paths)
+    covered = membership >= 0
+    size = np.bincount(membership[covered], minlength=k)
+
+    # Edges within a community count towards its internal weight, all other edges towards the cut weights of their endpoints' communities
+    cu, cv = membership[src], membership[dst]
+    internal, crossing = (cu == cv) & (cu >= 0), cu != cv
+    internal_weight = np.bincount(cu[internal], weights=w[internal], minlength=k)
+    cut_weight = np.bincount(cu[crossing & (cu >= 0)], weights=w[crossing & (cu >= 0)], minlength=k)
+    cut_weight += np.bincount(cv[crossing & (cv >= 0)], weights=w[crossing & (cv >= 0)], minlength=k)
+    degree_sum = 2 * internal_weight + cut_weight
+
+    # The volume of the rest of the graph is the total volume (twice the total edge weight) minus the volume of the community
+    smaller_volume = np.minimum(degree_sum, 2 * w.sum() - degree_sum)
+    conductance = np.divide(cut_weight, smaller_volume, out=np.full(k, np.nan), where=smaller_volume > 0)
+    pairs = size * (size - 1) / 2
+    density = np.divide(internal_weight, pairs, out=np.full(k, np.nan), where=pairs > 0)
+
+    # Store the paths as tuples, which numpy would otherwise turn into a two-dimensional array
+    path_column = np.empty(k, dtype=object)
+    for i, path in enumerate(paths):
+        path_column[i] = path
+    return {
+        "level": np.full(k, level, dtype=np.int64),
+        "path": path_column,
+        "community": np.array([path[-1] for path in paths], dtype=np.int64),
+        "size": size.astype(np.int64),
+        "internal_weight": internal_weight,
+        "cut_weight": cut_weight,
+        "degree_sum": degree_sum,
+        "conductance": conductance,
+        "density": density,
+    }
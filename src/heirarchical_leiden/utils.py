@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import itertools
+import random
+import sys
 from collections.abc import Callable, Collection, Iterable, Iterator, Set
-from copy import deepcopy
-from typing import Generic, TypeVar, Union, cast
+from contextlib import contextmanager
+from enum import Enum
+from functools import cache
+from typing import TYPE_CHECKING, Any, Generic, TypeGuard, TypeVar, Union, cast
 
-from networkx import Graph
-from networkx.algorithms.community import community_utils
+if TYPE_CHECKING:
+    from networkx import Graph
 
 S = TypeVar("S")
 T_co = TypeVar("T_co", covariant=True)
@@ -29,6 +33,16 @@ class DataKeys:
     PARENT_PARTITION = "__da_ll_pp__"
 
 
+class TerminationReason(str, Enum):
+    """The reason for which a run of the Leiden algorithm terminated, as recorded in `Partition.termination_reason`."""
+
+    CONVERGED = "converged"
+    MAX_LEVELS = "max_levels"
+    MIN_QUALITY_GAIN = "min_quality_gain"
+    TIME_BUDGET = "time_budget"
+    CANCELLED = "cancelled"
+
+
 class Partition(Generic[T_co]):
     """This class represents a partition of a graph's nodes."""
 
@@ -61,10 +75,27 @@ class Partition(Generic[T_co]):
         self._weight: None | str = weight
         self._partition_degree_sums: list[int] = degree_sums
 
+        # If this partition is the result of a run of the Leiden algorithm, this records why the algorithm terminated.
+        self.termination_reason: TerminationReason | None = None
+
+        # Copies of a partition share the containers above until either of them is modified (copy-on-write), see `__copy__`.
+        self._shared: bool = False
+        # While there are open checkpoints, every node move is recorded in the undo log, so that it can be rolled back.
+        # The entries are tuples of the moved node, the source and target community indices, the degree sums of both communities
+        # before the move, whether the target community was created by the move, and the source community if the move removed it.
+        self._undo_log: list[tuple[T_co, int, int, int, int, bool, set[T_co] | None]] = []
+        self._open_checkpoints: int = 0
+
     @classmethod
-    def from_partition(cls, G: Graph, 𝓟: Collection[Collection[T_co]] | Partition[T_co], weight: None | str = None) -> Partition[T_co]:
-        """Create a new partition of the graph G, given by the nodes in the partition 𝓟 of G's nodes."""
-        if not Partition.is_partition(G, 𝓟):
+    def from_partition(
+        cls, G: Graph, 𝓟: Collection[Collection[T_co]] | Partition[T_co], weight: None | str = None, validate: bool = True
+    ) -> Partition[T_co]:
+        """
+        Create a new partition of the graph G, given by the nodes in the partition 𝓟 of G's nodes.
+
+        Checking that 𝓟 is indeed a partition of G takes time linear in the size of G. When 𝓟 is known to be valid, pass `validate=False`.
+        """
+        if validate and not Partition.is_partition(G, 𝓟):
             raise AssertionError("𝓟 must be a partition of G!")
 
         # The partition as a list of sets
@@ -79,6 +110,27 @@ class Partition(Generic[T_co]):
 
         return cls(G, sets, node_part, partition_degree_sums, weight)
 
+    @classmethod
+    def _from_membership(
+        cls, G: Graph, node_part: dict[T_co, int], k: int, weight: None | str = None, degree_sums: list[int] | None = None
+    ) -> Partition[T_co]:
+        """
+        Create a partition of G into k communities from a mapping of every node of G to the index of its community in `0, …, k-1`.
+
+        This is a trusted construction path for internal use: The mapping is not validated, so it must cover all nodes of G and use
+        every index. If the degree sums of the communities are already known, they are reused, otherwise they are calculated in one pass.
+        """
+        sets: list[set[T_co]] = [set() for _ in range(k)]
+        for v, idx in node_part.items():
+            sets[idx].add(v)
+
+        if degree_sums is None:
+            degree_sums = [0] * k
+            for v, d in G.degree(weight=weight):
+                degree_sums[node_part[v]] += d
+
+        return cls(G, sets, node_part, degree_sums, weight)
+
     @classmethod
     def singleton_partition(cls, G: Graph, weight: None | str = None) -> Partition[T_co]:
         """Create a singleton partition, in which each community consists of exactly one vertex."""
@@ -109,7 +161,7 @@ class Partition(Generic[T_co]):
         if isinstance(𝓟, Partition) and 𝓟.G == G:
             return True
 
-        result: bool = community_utils.is_partition(G, 𝓟)
+        result: bool = import_networkx().algorithms.community.community_utils.is_partition(G, 𝓟)
         return result
 
     @staticmethod
@@ -133,17 +185,80 @@ class Partition(Generic[T_co]):
             return G
 
     def __copy__(self) -> Partition[T_co]:
-        """Create a copy of this partition object."""
+        """
+        Create a copy of this partition object.
+
+        Copying is cheap, as the copy shares the communities with this partition until either of them moves a node (copy-on-write).
+        Thus, many copies, for example for trying out different moves, can branch off a common partition.
+        """
         cls = self.__class__
         cpy = cls.__new__(cls)
         cpy.G = self.G
         cpy.graph_size = self.graph_size
-        cpy._sets = deepcopy(self._sets)
-        cpy._node_part = self._node_part.copy()
-        cpy._partition_degree_sums = self._partition_degree_sums.copy()
+        cpy._sets = self._sets
+        cpy._node_part = self._node_part
+        cpy._partition_degree_sums = self._partition_degree_sums
         cpy._weight = self._weight
+        cpy.termination_reason = self.termination_reason
+        cpy._undo_log = []
+        cpy._open_checkpoints = 0
+        cpy._shared = self._shared = True
         return cpy
 
+    def _unshare(self) -> None:
+        """Take ownership of the containers shared with copies of this partition, before modifying them."""
+        if self._shared:
+            self._sets = [set(C) for C in self._sets]
+            self._node_part = self._node_part.copy()
+            self._partition_degree_sums = self._partition_degree_sums.copy()
+            self._shared = False
+
+    def checkpoint(self) -> int:
+        """
+        Create a checkpoint, to which the partition can be reset using `rollback`, undoing all node moves made in the meantime.
+
+        Checkpoints are cheap, as only the node moves made after them are recorded. They can be nested, and every checkpoint has to be
+        ended by either `rollback` or `release`.
+        """
+        self._open_checkpoints += 1
+        return len(self._undo_log)
+
+    def rollback(self, checkpoint: int) -> Partition[T_co]:
+        """Undo all node moves made since the given checkpoint was created and end the checkpoint."""
+        self._unshare()
+        while len(self._undo_log) > checkpoint:
+            v, source, target, source_degree_sum, target_degree_sum, created, removed = self._undo_log.pop()
+
+            # If the source community was removed, reinsert it (empty for now) and adjust the indices of the communities after it
+            if removed is not None:
+                self._sets.insert(source, removed)
+                self._partition_degree_sums.insert(source, 0)
+                for i in range(source + 1, len(self._sets)):
+                    for u in self._sets[i]:
+                        self._node_part[u] = i
+
+            # Move v back into the source community
+            self._sets[target].discard(v)
+            self._sets[source].add(v)
+            self._partition_degree_sums[source] = source_degree_sum
+            self._partition_degree_sums[target] = target_degree_sum
+            self._node_part[v] = source
+
+            # If the target community was created by the move, it is the last one, so remove it again
+            if created:
+                self._sets.pop()
+                self._partition_degree_sums.pop()
+
+        return self.release(checkpoint)
+
+    def release(self, checkpoint: int) -> Partition[T_co]:
+        """End the given checkpoint, keeping the node moves made since it was created."""
+        assert self._open_checkpoints > 0 and checkpoint <= len(self._undo_log), "Invalid checkpoint."
+        self._open_checkpoints -= 1
+        if self._open_checkpoints == 0:
+            self._undo_log.clear()
+        return self
+
     def __eq__(self, other: object) -> bool:
         """Check whether two partitions are equal."""
         if isinstance(other, Partition):
@@ -164,6 +279,7 @@ class Partition(Generic[T_co]):
     # type T, which is only used as a type marker here.
     def move_node(self, v: T_co, target: Set[T_co]) -> Partition[T_co]:  # type: ignore
         """Move node v from its current community in this partition to the given target community."""
+        self._unshare()
         # Determine the index of the community that v was in initially
         source_partition_idx = self._node_part[v]
 
@@ -173,11 +289,22 @@ class Partition(Generic[T_co]):
             el = next(iter(target))
             # … and query its index in the _sets list
             target_partition_idx = self._node_part[el]
+            created = False
         # Otherwise, create a new (currently empty) partition and get its index.
         else:
             target_partition_idx = len(self._sets)
             self._sets.append(set())
             self._partition_degree_sums.append(0)
+            created = True
+
+        # If there are open checkpoints, record the move and the state it changes
+        if self._open_checkpoints:
+            source_degree_sum = self._partition_degree_sums[source_partition_idx]
+            target_degree_sum = self._partition_degree_sums[target_partition_idx]
+            source_set = self._sets[source_partition_idx]
+            removed = source_set if len(source_set) == 1 and source_partition_idx != target_partition_idx else None
+            entry = (v, source_partition_idx, target_partition_idx, source_degree_sum, target_degree_sum, created, removed)
+            self._undo_log.append(entry)
 
         # Remove `v` from its old community and place it into the target partition
         self._sets[source_partition_idx].discard(v)
@@ -212,7 +339,7 @@ class Partition(Generic[T_co]):
         node_weights = self.G.nodes.data(self._weight, default=1)
 
         # Create graph H that will become the aggregate graph
-        H = Graph(**{DataKeys.PARENT_GRAPH: self.G, DataKeys.PARENT_PARTITION: self})
+        H = import_networkx().Graph(**{DataKeys.PARENT_GRAPH: self.G, DataKeys.PARENT_PARTITION: self})
 
         # For every community, add a node in H, also recording the nodes
         for i, C in enumerate(self._sets):
@@ -251,17 +378,47 @@ class Partition(Generic[T_co]):
         """Get the sum of node degrees of nodes in the community that `v` belongs to."""
         return self._partition_degree_sums[self._node_part[v]]
 
-    def flatten(self) -> Partition[T_co]:
-        """Flatten the partition, producing a partition of the original graph."""
+    def flatten(self, validate: bool = False) -> Partition[T_co]:
+        """
+        Flatten the partition, producing a partition of the original graph.
+
+        Aggregating a graph preserves the degrees, so the degree sums of the communities are reused if all partitions along the way used
+        the same edge weights. With `validate`, the result is checked to be a partition of the original graph (for debugging).
+        """
         # If this is not an aggregate graph, return self.
         if DataKeys.PARENT_GRAPH not in self.G.graph or DataKeys.PARENT_PARTITION not in self.G.graph:
             return self
 
         # Otherwise
         G: Graph = Partition.__find_original_graph(self.G)
-        𝓟 = [Partition.__collect_nodes(self.G, C) for C in self._sets]
+        node_part = {v: idx for idx, C in enumerate(self._sets) for v in Partition.__collect_nodes(self.G, C)}
+        degree_sums = list(self._partition_degree_sums) if self.__preserves_degrees() else None
+        𝓟: Partition[T_co] = Partition._from_membership(G, node_part, len(self._sets), self._weight, degree_sums)
+
+        if validate and not Partition.is_partition(G, 𝓟.communities):
+            raise AssertionError("The flattened partition must be a partition of the original graph!")
+        return 𝓟
+
+    def __preserves_degrees(self) -> bool:
+        """Determine whether all graphs this partition's graph was aggregated from have the same degrees w.r.t. this partition's weight."""
+        # Aggregate graphs store their edge weights as DataKeys.WEIGHT, computed from the edge weights used by their parent partition
+        H, weight = self.G, self._weight
+        while DataKeys.PARENT_PARTITION in H.graph:
+            if weight != DataKeys.WEIGHT:
+                return False
+            H, weight = H.graph[DataKeys.PARENT_GRAPH], H.graph[DataKeys.PARENT_PARTITION]._weight
+        return weight == self._weight
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        Compute the statistics of the communities of this partition, such as their sizes, cut weights and conductances.
 
-        return Partition.from_partition(G, 𝓟, weight=self._weight)
+        :returns: A columnar table with a row per community, see `heirarchical_leiden.statistics.community_statistics`.
+        """
+        # Imported here, as the statistics module imports this one (a circular import at the top of the module)
+        from heirarchical_leiden.statistics import community_statistics  # noqa: PLC0415
+
+        return community_statistics(self)
 
     @property
     def communities(self) -> tuple[set[T_co], ...]:
@@ -273,6 +430,47 @@ class Partition(Generic[T_co]):
         return tuple(self._sets)
 
 
+def import_networkx() -> Any:
+    """Import NetworkX on first use. All modules use this instead of importing it at the top, so that importing the package doesn't."""
+    import networkx  # noqa: PLC0415
+
+    return networkx
+
+
+def is_graph(G: object) -> TypeGuard[Graph]:
+    """
+    Determine whether G is a NetworkX graph, without importing NetworkX.
+
+    NetworkX is only imported when it is actually used, so graphs in array form can be processed without loading it. If it hasn't been
+    imported yet, G can't be a NetworkX graph.
+    """
+    networkx = sys.modules.get("networkx")
+    return networkx is not None and isinstance(G, networkx.Graph)
+
+
+@cache
+def package_version() -> str:
+    """Get the installed version of this package, or "unknown" when running from a source tree, which isn't installed."""
+    # Imported here, as importing `importlib.metadata` takes longer than importing the rest of the package
+    from importlib.metadata import PackageNotFoundError, version  # noqa: PLC0415
+
+    try:
+        return version("hierarchical-leiden")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+@contextmanager
+def seeded_random(seed: int) -> Iterator[None]:
+    """Seed the global random number generator for the duration of the context, restoring its previous state afterwards."""
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        yield
+    finally:
+        random.setstate(state)
+
+
 def freeze(set_list: Iterable[Set[T_co]]) -> set[frozenset[T_co]]:
     """
     Given a list of set, return a set of (frozen) sets representing those sets.
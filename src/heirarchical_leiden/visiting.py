@@ -0,0 +1,157 @@
+"""
+Strategies for the order in which the local moving phase of the Leiden algorithm visits the nodes.
+
+The local moving phase (see `move_nodes_fast`) visits every node once, and re-visits the neighbors of every node it moved. The order of
+these visits determines how many node evaluations it takes until the partition is stable:
+
+* `FIFOQueue` visits the nodes in random order, queueing neighbors at the end, as described in the Leiden paper (the default).
+* `DegreeQueue` first visits the nodes in the order of decreasing degree, so that the hubs settle first and the many low-degree nodes
+  follow them, instead of pulling them back and forth.
+* `GainQueue` always visits the queued node next, whose last observed gain (of the move that caused it to be queued) is largest.
+* `PruneQueue` works like `FIFOQueue`, but only queues the neighbors of a moved node, whose best move could have changed: the nodes left
+  behind in its previous community, and the nodes for which moving into its new community became an improvement.
+
+Strategies implement `VisitStrategy`, and can be passed to `leiden` and `hierarchical_leiden`.
+"""
+
+from __future__ import annotations
+
+import heapq
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable, Set
+from itertools import count
+from random import shuffle
+from typing import TYPE_CHECKING, Any
+
+from heirarchical_leiden.utils import DataKeys as Keys
+
+if TYPE_CHECKING:
+    from networkx import Graph
+
+
+class VisitStrategy(ABC):
+    """The queue of nodes to visit in a local moving phase. A strategy is reset by `start` at the beginning of every phase."""
+
+    # The name reported in the statistics of the local moving phase (see `LeidenHooks.on_local_moving`)
+    name: str = "strategy"
+
+    @abstractmethod
+    def start(self, G: Graph) -> None:
+        """Queue all nodes of the graph G for a new local moving phase."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def __bool__(self) -> bool:
+        """Determine whether there are nodes left to visit."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def pop(self) -> Any:
+        """Remove the next node to visit from the queue and return it."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def moved(self, v: Any, gain: float, neighbors: Set[Any], left_behind: Set[Any], gain_of: Callable[[Any], float]) -> None:
+        """
+        Queue nodes after the node v was moved into another community, improving the quality by `gain`.
+
+        `neighbors` are the neighbors of v outside of its new community, `left_behind` those of them, which are in the community v left.
+        `gain_of(u)` evaluates the improvement of moving node u into the new community of v.
+        """
+        raise NotImplementedError
+
+
+class FIFOQueue(VisitStrategy):
+    """Visit the nodes in random order, queueing the neighbors of moved nodes at the end of the queue."""
+
+    name = "fifo"
+
+    def __init__(self) -> None:
+        self._queue: deque[Any] = deque()
+        # The nodes currently in the queue
+        self._queued: set[Any] = set()
+
+    def _initial_order(self, G: Graph) -> list[Any]:
+        nodes = list(G.nodes)
+        shuffle(nodes)
+        return nodes
+
+    def start(self, G: Graph) -> None:
+        self._queue = deque(self._initial_order(G))
+        self._queued = set(self._queue)
+
+    def __bool__(self) -> bool:
+        return bool(self._queue)
+
+    def pop(self) -> Any:
+        v = self._queue.popleft()
+        self._queued.discard(v)
+        return v
+
+    def moved(self, v: Any, gain: float, neighbors: Set[Any], left_behind: Set[Any], gain_of: Callable[[Any], float]) -> None:
+        self._enqueue(neighbors)
+
+    def _enqueue(self, nodes: Set[Any]) -> None:
+        new = nodes - self._queued
+        self._queue.extend(new)
+        self._queued |= new
+
+
+class DegreeQueue(FIFOQueue):
+    """Visit the nodes in the order of decreasing (weighted) degree first, breaking ties randomly, then proceed as `FIFOQueue`."""
+
+    name = "degree"
+
+    def _initial_order(self, G: Graph) -> list[Any]:
+        degrees = dict(G.degree(weight=Keys.WEIGHT))
+        return sorted(super()._initial_order(G), key=lambda v: -degrees[v])
+
+
+class PruneQueue(FIFOQueue):
+    """Visit the nodes as `FIFOQueue` does, but only queue the neighbors of a moved node, whose best move could have changed."""
+
+    name = "prune"
+
+    def moved(self, v: Any, gain: float, neighbors: Set[Any], left_behind: Set[Any], gain_of: Callable[[Any], float]) -> None:
+        # The nodes left behind lost the connection to v, so staying might not be their best option anymore. For the other neighbors,
+        # only the new community of v became more attractive (through the edge to v), so they only need to be visited, if moving there
+        # became an improvement.
+        self._enqueue({u for u in neighbors - self._queued if u in left_behind or gain_of(u) > 0})
+
+
+class GainQueue(VisitStrategy):
+    """Visit the queued node with the largest gain observed last (the gain of the move that caused it to be queued) first."""
+
+    name = "gain"
+
+    def __init__(self) -> None:
+        # A heap of the queued nodes by decreasing priority, and in the order of queueing for equal priorities. Raising the priority of a
+        # queued node pushes another entry, the outdated entries are skipped when popping.
+        self._heap: list[tuple[float, int, Any]] = []
+        self._priority: dict[Any, float] = {}
+        self._counter = count()
+
+    def start(self, G: Graph) -> None:
+        nodes = list(G.nodes)
+        shuffle(nodes)
+        # Nodes, which haven't been visited yet, have an unknown gain and go first
+        self._heap = [(-float("inf"), i, v) for i, v in enumerate(nodes)]
+        self._priority = dict.fromkeys(nodes, float("inf"))
+        self._counter = count(len(nodes))
+
+    def __bool__(self) -> bool:
+        return bool(self._priority)
+
+    def pop(self) -> Any:
+        while True:
+            priority, _, v = heapq.heappop(self._heap)
+            if self._priority.get(v) == -priority:
+                del self._priority[v]
+                return v
+
+    def moved(self, v: Any, gain: float, neighbors: Set[Any], left_behind: Set[Any], gain_of: Callable[[Any], float]) -> None:
+        for u in neighbors:
+            if gain > self._priority.get(u, -float("inf")):
+                self._priority[u] = gain
+                heapq.heappush(self._heap, (-gain, next(self._counter), u))
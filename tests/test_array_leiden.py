@@ -0,0 +1,187 @@
+"""Test the Leiden algorithms on graphs in array form, i.e. sparse adjacency matrices and edge arrays."""
+
+from typing import Any
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from heirarchical_leiden.array_leiden import as_csr_graph
+from heirarchical_leiden.csr import CSRGraph
+from heirarchical_leiden.hierarchical_leiden import hierarchical_leiden
+from heirarchical_leiden.hooks import LeidenHooks
+from heirarchical_leiden.kernels import quality
+from heirarchical_leiden.leiden import leiden
+from heirarchical_leiden.ordering import ORDERINGS, node_order, reorder_graph
+from heirarchical_leiden.quality_functions import CPM, Modularity, QualityFunction
+from heirarchical_leiden.utils import Partition, TerminationReason, freeze
+from heirarchical_leiden.visiting import GainQueue
+
+from .test_simple_graphs import BARBELL_COMS_AND_MID, WEIGHTED_BARBELL_GOOD, _get_weighted_barbell_graph
+from .utils import clique_hierarchy_graph, partition_randomly, seed_rng
+
+
+def _membership_as_set(membership: np.ndarray) -> set[frozenset[int]]:
+    return freeze([set(np.flatnonzero(membership == c).tolist()) for c in np.unique(membership)])
+
+
+def _edge_arrays(G: nx.Graph, weight: str | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    src, dst, w = zip(*G.edges(data=weight, default=1))
+    return np.array(src), np.array(dst), np.array(w, dtype=float)
+
+
+@seed_rng(0)
+def test_array_leiden_barbell() -> None:
+    G = nx.generators.barbell_graph(5, 2)
+
+    membership = leiden(_edge_arrays(G), Modularity(1.1))
+    assert membership.dtype == np.int64
+    assert _membership_as_set(membership) == BARBELL_COMS_AND_MID
+
+    membership = leiden(_edge_arrays(_get_weighted_barbell_graph(), "weight"), CPM(0.5))
+    assert _membership_as_set(membership) == WEIGHTED_BARBELL_GOOD
+
+
+@seed_rng(0)
+def test_array_leiden_sparse_matrix() -> None:
+    sparse = pytest.importorskip("scipy.sparse")
+    G = nx.ring_of_cliques(8, 5)
+
+    # The full, symmetric matrix and both of its triangles describe the same graph
+    A = sparse.csr_matrix(nx.to_scipy_sparse_array(G))
+    cliques = freeze([set(range(i, i + 5)) for i in range(0, 40, 5)])
+    assert _membership_as_set(leiden(A, Modularity(1))) == cliques
+    assert _membership_as_set(leiden(sparse.triu(A), Modularity(1))) == cliques
+    assert _membership_as_set(leiden(sparse.tril(A), Modularity(1))) == cliques
+    assert np.array_equal(as_csr_graph(sparse.tril(A)).indices, as_csr_graph(A).indices)
+
+    # Asymmetric matrices are symmetrized with the larger one of both weights
+    assert np.array_equal(as_csr_graph(sparse.csr_matrix([[0, 2], [3, 0]])).weights, [3, 3])
+
+    with pytest.raises(ValueError):
+        leiden(sparse.csr_matrix((3, 4)), Modularity(1))
+
+
+def test_array_leiden_unsupported_options() -> None:
+    # The options for NetworkX graphs are rejected instead of being ignored
+    edges = _edge_arrays(clique_hierarchy_graph())
+    options: list[dict[str, Any]] = [{"weight": "weight"}, {"reduce": True}, {"strategy": GainQueue()}, {"refine_samples": 4}, {"max_tree_size": 3}]
+    for option in options:
+        with pytest.raises(ValueError, match="only supported for NetworkX graphs"):
+            leiden(edges, Modularity(1), **option)
+
+
+class TerminationHooks(LeidenHooks):
+    """Hooks recording the termination reasons of all runs."""
+
+    def __init__(self) -> None:
+        self.reasons: list[TerminationReason] = []
+
+    def on_termination(self, reason: TerminationReason) -> None:
+        self.reasons.append(reason)
+
+
+@seed_rng(0)
+def test_array_leiden_termination() -> None:
+    # Runs on graphs in array form report the same termination reasons as those on NetworkX graphs record
+    G = nx.karate_club_graph()
+    budgets: list[dict[str, Any]] = [{}, {"max_levels": 1}, {"min_quality_gain": float("inf")}, {"time_budget": 0}]
+    for budget in budgets:
+        hooks = TerminationHooks()
+        leiden(_edge_arrays(G), Modularity(1), hooks=hooks, **budget)
+        𝓟 = leiden(G, Modularity(1), hooks=hooks, **budget)
+        assert hooks.reasons == [𝓟.termination_reason] * 2
+
+
+def test_array_quality() -> None:
+    """The quality of membership arrays matches the quality of the corresponding partitions."""
+    G = _get_weighted_barbell_graph()
+    g, nodes = CSRGraph.from_networkx(G, "weight")
+    # Also check the handling of self-loops
+    L = nx.Graph(G)
+    L.add_edge(2, 2, weight=2)
+    loops, _ = CSRGraph.from_networkx(L, "weight")
+
+    quality_functions: list[QualityFunction[int]] = [Modularity(1), Modularity(0.5), CPM(0.5), CPM(0.1)]
+    for 𝓗 in quality_functions:
+        for _ in range(5):
+            communities = partition_randomly(nodes)
+            membership = np.zeros(len(nodes), dtype=np.int64)
+            for i, C in enumerate(communities):
+                membership[C] = i
+            assert abs(quality(𝓗, g, membership) - 𝓗(Partition.from_partition(G, communities, "weight"))) < 1e-12
+            assert abs(quality(𝓗, loops, membership) - 𝓗(Partition.from_partition(L, communities, "weight"))) < 1e-12
+
+
+@seed_rng(0)
+def test_array_hierarchical_leiden() -> None:
+    G = clique_hierarchy_graph()
+
+    levels = hierarchical_leiden(_edge_arrays(G), Modularity(0.5), partition_max_size=6)
+
+    # The top level consists of the groups, which are split up into the cliques on the next level
+    assert len(levels) == 2
+    assert _membership_as_set(levels[0]) == freeze([set(range(i, i + 20)) for i in range(0, 60, 20)])
+    assert _membership_as_set(levels[1]) == freeze([set(range(i, i + 5)) for i in range(0, 60, 5)])
+
+    # A graph which isn't split at all is represented by a single level, containing a single community
+    levels = hierarchical_leiden(_edge_arrays(nx.complete_graph(10)), Modularity(1))
+    assert [level.tolist() for level in levels] == [[0] * 10]
+
+    # The parameters for NetworkX graphs are rejected instead of being ignored
+    with pytest.raises(ValueError):
+        hierarchical_leiden(_edge_arrays(G), Modularity(0.5), weight="weight")
+    with pytest.raises(ValueError):
+        hierarchical_leiden(_edge_arrays(G), Modularity(0.5), level=1)
+
+
+def test_node_order() -> None:
+    # A path, whose nodes are numbered randomly, i.e. neighbors are far apart
+    labels = np.random.default_rng(0).permutation(100)
+    graph = CSRGraph.from_edges(labels[:-1], labels[1:])
+
+    for ordering in ORDERINGS:
+        order = node_order(graph, ordering)
+        assert sorted(order.tolist()) == list(range(100))
+    # Breadth-first orderings number the nodes along the path, so that neighbors are close. RCM starts at an end of the path (a node of
+    # minimal degree), so that neighbors become adjacent, while BFS starts somewhere in the middle, alternating between both directions.
+    for ordering, bandwidth in (("rcm", 1), ("bfs", 2)):
+        permuted = graph.permute(node_order(graph, ordering))
+        rows = np.repeat(np.arange(100), np.diff(permuted.indptr))
+        assert np.abs(rows - permuted.indices).max() == bandwidth
+
+    with pytest.raises(ValueError):
+        node_order(graph, "random")  # type: ignore[arg-type]
+
+
+@seed_rng(0)
+def test_array_leiden_ordering() -> None:
+    G = clique_hierarchy_graph()
+
+    # The results refer to the original nodes
+    for ordering in ORDERINGS:
+        levels = hierarchical_leiden(_edge_arrays(G), Modularity(0.5), partition_max_size=6, ordering=ordering)
+        assert _membership_as_set(levels[1]) == freeze([set(range(i, i + 5)) for i in range(0, 60, 5)])
+        membership = leiden(_edge_arrays(nx.ring_of_cliques(8, 5)), Modularity(1), ordering=ordering)
+        assert _membership_as_set(membership) == freeze([set(range(i, i + 5)) for i in range(0, 40, 5)])
+
+
+@seed_rng(0)
+def test_networkx_ordering() -> None:
+    # A path, whose nodes are labeled randomly, is traversed along the path after reordering it
+    labels = np.random.default_rng(0).permutation(100).tolist()
+    P = nx.relabel_nodes(nx.path_graph(100), dict(enumerate(labels)))
+    H = reorder_graph(P, "rcm")
+    assert nx.utils.graphs_equal(P, H)
+    assert list(H.nodes) in (labels, labels[::-1])
+    assert all(list(H[v]) == sorted(H[v], key=list(H.nodes).index) for v in H)
+
+    # The results refer to the original graph
+    G = clique_hierarchy_graph()
+    for ordering in ORDERINGS:
+        𝓟 = leiden(G, Modularity(0.5), ordering=ordering)
+        assert 𝓟.G is G and 𝓟.termination_reason is not None
+        assert 𝓟.as_set() == freeze([set(range(i, i + 20)) for i in range(0, 60, 20)])
+        𝓗𝓟 = hierarchical_leiden(G, Modularity(0.5), partition_max_size=6, ordering=ordering)
+        assert 𝓗𝓟["partition"].G is G
+        assert {len(C) for child in 𝓗𝓟["children"].values() for C in child["partition"]} == {5}
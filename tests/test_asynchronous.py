@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import networkx as nx
+import pytest
+
+from heirarchical_leiden.asynchronous import AsyncClusterer
+from heirarchical_leiden.hooks import LeidenHooks, ProgressEvent
+from heirarchical_leiden.leiden import leiden
+from heirarchical_leiden.quality_functions import Modularity
+from heirarchical_leiden.utils import TerminationReason
+
+from .utils import clique_hierarchy_graph, seed_rng
+
+
+class _StopAfter(LeidenHooks):
+    def __init__(self, checks: int) -> None:
+        self.checks = checks
+        self.events: list[ProgressEvent] = []
+
+    def should_stop(self) -> bool:
+        self.checks -= 1
+        return self.checks < 0
+
+    def on_progress(self, event: ProgressEvent) -> None:
+        self.events.append(event)
+
+
+@seed_rng(0)
+def test_leiden_hooks() -> None:
+    G = nx.karate_club_graph()
+    hooks = _StopAfter(1_000_000)
+    𝓟 = leiden(G, Modularity(1), hooks=hooks)
+    assert 𝓟.termination_reason == TerminationReason.CONVERGED
+    assert [event["level"] for event in hooks.events] == list(range(1, len(hooks.events) + 1))
+    assert hooks.events[0]["nodes"] == G.order()
+
+    # Stopping during the first local moving phase returns the partition found so far
+    𝓟 = leiden(G, Modularity(1), hooks=_StopAfter(10))
+    assert 𝓟.termination_reason == TerminationReason.CANCELLED
+    assert len(𝓟) > G.order() - 10
+
+
+@seed_rng(0)
+def test_async_clusterer() -> None:
+    async def main() -> None:
+        clusterer = AsyncClusterer(max_concurrency=1)
+        job = clusterer.hierarchical_leiden(clique_hierarchy_graph(), Modularity(0.5), partition_max_size=6)
+        events = [event async for event in job.events()]
+        𝓗𝓟 = await job
+        assert len(𝓗𝓟["children"]) == 3
+
+        # Progress is reported per level of every run of `leiden`, and per subtree
+        subtrees = [event["path"] for event in events if event["kind"] == "subtree"]
+        assert sorted(subtrees) == [(), (0,), (1,), (2,)]
+        assert {event["path"] for event in events if event["kind"] == "level"} == set(subtrees)
+
+        # Cancelling a running job stops the worker, and a queued job never starts
+        slow = clusterer.leiden(nx.les_miserables_graph(), Modularity(1), weight="weight")
+        queued = clusterer.leiden(nx.karate_club_graph(), Modularity(1))
+        await asyncio.sleep(0)
+        start = time.monotonic()
+        slow.cancel()
+        queued.cancel()
+        for job in (slow, queued):
+            with pytest.raises(asyncio.CancelledError):
+                await job
+        assert time.monotonic() - start < 1
+
+        # The slot of the cancelled jobs is free again
+        assert len(await clusterer.leiden(nx.barbell_graph(5, 0), Modularity(1))) == 2
+
+    asyncio.run(main())
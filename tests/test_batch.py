@@ -0,0 +1,59 @@
+import random
+
+import networkx as nx
+import numpy as np
+
+from heirarchical_leiden.batch import batch_leiden
+from heirarchical_leiden.csr import CSRGraph
+from heirarchical_leiden.quality_functions import CPM, Modularity
+from heirarchical_leiden.utils import Partition, freeze
+
+# Don't let black destroy the manual formatting in this document:
+# fmt: off
+
+def test_block_diagonal() -> None:
+    path, _ = CSRGraph.from_networkx(nx.path_graph(3))
+    triangle, _ = CSRGraph.from_networkx(nx.complete_graph(3))
+    packed, offsets = CSRGraph.block_diagonal([path, triangle])
+
+    assert offsets.tolist() == [0, 3, 6]
+    assert packed.order() == 6
+    # The nodes of the second graph are shifted by the number of nodes of the first, and there are no edges between the graphs
+    assert {(u, v) for u, neighbors, _ in packed.rows() for v in neighbors} == {
+        (0, 1), (1, 0), (1, 2), (2, 1), (3, 4), (4, 3), (3, 5), (5, 3), (4, 5), (5, 4)
+    }
+
+
+def test_batch_leiden() -> None:
+    graphs = [nx.barbell_graph(5, 0), nx.complete_graph(50), nx.karate_club_graph()]
+    partitions = batch_leiden(graphs, Modularity(1), seed=0)
+
+    assert len(partitions) == 3
+    for G, 𝓟 in zip(graphs, partitions):
+        assert isinstance(𝓟, Partition)
+        assert set(𝓟.G.nodes) == set(G.nodes)
+    # Modularity is normalized per graph: were it normalized by the total weight of the whole batch, the barbell graph, which only has a
+    # small share of the edges, would be merged into a single community.
+    assert freeze(partitions[0].communities) == freeze([set(range(5)), set(range(5, 10))])
+    assert len(partitions[1]) == 1
+
+
+def test_batch_leiden_chunks() -> None:
+    graphs = [(np.array([0, 1, 0, 3, 4, 3]), np.array([1, 2, 2, 4, 5, 5]))] * 3 + [nx.to_scipy_sparse_array(nx.barbell_graph(4, 0))]
+    sequential = batch_leiden(graphs, CPM(0.5), chunk_size=2)
+    parallel = batch_leiden(graphs, CPM(0.5), chunk_size=2, max_workers=2)
+
+    for a, b in zip(sequential, parallel):
+        assert isinstance(a, np.ndarray)
+        assert np.array_equal(a, b)
+    # Every graph is partitioned into its two triangles (or cliques), numbered consecutively from 0
+    assert sequential[0].tolist() == [0, 0, 0, 1, 1, 1]
+    assert sorted(set(sequential[3].tolist())) == [0, 1]
+
+
+def test_batch_leiden_random_state() -> None:
+    # Clustering in this process doesn't change the caller's random state
+    random.seed(42)
+    state = random.getstate()
+    batch_leiden([(np.array([0, 1, 0, 3, 4, 3]), np.array([1, 2, 2, 4, 5, 5]))], CPM(0.5))
+    assert random.getstate() == state
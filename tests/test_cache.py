@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from heirarchical_leiden import cache as cache_module
+from heirarchical_leiden.cache import ResultCache, cached_hierarchical_leiden, graph_fingerprint
+from heirarchical_leiden.quality_functions import CPM, Modularity
+
+from .utils import clique_hierarchy_graph
+
+
+def test_graph_fingerprint() -> None:
+    G = nx.karate_club_graph()
+    H = nx.Graph()
+    H.add_nodes_from(G.nodes)
+    H.add_edges_from((v, u, d) for u, v, d in reversed(list(G.edges(data=True))))
+
+    # The fingerprint doesn't depend on the order of the edges, but on their weights
+    assert graph_fingerprint(G) == graph_fingerprint(H)
+    assert graph_fingerprint(G, "weight") == graph_fingerprint(H, "weight")
+    assert graph_fingerprint(G) != graph_fingerprint(G, "weight")
+
+    src, dst = np.array([0, 1, 2]), np.array([1, 2, 0])
+    assert graph_fingerprint((src, dst)) == graph_fingerprint((dst[::-1], src[::-1]))
+    assert graph_fingerprint((src, dst)) != graph_fingerprint((src, dst, np.array([1.0, 2.0, 1.0])))
+
+
+def test_result_cache_eviction(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path, max_bytes=3000)
+    for key in "abc":
+        cache.put(key, bytes(900))
+    assert all(key in cache for key in "abc")
+
+    # Using "a" makes "b" the least recently used entry, which is evicted to make room for "d"
+    assert cache.get("a") == bytes(900)
+    cache.put("d", bytes(900))
+    assert [key in cache for key in "abcd"] == [True, False, True, True]
+    assert cache.size() <= 3000
+    assert cache.get("b", "missing") == "missing"
+
+
+def test_cached_hierarchical_leiden(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    G = clique_hierarchy_graph()
+    𝓗 = Modularity(0.5)
+
+    result = cached_hierarchical_leiden(G, 𝓗, partition_max_size=6, cache=tmp_path)
+    assert len(result["children"]) == 3
+
+    # A repeated call returns the stored result without running the algorithm
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("The result should have been taken from the cache.")
+
+    monkeypatch.setattr(cache_module, "hierarchical_leiden", fail)
+    cached = cached_hierarchical_leiden(G, 𝓗, partition_max_size=6, cache=tmp_path)
+    assert cached["partition"].as_set() == result["partition"].as_set()
+    assert cached["partition"].termination_reason == result["partition"].termination_reason
+    assert {idx: child["partition"].as_set() for idx, child in cached["children"].items()} == {
+        idx: child["partition"].as_set() for idx, child in result["children"].items()
+    }
+
+    # Different parameters or quality functions are different entries
+    with pytest.raises(AssertionError, match="cache"):
+        cached_hierarchical_leiden(G, CPM(0.5), partition_max_size=6, cache=tmp_path)
+    with pytest.raises(AssertionError, match="cache"):
+        cached_hierarchical_leiden(G, 𝓗, partition_max_size=6, seed=1, cache=tmp_path)
+
+    # Results of other versions of the package, or of another cache format, are not reused
+    monkeypatch.setattr(cache_module, "package_version", lambda: "0.0.0")
+    with pytest.raises(AssertionError, match="cache"):
+        cached_hierarchical_leiden(G, 𝓗, partition_max_size=6, cache=tmp_path)
+    monkeypatch.undo()
+    monkeypatch.setattr(cache_module, "hierarchical_leiden", fail)
+    monkeypatch.setattr(cache_module, "CACHE_FORMAT", cache_module.CACHE_FORMAT + 1)
+    with pytest.raises(AssertionError, match="cache"):
+        cached_hierarchical_leiden(G, 𝓗, partition_max_size=6, cache=tmp_path)
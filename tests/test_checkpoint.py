@@ -0,0 +1,62 @@
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from heirarchical_leiden import checkpoint
+from heirarchical_leiden.checkpoint import checkpointed_hierarchical_leiden, resume_hierarchical_leiden
+from heirarchical_leiden.quality_functions import Modularity
+
+from .utils import clique_hierarchy_graph
+
+
+def test_checkpoint_and_resume(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    G = clique_hierarchy_graph()
+    src, dst = np.array(G.edges).T
+    expected = checkpointed_hierarchical_leiden((src, dst), Modularity(0.5), tmp_path / "uninterrupted", partition_max_size=6, seed=3)
+
+    # Simulate a process, which is killed after two subtrees have been finished
+    calls = []
+    array_leiden = checkpoint.array_leiden
+
+    def interrupted(*args: object) -> object:
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        calls.append(args)
+        return array_leiden(*args)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(checkpoint, "array_leiden", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        checkpointed_hierarchical_leiden((src, dst), Modularity(0.5), tmp_path / "interrupted", partition_max_size=6, seed=3)
+    assert len(list((tmp_path / "interrupted").glob("subtree-*.npy"))) == 2
+
+    # Resuming only computes the two missing subtrees and yields the same result as the uninterrupted run
+    calls.clear()
+    monkeypatch.setattr(checkpoint, "array_leiden", lambda *args: calls.append(args) or array_leiden(*args))
+    resumed = resume_hierarchical_leiden((src, dst), tmp_path / "interrupted")
+    assert len(calls) == 2
+    assert len(resumed) == len(expected) == 2
+    assert all(np.array_equal(a, b) for a, b in zip(resumed, expected))
+
+    # A checkpoint can't be resumed for a different graph or with different parameters
+    with pytest.raises(ValueError, match="different graph"):
+        resume_hierarchical_leiden((src[1:], dst[1:]), tmp_path / "interrupted")
+    with pytest.raises(ValueError, match="different parameters"):
+        checkpointed_hierarchical_leiden((src, dst), Modularity(0.5), tmp_path / "interrupted", partition_max_size=6, seed=4)
+
+    # Nor with another version of the package
+    monkeypatch.setattr(checkpoint, "package_version", lambda: "0.0.0")
+    with pytest.raises(ValueError, match="version"):
+        resume_hierarchical_leiden((src, dst), tmp_path / "interrupted")
+
+
+def test_checkpointed_hierarchical_leiden_networkx(tmp_path: Path) -> None:
+    G = clique_hierarchy_graph()
+    # The state of the caller's random number generator is left unchanged
+    state = random.getstate()
+    𝓗𝓟 = checkpointed_hierarchical_leiden(G, Modularity(0.5), tmp_path, partition_max_size=6)
+    assert random.getstate() == state
+    assert isinstance(𝓗𝓟, dict)
+    assert sorted(𝓗𝓟["children"]) == [0, 1, 2]
+    assert all({len(C) for C in child["partition"]} == {5} for child in 𝓗𝓟["children"].values())
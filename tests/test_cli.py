@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from heirarchical_leiden.cli import main, read_edge_list
+
+from .utils import clique_hierarchy_graph
+
+
+def test_read_edge_list(tmp_path: Path) -> None:
+    # A CSV file with a header, and a whitespace-separated file with weights, comments and arbitrary ids
+    (tmp_path / "edges.csv").write_text("source,target\n1,10\n1,11\n10,11\n")
+    (tmp_path / "edges.txt").write_text("% comment\na\tb\t2\nb c 0.5\n\nc a 1\n")
+
+    nodes, graph = read_edge_list(str(tmp_path / "edges.csv"), chunk_size=2)
+    assert nodes.tolist() == [1, 10, 11]
+    assert graph.order() == 3 and graph.size() == 3
+
+    nodes, graph = read_edge_list(str(tmp_path / "edges.txt"))
+    assert nodes.tolist() == ["a", "b", "c"]
+    assert graph.size() == 3.5
+
+    # A single line is an edge rather than a header, also when the header check has to wait for the next chunk
+    (tmp_path / "edge.txt").write_text("a b\n")
+    for chunk_size in (1, 2**20):
+        nodes, graph = read_edge_list(str(tmp_path / "edge.txt"), chunk_size=chunk_size)
+        assert nodes.tolist() == ["a", "b"] and graph.size() == 1
+    (tmp_path / "header.csv").write_text("source,target\n# comment\n1,2\n")
+    nodes, graph = read_edge_list(str(tmp_path / "header.csv"), chunk_size=1)
+    assert nodes.tolist() == [1, 2] and graph.size() == 1
+
+
+def test_main(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    edges = tmp_path / "edges.tsv"
+    edges.write_text("".join(f"{u}\t{v}\n" for u, v in clique_hierarchy_graph().edges))
+
+    # The hierarchy of the groups of cliques is written as text, with a column per level
+    assert main([str(edges), "--resolution", "0.5", "--max-size", "6", "--profile"]) == 0
+    out, err = capsys.readouterr()
+    lines = out.splitlines()
+    assert lines[0] == "node\tlevel_0\tlevel_1"
+    table = np.array([line.split("\t") for line in lines[1:]], dtype=np.int64)
+    assert table[:, 0].tolist() == list(range(60))
+    assert len(set(table[:, 1])) == 3 and len(set(table[:, 2])) == 12
+    assert "cluster" in err and "cumulative" in err
+
+    # A flat partition written as NumPy archive, with the best of several runs on worker processes
+    args = ["--flat", "--quality", "cpm", "--resolution", "0.5", "--restarts", "2", "--workers", "2", "-o", str(tmp_path / "out.npz")]
+    assert main([str(edges), *args]) == 0
+    archive = np.load(tmp_path / "out.npz")
+    assert archive["nodes"].tolist() == list(range(60))
+    assert archive["levels"].shape == (1, 60)
+
+    with pytest.raises(SystemExit):
+        main([str(edges), "--workers", "2", "--time-budget", "1"])
+    # Flat runs only use workers for restarts
+    with pytest.raises(SystemExit):
+        main([str(edges), "--flat", "--workers", "2"])
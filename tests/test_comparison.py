@@ -0,0 +1,81 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from heirarchical_leiden.array_leiden import array_hierarchical_leiden
+from heirarchical_leiden.comparison import (
+    Contingency,
+    adjusted_rand_index,
+    compare_hierarchies,
+    jaccard_matching,
+    normalized_mutual_information,
+)
+from heirarchical_leiden.hierarchical_leiden import hierarchical_leiden
+from heirarchical_leiden.quality_functions import Modularity
+from heirarchical_leiden.utils import Partition
+
+from .utils import clique_hierarchy_graph, seed_rng
+
+# Don't let black destroy the manual formatting in this document:
+# fmt: off
+
+def test_partition_metrics() -> None:
+    first  = [0, 0, 0, 1, 1, 1]
+    second = [1, 1, 0, 0, 2, 2]
+    table = Contingency(first, second)
+    assert (table.rows.tolist(), table.columns.tolist(), table.counts.tolist()) == ([0, 0, 1, 1], [0, 1, 0, 2], [1, 2, 1, 2])
+
+    # 2 of the 15 pairs of nodes are together in both partitions, 6 in the first and 3 in the second one
+    expected = 6 * 3 / 15
+    assert np.isclose(adjusted_rand_index(first, second), (2 - expected) / ((6 + 3) / 2 - expected))
+    mutual_information = 2 * (1 / 6 * np.log(1 / 6 / (1 / 2 * 1 / 3))) + 2 * (2 / 6 * np.log(2 / 6 / (1 / 2 * 1 / 3)))
+    entropies = np.log(2) + np.log(3)
+    assert np.isclose(normalized_mutual_information(first, second), mutual_information / (entropies / 2))
+    assert normalized_mutual_information(table) == normalized_mutual_information(second, first)
+
+    # The metrics don't depend on the indices of the communities
+    relabelled = [7, 7, 7, 3, 3, 3]
+    assert normalized_mutual_information(first, relabelled) == adjusted_rand_index(first, relabelled) == 1
+    assert normalized_mutual_information([0] * 4, [5] * 4) == adjusted_rand_index([0] * 4, [5] * 4) == 1
+    with pytest.raises(ValueError):
+        Contingency(first, second[:5])
+
+
+def test_jaccard_matching() -> None:
+    matches, jaccard = jaccard_matching([0, 0, 0, 1, 1, 2], [1, 1, 0, 0, 0, 2])
+    assert matches.tolist() == [1, 0, 2]
+    assert np.allclose(jaccard, [2 / 3, 2 / 3, 1])
+
+
+def test_partition_alignment() -> None:
+    G = nx.path_graph(6)
+    first = Partition.from_partition(G, [{0, 1, 2}, {3, 4, 5}])
+    # The partition of a changed graph: node 5 was removed, and node 6 was added
+    G2 = nx.path_graph([0, 1, 2, 3, 4, 6])
+    second = Partition.from_partition(G2, [{0, 1}, {2, 3, 4}, {6}])
+
+    table = Contingency(first, second)
+    assert table.n == 5
+    assert table.second_sizes.tolist() == [2, 3]
+    assert np.isclose(adjusted_rand_index(first, second), adjusted_rand_index([0, 0, 0, 1, 1], [0, 0, 1, 1, 1]))
+    with pytest.raises(TypeError):
+        Contingency(first, [0, 0, 0, 1, 1, 1])
+
+
+@seed_rng(0)
+def test_compare_hierarchies() -> None:
+    G = clique_hierarchy_graph()
+    𝓗 = Modularity(0.5)
+    𝓗𝓟 = hierarchical_leiden(G, 𝓗, partition_max_size=6)
+    comparison = compare_hierarchies(𝓗𝓟, 𝓗𝓟)
+    assert [level["level"] for level in comparison] == [0, 1]
+    assert all(level["nmi"] == level["ari"] == 1 and (level["jaccard"] == 1).all() for level in comparison)
+    assert comparison[1]["matches"].tolist() == list(range(12))
+
+    # The levels of a hierarchy of the same graph in array form, compared with a shallower one
+    levels = array_hierarchical_leiden(nx.to_scipy_sparse_array(G, nodelist=sorted(G.nodes)), 𝓗, partition_max_size=6)
+    comparison = compare_hierarchies(levels, levels[:1])
+    assert len(comparison) == 2
+    assert comparison[0]["ari"] == 1
+    # The 3 groups of the top level each contain 4 cliques, sharing a quarter of the group's nodes
+    assert comparison[1]["nmi"] < 1 and np.allclose(comparison[1]["jaccard"], 1 / 4)
@@ -0,0 +1,42 @@
+import random
+
+import numpy as np
+
+from heirarchical_leiden.consensus import consensus_graph, consensus_leiden
+from heirarchical_leiden.csr import CSRGraph
+from heirarchical_leiden.quality_functions import Modularity
+from heirarchical_leiden.utils import Partition, freeze
+
+from .utils import clique_hierarchy_graph
+
+
+def test_consensus_graph() -> None:
+    graph = CSRGraph.from_edges([0, 1, 2, 3], [1, 2, 3, 0])
+    memberships = iter([np.array([0, 0, 1, 1]), np.array([0, 0, 0, 1]), np.array([0, 1, 1, 1]), np.array([0, 0, 1, 1])])
+    consensus = consensus_graph(graph, memberships, threshold=0.25)
+
+    # The edge {0, 1} is within a community in 3 of 4 runs, {1, 2} in 2, {2, 3} in 3 and {3, 0} in none
+    edges = {(u, v): w for src, dst, weights in consensus.edges() for u, v, w in zip(src.tolist(), dst.tolist(), weights.tolist())}
+    assert edges == {(0, 1): 0.75, (1, 2): 0.5, (2, 3): 0.75}
+    assert np.array_equal(consensus.node_weights, graph.node_weights)
+
+
+def test_consensus_leiden() -> None:
+    G = clique_hierarchy_graph()
+    𝓟 = consensus_leiden(G, Modularity(1), runs=5)
+    assert isinstance(𝓟, Partition)
+    assert freeze(𝓟.communities) == freeze([set(range(i, i + 5)) for i in range(0, 60, 5)])
+
+    # The result only depends on the seed, not on the number of workers
+    src, dst = np.array(G.edges).T
+    membership = consensus_leiden((src, dst), Modularity(0.5), runs=6, seed=3, max_workers=2)
+    assert np.array_equal(membership, consensus_leiden((src, dst), Modularity(0.5), runs=6, seed=3))
+
+
+def test_consensus_leiden_random_state() -> None:
+    # The runs are seeded from the given seed without changing the caller's random state
+    src, dst = np.array(clique_hierarchy_graph().edges).T
+    random.seed(42)
+    state = random.getstate()
+    consensus_leiden((src, dst), Modularity(1), runs=3)
+    assert random.getstate() == state
@@ -0,0 +1,119 @@
+import random
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from heirarchical_leiden import kernels
+from heirarchical_leiden.csr import CSRGraph, write_csr
+from heirarchical_leiden.kernels import aggregate_graph, move_nodes_queue, refine_partition
+from heirarchical_leiden.out_of_core import out_of_core_leiden
+from heirarchical_leiden.quality_functions import CPM, Modularity
+from heirarchical_leiden.utils import DataKeys, freeze
+
+from .utils import seed_rng
+
+
+def _membership_as_set(membership: np.ndarray) -> set[frozenset[int]]:
+    return freeze([set(np.flatnonzero(membership == c).tolist()) for c in np.unique(membership)])
+
+
+def test_csr_from_networkx() -> None:
+    G = nx.Graph()
+    G.add_weighted_edges_from([(0, 1, 2), (1, 2, 1), (2, 2, 3)])
+    G.add_node(3)
+
+    g, nodes = CSRGraph.from_networkx(G, weight="weight")
+    assert nodes == [0, 1, 2, 3]
+    assert g.order() == 4
+    assert g.size() == G.size(weight="weight")
+    # Self-loops count twice towards the degree, just as in NetworkX
+    assert g.degrees.tolist() == [d for _, d in G.degree(weight="weight")]
+    assert [(v, ns, ws) for v, ns, ws in g.rows()] == [(0, [1], [2]), (1, [0, 2], [2, 1]), (2, [1, 2], [1, 3]), (3, [], [])]
+
+    # Converting back yields the same graph, carrying the weights in the internal attribute
+    H = g.to_networkx()
+    assert sorted(H.edges(data=DataKeys.WEIGHT)) == sorted(G.edges(data="weight"))
+
+
+def test_write_csr(tmp_path: Path) -> None:
+    G = nx.karate_club_graph()
+    src, dst = np.array(list(G.edges)).T
+    expected, _ = CSRGraph.from_networkx(G)
+
+    # Write the graph in chunks of ten edges, which requires two passes over the chunks
+    chunks = [(src[i : i + 10], dst[i : i + 10], None) for i in range(0, len(src), 10)]
+    g = write_csr(tmp_path, lambda: chunks)
+
+    assert isinstance(g.indices, np.memmap)
+    assert np.array_equal(g.indptr, expected.indptr)
+    assert np.array_equal(g.degrees, expected.degrees)
+    for (v, ns, ws), (_, ns_e, ws_e) in zip(g.rows(), expected.rows()):
+        assert sorted(zip(ns, ws)) == sorted(zip(ns_e, ws_e)), f"Row {v} differs"
+
+    # Blocks cover all nodes and stay within their limit, unless a single node exceeds it
+    blocks = g.blocks(max_edges=20)
+    assert blocks[0][0] == 0 and blocks[-1][1] == g.order()
+    assert all(g.indptr[b] - g.indptr[a] <= 20 or b == a + 1 for a, b in blocks)
+
+
+@seed_rng(0)
+def test_refine_and_aggregate() -> None:
+    G = nx.ring_of_cliques(4, 5)
+    g, _ = CSRGraph.from_networkx(G)
+
+    # Refining the partition into the cliques can only split the cliques
+    membership = np.arange(20) // 5
+    refined = refine_partition(g, membership, Modularity(1), θ=0.01, γ=0.05)
+    assert all(len(set(membership[refined == c])) == 1 for c in np.unique(refined))
+
+    # Aggregating by the cliques produces a ring of four nodes with self-loops carrying the internal edges
+    H = aggregate_graph(g, membership).to_networkx()
+    assert H.order() == 4
+    assert H.size(weight=DataKeys.WEIGHT) == G.size()
+    assert all(H[c][c][DataKeys.WEIGHT] == 10 for c in range(4))
+    assert list(H.nodes(data=DataKeys.WEIGHT)) == [(c, 5) for c in range(4)]
+
+
+@seed_rng(0)
+def test_out_of_core_leiden(tmp_path: Path) -> None:
+    G = nx.ring_of_cliques(20, 6)
+    src, dst = np.array(list(G.edges)).T
+    write_csr(tmp_path / "graph", lambda: [(src, dst, None)])
+    cliques = freeze([set(range(i, i + 6)) for i in range(0, 120, 6)])
+
+    # Force the streaming path by using small blocks and a tiny limit for the in-memory graphs
+    for 𝓗 in [Modularity(1), CPM(0.5)]:
+        membership = out_of_core_leiden(tmp_path / "graph", 𝓗, max_in_memory_nodes=10, max_edges=40, workdir=tmp_path)
+        assert _membership_as_set(membership) == cliques
+
+    # If the refinement doesn't merge any nodes (with γ this large), the communities of the local moving phase are still numbered
+    # consecutively
+    graph, _ = CSRGraph.from_networkx(nx.ring_of_cliques(6, 5))
+    membership = out_of_core_leiden(graph, Modularity(1), 0.3, 1e9, max_in_memory_nodes=1)
+    assert sorted(set(membership.tolist())) == list(range(6))
+    assert _membership_as_set(membership) == freeze([set(range(i, i + 5)) for i in range(0, 30, 5)])
+
+
+def test_kernel_backends_agree() -> None:
+    pytest.importorskip("numba")
+    g, _ = CSRGraph.from_networkx(nx.les_miserables_graph(), weight="weight")
+    𝓗 = Modularity(1)
+
+    results = []
+    backend = kernels.BACKEND
+    try:
+        for name in ("python", "numba"):
+            kernels.set_backend(name)
+            random.seed(0)
+            membership = move_nodes_queue(g, list(range(g.order())), 𝓗)
+            results.append((membership, refine_partition(g, membership, 𝓗, 0.3, 0.05).tolist()))
+    finally:
+        kernels.set_backend(backend)
+
+    # Both backends run the same code on the same random numbers
+    assert results[0] == results[1]
+
+    with pytest.raises(ValueError, match="Unknown backend"):
+        kernels.set_backend("cython")
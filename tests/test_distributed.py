@@ -0,0 +1,132 @@
+import pickle
+import random
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from heirarchical_leiden.csr import CSRGraph, IntArray
+from heirarchical_leiden.distributed import (
+    Backend,
+    ExecutorBackend,
+    InProcessBackend,
+    ProcessBackend,
+    SubgraphPayload,
+    Task,
+    distributed_hierarchical_leiden,
+    distributed_resolution_sweep,
+)
+from heirarchical_leiden.parallel import resolution_sweep
+from heirarchical_leiden.quality_functions import Modularity
+from heirarchical_leiden.scheduler import parallel_hierarchical_leiden
+from heirarchical_leiden.utils import Partition
+
+from .utils import clique_hierarchy_graph
+
+
+class FlakyBackend(InProcessBackend):
+    """A backend losing the first attempt of every task, as if the machine running it failed."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lost: set[object] = set()
+
+    def submit(self, task: Task) -> Future[IntArray]:
+        if task.key in self.lost:
+            return super().submit(task)
+        self.lost.add(task.key)
+        future: Future[IntArray] = Future()
+        future.set_exception(ConnectionError(f"Lost {task!r}"))
+        return future
+
+
+def test_subgraph_payload() -> None:
+    src, dst = np.array(clique_hierarchy_graph().edges).T
+    for weights in (np.ones(len(src)), np.arange(1, len(src) + 1, dtype=np.float64)):
+        graph = CSRGraph.from_edges(src, dst, weights, int(max(src.max(), dst.max())) + 1)
+        payload = SubgraphPayload(graph)
+        # The payload is smaller than the graph, but recreates it exactly
+        assert payload.nbytes < graph.nbytes
+        assert len(pickle.dumps(payload)) < len(pickle.dumps(graph))
+        recreated = pickle.loads(pickle.dumps(payload)).graph()
+        for field in ("indptr", "indices", "weights", "node_weights", "degrees"):
+            assert np.array_equal(getattr(recreated, field), getattr(graph, field))
+
+
+def test_distributed_hierarchical_leiden() -> None:
+    G = clique_hierarchy_graph()
+    with InProcessBackend() as backend:
+        𝓗𝓟 = distributed_hierarchical_leiden(G, Modularity(0.5), backend, partition_max_size=6)
+    assert isinstance(𝓗𝓟, dict)
+    assert {len(C) for C in 𝓗𝓟["partition"]} == {20}
+    assert all({len(C) for C in child["partition"]} == {5} for child in 𝓗𝓟["children"].values())
+    # The root and the groups are processed, but not the cliques, which are small enough
+    assert backend.runs == 1 + 3
+
+    # Running the tasks in this process leaves the caller's random state unchanged
+    random.seed(42)
+    state = random.getstate()
+    with InProcessBackend() as backend:
+        distributed_hierarchical_leiden(G, Modularity(0.5), backend, partition_max_size=6)
+    assert random.getstate() == state
+
+    # The result is the same for every backend, and the same as that of the scheduler
+    src, dst = np.array(G.edges).T
+    with InProcessBackend() as in_process:
+        levels = distributed_hierarchical_leiden((src, dst), Modularity(0.5), in_process, partition_max_size=6, seed=1)
+    with ProcessBackend(2) as processes:
+        distributed = distributed_hierarchical_leiden((src, dst), Modularity(0.5), processes, partition_max_size=6, seed=1)
+    scheduled = parallel_hierarchical_leiden((src, dst), Modularity(0.5), partition_max_size=6, seed=1, max_workers=2)
+    assert isinstance(levels, list) and isinstance(distributed, list) and isinstance(scheduled, list)
+    assert all(np.array_equal(a, b) for a, b in zip(levels, distributed))
+    assert all(np.array_equal(a, b) for a, b in zip(levels, scheduled))
+
+
+def test_distributed_retries() -> None:
+    src, dst = np.array(clique_hierarchy_graph().edges).T
+    with InProcessBackend() as backend:
+        expected = distributed_hierarchical_leiden((src, dst), Modularity(0.5), backend, partition_max_size=6)
+
+    # Lost tasks are run again, yielding the same result
+    with FlakyBackend() as flaky:
+        levels = distributed_hierarchical_leiden((src, dst), Modularity(0.5), flaky, partition_max_size=6)
+    assert all(np.array_equal(a, b) for a, b in zip(levels, expected))
+    assert flaky.runs == 1 + 3
+
+    # Without retries, the error of the lost task is raised
+    with pytest.raises(ConnectionError), FlakyBackend() as flaky:
+        distributed_hierarchical_leiden((src, dst), Modularity(0.5), flaky, partition_max_size=6, retries=0)
+
+
+def test_distributed_resolution_sweep() -> None:
+    G = clique_hierarchy_graph()
+    quality_functions = [Modularity(0.5), Modularity(2)]
+    with FlakyBackend() as backend:
+        partitions = distributed_resolution_sweep(G, quality_functions, backend)
+    assert all(isinstance(𝓟, Partition) for 𝓟 in partitions)
+    assert [𝓟.as_set() for 𝓟 in partitions] == [𝓟.as_set() for 𝓟 in resolution_sweep(G, quality_functions, max_workers=2)]
+
+
+def test_executor_backend() -> None:
+    src, dst = np.array(clique_hierarchy_graph().edges).T
+    with InProcessBackend() as backend:
+        expected = distributed_hierarchical_leiden((src, dst), Modularity(0.5), backend, partition_max_size=6)
+
+    # An executor passed in stays usable after the backend is closed, unless the backend owns it
+    with ProcessPoolExecutor(2) as executor:
+        with ExecutorBackend(executor) as backend:
+            levels = distributed_hierarchical_leiden((src, dst), Modularity(0.5), backend, partition_max_size=6)
+        assert all(np.array_equal(a, b) for a, b in zip(levels, expected))
+        assert executor.submit(int, 1).result() == 1
+        with ExecutorBackend(executor, owns=True):
+            pass
+        with pytest.raises(RuntimeError):
+            executor.submit(int, 1)
+
+    # Tasks on threads would race on the global random number generator
+    with ThreadPoolExecutor(2) as executor, pytest.raises(ValueError, match="ThreadPoolExecutor"):
+        ExecutorBackend(executor)
+
+    # Backends have to implement `submit`
+    with pytest.raises(TypeError):
+        Backend()  # type: ignore[abstract]
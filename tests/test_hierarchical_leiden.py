@@ -0,0 +1,98 @@
+import random
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import networkx as nx
+import numpy as np
+
+from heirarchical_leiden.hierarchical_leiden import hierarchical_leiden, lazy_hierarchical_leiden, stream_hierarchical_leiden
+from heirarchical_leiden.quality_functions import Modularity
+
+from .utils import clique_hierarchy_graph, seed_rng
+
+
+@seed_rng(0)
+def test_lazy_hierarchical_leiden() -> None:
+    G = clique_hierarchy_graph()
+    𝓗𝓟 = lazy_hierarchical_leiden(G, Modularity(0.5), partition_max_size=6)
+
+    # Only the top level has been computed so far, also after listing the (candidate) children
+    assert len(𝓗𝓟["partition"]) == 3
+    assert 𝓗𝓟["level"] == 0
+    assert sorted(𝓗𝓟["children"]) == [0, 1, 2] and 0 in 𝓗𝓟["children"]
+    assert 𝓗𝓟.children.computed() == []
+
+    # Accessing a child computes just that child, and only once
+    child = 𝓗𝓟["children"][0]
+    assert 𝓗𝓟.children.computed() == [0]
+    assert 𝓗𝓟["children"][0] is child
+    assert child["level"] == 1
+    assert {len(C) for C in child["partition"]} == {5}
+
+    # Expanding the partition computes the complete hierarchy, in which the cliques are not split up any further
+    expanded = 𝓗𝓟.expand()
+    assert sorted(expanded["children"]) == [0, 1, 2]
+    assert all(grandchild["children"] == {} for grandchild in expanded["children"].values())
+
+    # Communities, which turn out not to be split up, are leaves, which are left out of the expanded hierarchy
+    𝓗𝓟 = lazy_hierarchical_leiden(G, Modularity(0.5), partition_max_size=4)
+    leaf = 𝓗𝓟["children"][0]["children"][0]
+    assert len(leaf["partition"]) == 1 and len(leaf["partition"].communities[0]) == 5
+    assert leaf["level"] == 2 and dict(leaf["children"]) == {}
+    assert all(grandchild["children"] == {} for grandchild in 𝓗𝓟.expand()["children"].values())
+
+
+@seed_rng(0)
+def test_lazy_hierarchical_leiden_prefetch() -> None:
+    G = clique_hierarchy_graph()
+    with ThreadPoolExecutor(2) as executor:
+        𝓗𝓟 = lazy_hierarchical_leiden(G, Modularity(0.5), partition_max_size=4, prefetch=executor)
+        assert len(𝓗𝓟["children"]) == 3
+        child = 𝓗𝓟["children"][0]
+        wait(𝓗𝓟.children._futures.values())
+        assert sorted(𝓗𝓟.children.computed()) == [0, 1, 2]
+        # Only the children of the accessed child are prefetched, not those of the other (prefetched) children
+        wait(child.children._futures.values())
+        assert len(child["children"]) == 4
+        assert len(child.children.computed()) == 4
+        assert all(𝓗𝓟.children._futures[idx].result().children.computed() == [] for idx in (1, 2))
+
+    # At most `prefetch_limit` children are prefetched
+    with ThreadPoolExecutor(2) as executor:
+        𝓗𝓟 = lazy_hierarchical_leiden(G, Modularity(0.5), partition_max_size=6, prefetch=executor, prefetch_limit=1)
+        wait(𝓗𝓟.children._futures.values())
+        assert len(𝓗𝓟.children.computed()) == 1
+
+    # A graph, which consists of a single community, has no children
+    𝓗𝓟 = lazy_hierarchical_leiden(nx.complete_graph(10), Modularity(1), partition_max_size=2)
+    assert len(𝓗𝓟["partition"]) == 1
+    assert dict(𝓗𝓟["children"]) == {}
+
+
+def test_stream_hierarchical_leiden() -> None:
+    G = clique_hierarchy_graph()
+    random.seed(0)
+    𝓗𝓟 = hierarchical_leiden(G, Modularity(0.5), partition_max_size=6)
+    random.seed(0)
+    records = stream_hierarchical_leiden(G, Modularity(0.5), partition_max_size=6)
+
+    # The first records are the communities of the top level, which are yielded before any subtree is computed
+    assert [next(records)[0] for _ in range(3)] == [(0,), (1,), (2,)]
+
+    # The records are those of the hierarchical partition, in depth-first order
+    rest = list(records)
+    assert [path for path, _ in rest[:4]] == [(0, 0), (0, 1), (0, 2), (0, 3)]
+    assert {path: set(C) for path, C in rest} == {
+        (idx, child): set(C) for idx, subtree in 𝓗𝓟["children"].items() for child, C in enumerate(subtree["partition"].communities)
+    }
+
+
+def test_stream_hierarchical_leiden_arrays() -> None:
+    A = nx.to_scipy_sparse_array(clique_hierarchy_graph())
+    random.seed(0)
+    levels = hierarchical_leiden(A, Modularity(0.5), partition_max_size=6)
+    random.seed(0)
+    records = list(stream_hierarchical_leiden(A, Modularity(0.5), partition_max_size=6))
+
+    # The communities without children are those of the last level
+    leaves = [set(C.tolist()) for path, C in records if len(path) == 2]
+    assert sorted(map(sorted, leaves)) == sorted(np.flatnonzero(levels[-1] == c).tolist() for c in range(int(levels[-1].max()) + 1))
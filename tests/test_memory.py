@@ -0,0 +1,82 @@
+from functools import partial
+from typing import Any
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from heirarchical_leiden import out_of_core, scheduler
+from heirarchical_leiden.csr import CSRGraph
+from heirarchical_leiden.hierarchical_leiden import hierarchical_leiden
+from heirarchical_leiden.leiden import leiden
+from heirarchical_leiden.memory import MemoryBudget, MemoryLimitExceededError, process_memory
+from heirarchical_leiden.quality_functions import Modularity
+from heirarchical_leiden.scheduler import SchedulerStats, parallel_hierarchical_leiden
+from heirarchical_leiden.utils import freeze
+
+from .utils import clique_hierarchy_graph, seed_rng
+
+CLIQUES = freeze([set(range(i, i + 5)) for i in range(0, 60, 5)])
+
+
+def test_memory_limit_exceeded() -> None:
+    assert process_memory() > 0
+    G = clique_hierarchy_graph()
+    with pytest.raises(MemoryLimitExceededError, match="exceeds the limit"):
+        leiden(G, Modularity(1), memory_limit=1)
+    with pytest.raises(MemoryLimitExceededError):
+        hierarchical_leiden(nx.to_scipy_sparse_array(G), Modularity(1), memory_limit=1)
+
+
+@seed_rng(0)
+def test_memory_pressure() -> None:
+    G = clique_hierarchy_graph()
+
+    # Under memory pressure, every level aggregates the original graph, with the same result
+    budget = MemoryBudget(2**50, soft_limit=0.0)
+    𝓟 = leiden(G, Modularity(1), hooks=budget)
+    assert freeze(𝓟.communities) == CLIQUES
+    assert [usage["kind"] for usage in budget.usage] == ["level"] * len(budget.usage)
+    assert all(usage["peak"] >= usage["memory"] > 0 for usage in budget.usage)
+
+    # The subtrees of the hierarchy are partitioned on views of the subgraphs
+    𝓗𝓟 = hierarchical_leiden(G, Modularity(0.5), partition_max_size=6, hooks=MemoryBudget(2**50, soft_limit=0.0))
+    assert len(𝓗𝓟["children"]) == 3
+    assert all(nx.is_frozen(child["partition"].G) for child in 𝓗𝓟["children"].values())
+    assert freeze(C for child in 𝓗𝓟["children"].values() for C in child["partition"].communities) == CLIQUES
+
+
+def test_out_of_core_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def recording(*args: Any) -> Any:
+        calls.append(args)
+        return original(*args)
+
+    original = out_of_core.out_of_core_leiden
+    monkeypatch.setattr(out_of_core, "out_of_core_leiden", recording)
+
+    # A graph unlikely to fit into the remaining memory is processed out of core
+    graph, _ = CSRGraph.from_networkx(clique_hierarchy_graph())
+    membership = leiden(graph, Modularity(1), memory_limit=int(process_memory() * 1.2) + 3 * graph.nbytes)
+    assert len(calls) == 1
+    assert len(set(membership.tolist())) == 12
+    leiden(graph, Modularity(1), memory_limit=2**50)
+    assert len(calls) == 1
+
+
+def test_parallel_memory_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    src, dst = np.array(clique_hierarchy_graph().edges).T
+    stats = SchedulerStats()
+    parallel_hierarchical_leiden((src, dst), Modularity(0.5), partition_max_size=6, max_workers=2, stats=stats, memory_limit=2**50)
+    assert stats.parallelism == 2
+    assert all(worker.memory > 0 for worker in stats.workers.values())
+
+    # Under memory pressure, the subtrees are processed one at a time
+    monkeypatch.setattr(scheduler, "MemoryBudget", partial(MemoryBudget, soft_limit=0.0))
+    levels = parallel_hierarchical_leiden((src, dst), Modularity(0.5), partition_max_size=6, max_workers=2, stats=stats, memory_limit=2**50)
+    assert stats.parallelism == 1
+    assert len(set(levels[-1].tolist())) == 12
+
+    with pytest.raises(MemoryLimitExceededError):
+        parallel_hierarchical_leiden((src, dst), Modularity(0.5), partition_max_size=6, max_workers=2, memory_limit=1)
@@ -0,0 +1,66 @@
+import pickle
+
+import networkx as nx
+import numpy as np
+
+from heirarchical_leiden.csr import CSRGraph
+from heirarchical_leiden.parallel import SharedCSRGraph, leiden_restarts, resolution_sweep
+from heirarchical_leiden.quality_functions import CPM, Modularity
+from heirarchical_leiden.scheduler import SchedulerStats, parallel_hierarchical_leiden
+from heirarchical_leiden.utils import Partition, freeze
+
+from .utils import clique_hierarchy_graph
+
+
+def test_shared_csr_graph() -> None:
+    graph, _ = CSRGraph.from_networkx(nx.karate_club_graph(), weight="weight")
+    with SharedCSRGraph(graph) as shared:
+        # A pickled handle only refers to the shared memory, and attaches to it without copying the arrays
+        handle = pickle.loads(pickle.dumps(shared))
+        assert len(pickle.dumps(shared)) < 1000
+        attached = handle.graph()
+        for field in ("indptr", "indices", "weights", "node_weights", "degrees"):
+            assert np.array_equal(getattr(attached, field), getattr(graph, field))
+        assert not attached.indices.flags.writeable
+        handle.close()
+
+
+def test_leiden_restarts() -> None:
+    G = nx.barbell_graph(6, 0)
+    𝓟 = leiden_restarts(G, Modularity(1), restarts=4, max_workers=2)
+    assert isinstance(𝓟, Partition)
+    assert freeze(𝓟.communities) == freeze([set(range(6)), set(range(6, 12))])
+
+    # The same seed yields the same result, regardless of the scheduling of the runs
+    src, dst = np.array(G.edges).T
+    membership = leiden_restarts((src, dst), Modularity(1), restarts=4, seed=1, max_workers=2)
+    assert np.array_equal(membership, leiden_restarts((src, dst), Modularity(1), restarts=4, seed=1, max_workers=1))
+
+
+def test_resolution_sweep() -> None:
+    G = nx.barbell_graph(6, 0)
+    partitions = resolution_sweep(G, [CPM(0.01), CPM(0.5), CPM(2)], max_workers=2)
+    assert [len(𝓟) for 𝓟 in partitions] == [1, 2, 12]
+
+
+def test_parallel_hierarchical_leiden() -> None:
+    G = clique_hierarchy_graph()
+    stats = SchedulerStats()
+    𝓗𝓟 = parallel_hierarchical_leiden(G, Modularity(0.5), partition_max_size=6, max_workers=2, stats=stats)
+    assert isinstance(𝓗𝓟, dict)
+    assert {len(C) for C in 𝓗𝓟["partition"]} == {20}
+    assert sorted(𝓗𝓟["children"]) == [0, 1, 2]
+    assert all({len(C) for C in child["partition"]} == {5} for child in 𝓗𝓟["children"].values())
+
+    # The root and the groups are processed (but not the cliques, which are small enough), spread over the workers
+    assert stats.tasks == 1 + 3
+    assert 1 <= len(stats.workers) <= 2
+    assert all(0 < u <= 1 for u in stats.utilization().values())
+
+    # The result doesn't depend on the number of workers
+    src, dst = np.array(G.edges).T
+    levels = parallel_hierarchical_leiden((src, dst), Modularity(0.5), partition_max_size=6, max_workers=3)
+    assert isinstance(levels, list)
+    sequential = parallel_hierarchical_leiden((src, dst), Modularity(0.5), partition_max_size=6, max_workers=1)
+    assert all(np.array_equal(a, b) for a, b in zip(levels, sequential))
+    assert [len(np.unique(level)) for level in levels] == [3, 12]
@@ -1,3 +1,4 @@
+from collections.abc import Set
 from math import isnan
 
 import networkx as nx
@@ -187,3 +188,29 @@ def test_cpm_delta() -> None:
 
     # Sanity check that our node movements produced the expected state
     assert 𝓟.as_set() == freeze([{0, 1}, {2, 3, 4}, {5, 6, 7}])
+
+
+def test_default_delta() -> None:
+    """Test that the default implementation of QualityFunction.delta matches the closed-form delta of Modularity and CPM."""
+
+    class DefaultDelta(QualityFunction[int]):
+        """The given quality function, but with the default implementation of `delta`."""
+
+        def __init__(self, 𝓗: QualityFunction[int]) -> None:
+            self.𝓗 = 𝓗
+
+        def __call__(self, 𝓟: Partition[int]) -> float:
+            return self.𝓗(𝓟)
+
+        def delta(self, 𝓟: Partition[int], v: int, target: Set[int]) -> float:
+            return super().delta(𝓟, v, target)
+
+    G = nx.karate_club_graph()
+    for 𝓗 in [Modularity(1), CPM(0.1)]:
+        𝓟 = Partition.from_partition(G, partition_randomly(list(G.nodes)), weight="weight")
+        communities = 𝓟.as_set()
+        for v in G.nodes:
+            for C in [*𝓟.adjacent_communities(v), set()]:
+                assert abs(DefaultDelta(𝓗).delta(𝓟, v, C) - 𝓗.delta(𝓟, v, C)) < 1e-12
+        # The default implementation leaves the partition unchanged
+        assert 𝓟.as_set() == communities
@@ -0,0 +1,82 @@
+import random
+
+import networkx as nx
+import pytest
+
+from heirarchical_leiden.leiden import leiden
+from heirarchical_leiden.quality_functions import CPM, Modularity
+from heirarchical_leiden.reduction import reduce_graph
+from heirarchical_leiden.utils import DataKeys as Keys
+from heirarchical_leiden.utils import Partition, freeze
+
+from .utils import seed_rng
+
+
+def pendant_barbell_graph() -> nx.Graph:
+    # A barbell graph of two 5-cliques, with a chain 0 - 10 - 11 - 12, two leaves 13, 14 attached to node 9, and two nodes 15, 16
+    # which are both adjacent to exactly the nodes 6 and 7.
+    G = nx.barbell_graph(5, 0)
+    G.add_edges_from([(0, 10), (10, 11), (11, 12), (9, 13), (9, 14), (15, 6), (15, 7), (16, 6), (16, 7)])
+    return G
+
+
+def test_reduce_graph() -> None:
+    H = reduce_graph(pendant_barbell_graph())
+    reduced = {frozenset(nodes) for _, nodes in H.nodes(data=Keys.NODES)}
+
+    # The leaves are folded into their neighbors (but not the rest of the chain), and the equivalent nodes 15, 16 are merged
+    assert frozenset({11, 12}) in reduced
+    assert frozenset({9, 13, 14}) in reduced
+    assert frozenset({15, 16}) in reduced
+    assert H.order() == 13
+
+    # The reduced graph is an aggregate graph: its node weights count the nodes merged, and the degrees are preserved
+    assert dict(H.nodes(data=Keys.WEIGHT))[next(v for v, nodes in H.nodes(data=Keys.NODES) if 9 in nodes)] == 3
+    assert H.size(weight=Keys.WEIGHT) == pendant_barbell_graph().size()
+
+    # Isolated edges are not folded
+    assert reduce_graph(nx.path_graph(2)).order() == 2
+
+
+def test_reduce_graph_max_tree_size() -> None:
+    # With a maximum tree size, whole pendant trees are folded, up to that size
+    reduced = {frozenset(nodes) for _, nodes in reduce_graph(pendant_barbell_graph(), max_tree_size=4).nodes(data=Keys.NODES)}
+    assert frozenset({0, 10, 11, 12}) in reduced
+
+    H = reduce_graph(nx.path_graph(10), max_tree_size=5)
+    assert all(len(nodes) <= 5 for _, nodes in H.nodes(data=Keys.NODES))
+    assert reduce_graph(nx.path_graph(10), max_tree_size=10).order() == 1
+    # By default, only the two ends of a path are folded
+    assert reduce_graph(nx.path_graph(10)).order() == 8
+
+
+@seed_rng(0)
+def test_leiden_reduce() -> None:
+    G = pendant_barbell_graph()
+    𝓟 = leiden(G, Modularity(1), reduce=True)
+
+    # The result is a partition of the original graph, in which the folded nodes are expanded again
+    assert isinstance(𝓟, Partition)
+    assert 𝓟.G is G
+    assert freeze(𝓟.communities) == freeze([{0, 1, 2, 3, 4}, {10, 11, 12}, {5, 6, 7, 8, 9, 13, 14, 15, 16}])
+    assert 𝓟.as_set() == leiden(G, Modularity(1)).as_set()
+
+    with pytest.raises(ValueError):
+        leiden(G, Modularity(1), 𝓟, reduce=True)
+
+    # For CPM, a leaf's best community depends on the sizes of the communities, so folding it can lower the quality
+    with pytest.raises(ValueError, match="Modularity"):
+        leiden(G, CPM(0.5), reduce=True)
+
+
+def test_leiden_reduce_quality() -> None:
+    # Folding the leaves doesn't lower the quality reached, not even for graphs consisting mostly of chains and trees
+    𝓗 = Modularity(1)
+    for G in (nx.path_graph(20), nx.balanced_tree(3, 4), nx.lollipop_graph(5, 30)):
+        qualities, reduced_qualities = [], []
+        for seed in range(5):
+            random.seed(seed)
+            qualities.append(𝓗(leiden(G.copy(), 𝓗)))
+            random.seed(seed)
+            reduced_qualities.append(𝓗(leiden(G.copy(), 𝓗, reduce=True)))
+        assert max(reduced_qualities) >= max(qualities)
@@ -11,10 +11,13 @@ As we only have a handful of (relevant) reference partitions, some seeds are cho
 as is the case with the example of the weighted (4,0) barbell graph in the later section of this file.
 """
 
+from statistics import mean
+
 import networkx as nx
-from heirarchical_leiden.leiden import leiden
+import pytest
+from heirarchical_leiden.leiden import compare_refinement, leiden, refine_partition
 from heirarchical_leiden.quality_functions import CPM, Modularity, QualityFunction
-from heirarchical_leiden.utils import freeze
+from heirarchical_leiden.utils import Partition, TerminationReason, freeze, preprocess_graph
 
 from .utils import seed_rng
 
@@ -128,3 +131,72 @@ def test_leiden_weighted_barbell_cpm() -> None:
     𝓠 = leiden(G, 𝓗, weight="weight")
 
     assert 𝓠.as_set() == WEIGHTED_BARBELL_GOOD
+
+
+##########################
+# TERMINATION CONTROLS   #
+##########################
+
+
+@seed_rng(0)
+def test_leiden_termination_converged() -> None:
+    """Test that an unrestricted run of the Leiden algorithm reports that it converged."""
+    𝓠 = leiden(_get_weighted_barbell_graph(), Modularity(0.75), weight="weight")
+
+    assert 𝓠.termination_reason == TerminationReason.CONVERGED
+
+
+@seed_rng(0)
+def test_leiden_termination_budgets() -> None:
+    """Test that the level, iteration, quality gain and time budgets of the Leiden algorithm are respected and reported."""
+    G = nx.karate_club_graph()
+    𝓗: QualityFunction[int] = Modularity(1)
+
+    # A single level only carries out the first local moving phase, yielding a valid partition of G
+    𝓠 = leiden(G, 𝓗, max_levels=1)
+    assert 𝓠.termination_reason == TerminationReason.MAX_LEVELS
+    assert Partition.is_partition(G, 𝓠.communities)
+
+    # Without any node visits, no node is moved, so that the result is the singleton partition
+    𝓠 = leiden(G, 𝓗, max_iterations=0)
+    assert 𝓠.as_set() == freeze([{v} for v in G.nodes])
+
+    # An unreachable minimum quality gain stops the algorithm after the second level
+    𝓠 = leiden(G, 𝓗, min_quality_gain=float("inf"))
+    assert 𝓠.termination_reason == TerminationReason.MIN_QUALITY_GAIN
+    assert Partition.is_partition(G, 𝓠.communities)
+
+    # An exhausted time budget returns the (unchanged) singleton partition
+    𝓠 = leiden(G, 𝓗, time_budget=0)
+    assert 𝓠.termination_reason == TerminationReason.TIME_BUDGET
+    assert 𝓠.as_set() == freeze([{v} for v in G.nodes])
+
+    # The budgets (like all options after the weight) can only be given by keyword
+    with pytest.raises(TypeError):
+        leiden(G, 𝓗, None, 0.3, 0.05, None, 1)
+
+
+@seed_rng(0)
+def test_leiden_approximate_refinement() -> None:
+    """Test that the approximate refinement only merges nodes within their communities, and finds the communities of the barbell graph."""
+    𝓗: QualityFunction[int] = Modularity(1.1)
+    assert leiden(nx.generators.barbell_graph(5, 2), 𝓗, refine_samples=1).as_set() == BARBELL_COMS_AND_MID
+
+    G = preprocess_graph(nx.karate_club_graph(), None)
+    𝓟 = leiden(G, 𝓗)
+    for samples in (1, 2, 34):
+        𝓟ᵣ = refine_partition(G, 𝓟, 𝓗, 0.3, 0.05, samples)
+        # Every refined community lies within a community of 𝓟, and is connected
+        assert all(any(C <= D for D in 𝓟) for C in 𝓟ᵣ)
+        assert all(nx.is_connected(G.subgraph(C)) for C in 𝓟ᵣ)
+
+    # Sampling at least as many communities as any node has neighbors considers all of them, so the refinement is as good as the exact one
+    # on average. Both are random, so their qualities only agree on average.
+    comparisons = [compare_refinement(G, 𝓟, 𝓗, samples=max(d for _, d in G.degree)) for _ in range(20)]
+    assert all(c["change"] == c["approximate"] - c["exact"] for c in comparisons)
+    assert abs(mean(c["change"] for c in comparisons)) < 0.1 * mean(c["exact"] for c in comparisons)
+
+    # With few samples, nodes of high degree are merged much faster
+    G = preprocess_graph(nx.barabasi_albert_graph(200, 10, seed=0), None)
+    comparison = compare_refinement(G, Partition.from_partition(G, [G.nodes]), Modularity(1), samples=2)
+    assert comparison["approximate_time"] < comparison["exact_time"]
@@ -0,0 +1,47 @@
+import networkx as nx
+import numpy as np
+
+from heirarchical_leiden.hierarchical_leiden import hierarchical_leiden
+from heirarchical_leiden.leiden import leiden
+from heirarchical_leiden.quality_functions import Modularity
+from heirarchical_leiden.statistics import hierarchy_statistics
+
+from .test_simple_graphs import _get_weighted_barbell_graph
+from .utils import clique_hierarchy_graph, seed_rng
+
+
+@seed_rng(0)
+def test_community_statistics() -> None:
+    G = _get_weighted_barbell_graph()
+    G.add_edge(0, 0, weight=2)
+    𝓟 = leiden(G, Modularity(1), weight="weight")
+    table = 𝓟.statistics()
+
+    assert len(table["size"]) == len(𝓟)
+    for c, C in enumerate(𝓟.communities):
+        # The statistics match those computed with NetworkX for every community on its own
+        assert table["size"][c] == len(C)
+        assert table["internal_weight"][c] == G.subgraph(C).size(weight="weight")
+        assert table["cut_weight"][c] == nx.cut_size(G, C, weight="weight")
+        assert table["degree_sum"][c] == nx.volume(G, C, weight="weight")
+        assert np.isclose(table["conductance"][c], nx.conductance(G, C, weight="weight"))
+        assert np.isclose(table["density"][c], G.subgraph(C).size(weight="weight") / (len(C) * (len(C) - 1) / 2))
+    assert table["path"].tolist() == [(c,) for c in range(len(𝓟))]
+
+
+@seed_rng(0)
+def test_hierarchy_statistics() -> None:
+    G = clique_hierarchy_graph()
+    𝓗𝓟 = hierarchical_leiden(G, Modularity(0.5), partition_max_size=6)
+    table = hierarchy_statistics(𝓗𝓟)
+
+    # All levels are covered: the 3 groups of the top level and the 12 cliques below them
+    assert table["level"].tolist() == [0] * 3 + [1] * 12
+    assert table["path"].tolist()[:5] == [(0,), (1,), (2,), (0, 0), (0, 1)]
+    assert table["size"].tolist() == [20] * 3 + [5] * 12
+    assert (table["density"][3:] == 1).all()
+    # The cut weights of the cliques are relative to the whole graph, so every level covers the total degree
+    cliques = [C for child in 𝓗𝓟["children"].values() for C in child["partition"].communities]
+    crossing = sum(1 for u, v in G.edges if not any({u, v} <= C for C in cliques))
+    assert table["cut_weight"][3:].sum() == 2 * crossing
+    assert table["degree_sum"][3:].sum() == table["degree_sum"][:3].sum() == 2 * G.size()
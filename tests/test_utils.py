@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 from copy import copy
 from typing import cast
 
@@ -230,3 +233,119 @@ def test_singleton_partition() -> None:
     assert 𝓟.as_set() == freeze([])
     assert 𝓠.as_set() == freeze([{0}, {1}, {2}, {3}, {4}])
     assert 𝓡.as_set() == freeze([{i} for i in range(12)])
+
+
+def test_partition_copy_on_write() -> None:
+    G = nx.generators.classic.complete_graph(5)
+    𝓟 = Partition.from_partition(G, [{0, 1, 2}, {3, 4}])
+
+    # Copies share the communities until one of them is changed, after which they are independent
+    𝓠 = copy(𝓟)
+    𝓡 = copy(𝓟)
+    assert 𝓠._sets is 𝓟._sets
+
+    𝓠.move_node(0, {3, 4})
+    𝓡.move_node(4, set())
+    assert 𝓟.as_set() == freeze([{0, 1, 2}, {3, 4}])
+    assert 𝓠.as_set() == freeze([{1, 2}, {0, 3, 4}])
+    assert 𝓡.as_set() == freeze([{0, 1, 2}, {3}, {4}])
+    assert 𝓟.degree_sum(0) == 12 and 𝓠.degree_sum(0) == 12 and 𝓡.degree_sum(4) == 4
+
+
+def test_partition_checkpoints() -> None:
+    G = nx.generators.barbell_graph(5, 2)
+    𝓟 = Partition.from_partition(G, [{0, 1, 2, 3, 4}, {5, 6}, {7, 8, 9, 10, 11}])
+    original = (list(map(set, 𝓟._sets)), dict(𝓟._node_part), list(𝓟._partition_degree_sums))
+    middle = 𝓟._sets[1]
+
+    # Carry out moves that create, remove and reorder communities and roll them back in two nested steps
+    outer = 𝓟.checkpoint()
+    𝓟.move_node(5, {0, 1, 2, 3, 4})
+    𝓟.move_node(6, {7, 8, 9, 10, 11})  # removes the community {5, 6}
+    inner = 𝓟.checkpoint()
+    𝓟.move_node(0, set())              # creates a new community
+    𝓟.move_node(0, {1, 2, 3, 4, 5})    # removes it again
+    𝓟.move_node(11, set())
+    assert 𝓟.as_set() == freeze([{0, 1, 2, 3, 4, 5}, {6, 7, 8, 9, 10}, {11}])
+
+    𝓟.rollback(inner)
+    assert 𝓟.as_set() == freeze([{0, 1, 2, 3, 4, 5}, {6, 7, 8, 9, 10, 11}])
+    assert 𝓟.degree_sum(0) == 23
+
+    𝓟.rollback(outer)
+    assert (𝓟._sets, 𝓟._node_part, 𝓟._partition_degree_sums) == original
+    # Removed communities are reinserted as the same set objects
+    assert 𝓟._sets[1] is middle
+    assert 𝓟._undo_log == []
+
+    # Released checkpoints keep the moves
+    checkpoint = 𝓟.checkpoint()
+    𝓟.move_node(5, {0, 1, 2, 3, 4})
+    𝓟.release(checkpoint)
+    assert 𝓟.as_set() == freeze([{0, 1, 2, 3, 4, 5}, {6}, {7, 8, 9, 10, 11}])
+    assert 𝓟._undo_log == []
+
+
+def test_partition_from_membership() -> None:
+    G = nx.generators.barbell_graph(5, 2)
+    for u, v in G.edges:
+        G.edges[u, v][DataKeys.WEIGHT] = 2
+
+    # The trusted construction path yields the same partition as `from_partition`, including the degree sums
+    membership = {v: 0 if v < 6 else 1 for v in G.nodes}
+    𝓟: Partition[int] = Partition._from_membership(G, membership, 2, DataKeys.WEIGHT)
+    𝓠: Partition[int] = Partition.from_partition(G, [set(range(6)), set(range(6, 12))], DataKeys.WEIGHT)
+    assert 𝓟 == 𝓠
+    assert 𝓟._partition_degree_sums == 𝓠._partition_degree_sums
+
+    # Flattening reuses the degree sums of the aggregate partition, which equal those of the flattened partition
+    H = Partition.from_partition(G, [{v} for v in G.nodes], DataKeys.WEIGHT).aggregate_graph()
+    𝓡: Partition[int] = Partition.from_partition(H, [set(range(6)), set(range(6, 12))], DataKeys.WEIGHT)
+    𝓕 = 𝓡.flatten(validate=True)
+    assert 𝓕 == 𝓠
+    assert 𝓕._partition_degree_sums == 𝓠._partition_degree_sums
+
+    # Validation can be skipped for partitions known to be valid
+    with pytest.raises(AssertionError):
+        Partition.from_partition(G, [{0, 1}])
+    assert Partition.from_partition(G, [set(G.nodes)], validate=False).degree_sum(0) == 2 * G.size()
+
+
+def test_lazy_networkx_import() -> None:
+    # Processing graphs in array form doesn't import NetworkX, which is only imported when a NetworkX graph is passed in
+    script = """
+import sys
+import numpy as np
+from heirarchical_leiden import Modularity, hierarchical_leiden, leiden
+from heirarchical_leiden.utils import is_graph
+
+edges = (np.array([0, 1, 2, 3, 4, 5, 2]), np.array([1, 2, 0, 4, 5, 3, 3]))
+assert len(set(leiden(edges, Modularity(1)).tolist())) == 2
+assert len(hierarchical_leiden(edges, Modularity(1))) == 1
+assert not is_graph(edges)
+assert "networkx" not in sys.modules
+
+import networkx as nx
+assert is_graph(nx.Graph())
+"""
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def test_lazy_numba_import() -> None:
+    # Numba is only imported when a kernel is run with the numba backend
+    script = """
+import sys
+import numpy as np
+from heirarchical_leiden import Modularity, leiden
+assert "numba" not in sys.modules
+leiden((np.array([0, 1, 2]), np.array([1, 2, 0])), Modularity(1))
+assert "numba" not in sys.modules
+"""
+    subprocess.run([sys.executable, "-c", script], check=True, env={**os.environ, "HIERARCHICAL_LEIDEN_BACKEND": "python"})
+
+    # An unknown backend given by the environment is an error, rather than falling back to the default backend
+    result = subprocess.run(
+        [sys.executable, "-c", "import heirarchical_leiden"], capture_output=True, check=False, text=True,
+        env={**os.environ, "HIERARCHICAL_LEIDEN_BACKEND": "cython"},
+    )
+    assert result.returncode != 0 and "Unknown backend 'cython'" in result.stderr
@@ -0,0 +1,85 @@
+import networkx as nx
+
+from heirarchical_leiden.hierarchical_leiden import hierarchical_leiden
+from heirarchical_leiden.hooks import LeidenHooks, LocalMovingStats
+from heirarchical_leiden.leiden import leiden
+from heirarchical_leiden.quality_functions import Modularity
+from heirarchical_leiden.utils import freeze
+from heirarchical_leiden.visiting import DegreeQueue, FIFOQueue, GainQueue, PruneQueue, VisitStrategy
+
+from .utils import clique_hierarchy_graph, seed_rng
+
+
+class RecordingHooks(LeidenHooks):
+    def __init__(self) -> None:
+        self.stats: list[LocalMovingStats] = []
+
+    def on_local_moving(self, stats: LocalMovingStats) -> None:
+        self.stats.append(stats)
+
+
+@seed_rng(0)
+def test_visit_strategies() -> None:
+    G = nx.ring_of_cliques(8, 5)
+    cliques = freeze([set(range(i, i + 5)) for i in range(0, 40, 5)])
+
+    strategies: list[VisitStrategy] = [FIFOQueue(), DegreeQueue(), GainQueue(), PruneQueue()]
+    for strategy in strategies:
+        hooks = RecordingHooks()
+        𝓟 = leiden(G, Modularity(1), strategy=strategy, hooks=hooks)
+        assert 𝓟.as_set() == cliques
+
+        # Every local moving phase reports its statistics, starting with the first level, on which every node is visited at least once
+        assert [stats["level"] for stats in hooks.stats] == list(range(1, len(hooks.stats) + 1))
+        assert all(stats["strategy"] == strategy.name for stats in hooks.stats)
+        first = hooks.stats[0]
+        assert first["visits"] >= G.order()
+        assert first["evaluations"] >= first["visits"] >= first["moves"] > 0
+
+
+def test_degree_queue_order() -> None:
+    G = nx.star_graph(5)
+    strategy = DegreeQueue()
+    strategy.start(G)
+
+    # The center of the star is visited first, and no node is queued twice
+    assert strategy.pop() == 0
+    strategy.moved(0, 1.0, {1, 2}, set(), lambda u: 0.0)
+    assert sorted(strategy.pop() for _ in range(5)) == [1, 2, 3, 4, 5]
+    assert not strategy
+
+
+def test_gain_queue_order() -> None:
+    G = nx.path_graph(4)
+    strategy = GainQueue()
+    strategy.start(G)
+    first = strategy.pop()
+
+    # Nodes which have not been visited yet go first, then the nodes queued with larger gains
+    rest = [strategy.pop() for _ in range(3)]
+    strategy.moved(first, 0.5, {1}, set(), lambda u: 0.0)
+    strategy.moved(first, 2.0, {3}, set(), lambda u: 0.0)
+    strategy.moved(first, 1.0, {1}, set(), lambda u: 0.0)
+    assert sorted([first, *rest]) == [0, 1, 2, 3]
+    assert [strategy.pop(), strategy.pop()] == [3, 1]
+    assert not strategy
+
+
+def test_prune_queue() -> None:
+    strategy = PruneQueue()
+    strategy.start(nx.empty_graph(0))
+
+    # Only the nodes left behind and those, for which moving into the new community became an improvement, are queued
+    strategy.moved(0, 1.0, {1, 2, 3}, {1}, lambda u: 1.0 if u == 2 else -1.0)
+    assert sorted(strategy.pop() for _ in range(2)) == [1, 2]
+    assert not strategy
+
+
+@seed_rng(0)
+def test_hierarchical_leiden_strategy() -> None:
+    hooks = RecordingHooks()
+    hierarchical_leiden(clique_hierarchy_graph(), Modularity(0.5), partition_max_size=6, hooks=hooks, strategy=PruneQueue())
+
+    # The statistics of the runs on the subtrees carry the paths of the subtrees
+    assert {stats["path"] for stats in hooks.stats} == {(), (0,), (1,), (2,)}
+    assert all(stats["strategy"] == "prune" for stats in hooks.stats)
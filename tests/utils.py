@@ -3,6 +3,8 @@ from collections.abc import Callable
 from functools import wraps
 from typing import ParamSpec, TypeVar
 
+import networkx as nx
+
 T = TypeVar("T")
 P = ParamSpec("P")
 
@@ -21,6 +23,26 @@ def partition_randomly(xs: list[int]) -> list[list[int]]:
     return out
 
 
+def clique_hierarchy_graph(groups: int = 3, cliques: int = 4, clique_size: int = 5) -> nx.Graph:
+    """
+    Create a graph with a two-level community structure: groups of cliques.
+
+    Within a group, every pair of cliques is connected by two edges, while the groups are connected in a ring by single edges.
+    The nodes of the group `g` are numbered `g * cliques * clique_size, …`, clique by clique.
+    """
+    G = nx.Graph()
+    group_size = cliques * clique_size
+    for g in range(groups):
+        heads = [g * group_size + c * clique_size for c in range(cliques)]
+        for h in heads:
+            G.add_edges_from(nx.complete_graph(range(h, h + clique_size)).edges)
+        for i, a in enumerate(heads):
+            for b in heads[i + 1 :]:
+                G.add_edges_from([(a, b), (a + 1, b + 1)])
+        G.add_edge(g * group_size, ((g + 1) % groups) * group_size + 2)
+    return G
+
+
 def seed_rng(seed: int) -> Callable[[Callable[P, T]], Callable[P, T]]:
     """Use a function (a test case, for example) with this decorator to seed the random number generator with the given seed."""
 